@@ -27,18 +27,29 @@ export async function GET(
     const headers = new Headers(req.headers);
     headers.delete("host"); 
 
+    // If-None-Match is forwarded with the other headers, so the backend can answer 304
     const res = await fetch(target, {
       method: "GET",
       headers: headers, 
+      cache: "no-store",
     });
 
-    // We assume backend returns JSON (your FastAPI does).
+    // ETag + Cache-Control let the browser revalidate instead of re-downloading
+    const passthrough: Record<string, string> = {};
+    for (const name of ["etag", "cache-control", "vary"]) {
+      const value = res.headers.get(name);
+      if (value) passthrough[name] = value;
+    }
+    if (res.status === 304) return new NextResponse(null, { status: 304, headers: passthrough });
+
+    // We assume backend returns JSON (your FastAPI does). The body is relayed
+    // as-is; fetch has already undone any gzip/brotli encoding.
     const contentType = res.headers.get("content-type") || "application/json";
-    const data = await res.json();
+    const body = await res.text();
 
-    return new NextResponse(JSON.stringify(data), {
+    return new NextResponse(body, {
       status: res.status,
-      headers: { "content-type": contentType },
+      headers: { ...passthrough, "content-type": contentType },
     });
   } catch (err: any) {
     console.error("proxy error:", err);
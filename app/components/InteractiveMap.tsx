@@ -1,18 +1,31 @@
 "use client";
 
-import { MapContainer, TileLayer, CircleMarker, Tooltip } from "react-leaflet";
+import { MapContainer, TileLayer, CircleMarker, Tooltip, useMapEvents } from "react-leaflet";
 import "leaflet/dist/leaflet.css";
+import type { MapView } from "@/app/lib/api";
 
-type MapPoint = { city: string; count: number; lat: number; lon: number; };
+// `cell` is set when the backend clustered the points for the current zoom
+type MapPoint = { city: string; count: number; lat: number; lon: number; cell?: string; };
 
 const center: [number, number] = [20, 10]; 
 
-export default function InteractiveMap({ points }: { points: MapPoint[] }) {
-  if (!points || points.length === 0) {
-    return <div className="h-full flex items-center justify-center text-slate-400 text-sm">No location data found.</div>;
-  }
+// Reports zoom + bounds after every pan/zoom so the page can fetch clusters for the viewport
+function ViewWatcher({ onViewChange }: { onViewChange: (view: MapView) => void }) {
+  const map = useMapEvents({
+    moveend: () => onViewChange({ zoom: map.getZoom(), bbox: map.getBounds().toBBoxString() }),
+  });
+  return null;
+}
 
+export default function InteractiveMap({ points, onViewChange }: { points: MapPoint[]; onViewChange?: (view: MapView) => void }) {
+  const empty = !points || points.length === 0;
+
+  // The map stays mounted when a viewport has no points, so panning keeps working
   return (
+    <div className="relative h-full w-full">
+    {empty && (
+      <div className="absolute inset-0 z-[1000] flex items-center justify-center text-slate-400 text-sm pointer-events-none">No location data found.</div>
+    )}
     <MapContainer 
         center={center} 
         zoom={2} 
@@ -24,9 +37,11 @@ export default function InteractiveMap({ points }: { points: MapPoint[] }) {
         url="https://{s}.basemaps.cartocdn.com/rastertiles/voyager/{z}/{x}/{y}{r}.png"
       />
 
-      {points.map((p, idx) => (
+      {onViewChange && <ViewWatcher onViewChange={onViewChange} />}
+
+      {(points ?? []).map((p, idx) => (
         <CircleMarker
-          key={idx}
+          key={p.cell ?? idx}
           center={[p.lat, p.lon]}
           pathOptions={{ color: '#0ea5e9', fillColor: '#0ea5e9', fillOpacity: 0.6, weight: 1 }} 
           radius={Math.log(p.count) * 3 + 3} 
@@ -38,5 +53,6 @@ export default function InteractiveMap({ points }: { points: MapPoint[] }) {
         </CircleMarker>
       ))}
     </MapContainer>
+    </div>
   );
 }
\ No newline at end of file
@@ -12,7 +12,7 @@ type Job = {
   job_id?: string;    // May exist
 };
 
-export default function JobsTable({ jobs }: { jobs: Job[] }) {
+export default function JobsTable({ jobs, onLoadMore, loadingMore }: { jobs: Job[]; onLoadMore?: () => void; loadingMore?: boolean }) {
   if (!jobs || jobs.length === 0) return <div className="text-slate-400 text-sm text-center py-4">No recent jobs found matching your filters.</div>;
 
   return (
@@ -72,6 +72,18 @@ export default function JobsTable({ jobs }: { jobs: Job[] }) {
           })}
         </tbody>
       </table>
+      {/* Shown while the backend returned a next_cursor */}
+      {onLoadMore && (
+        <div className="border-t border-slate-200 bg-slate-50 p-3 text-center">
+          <button
+            onClick={onLoadMore}
+            disabled={loadingMore}
+            className="text-xs font-medium text-blue-600 hover:text-blue-800 disabled:text-slate-400"
+          >
+            {loadingMore ? "Loading..." : "Load more"}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
\ No newline at end of file
@@ -19,10 +19,11 @@ function buildQuery(filters: any) {
   return queryString ? `?${queryString}` : "";
 }
 
+// "no-cache" revalidates with the backend's ETag, so unchanged results come back as 304s
 async function fetchJSON<T>(endpoint: string, filters: any = {}): Promise<T> {
   const queryString = buildQuery(filters);
   const url = `${BACKEND}${endpoint}${queryString}`;
-  const res = await fetch(url, { cache: "no-store" });
+  const res = await fetch(url, { cache: "no-cache" });
   if (!res.ok) {
     if (endpoint.includes("kpis")) return null as any;
     return [] as any;
@@ -31,21 +32,57 @@ async function fetchJSON<T>(endpoint: string, filters: any = {}): Promise<T> {
 }
 
 export async function fetchFilterOptions() {
-    const res = await fetch(`${BACKEND}/filter-options`, { cache: "no-store" });
+    const res = await fetch(`${BACKEND}/filter-options`, { cache: "no-cache" });
     if (!res.ok) return { countries: [], roles: [] };
     return res.json();
 }
 
 export async function fetchKpis(filters: any) { return fetchJSON<any>("/kpis", filters); }
-export async function fetchMapPoints(filters: any) { return fetchJSON<any[]>("/map-points", filters); }
+export async function fetchMapPoints(filters: any, view?: MapView) {
+    const params = new URLSearchParams(buildQuery(filters));
+    appendView(params, view);
+    const res = await fetch(`${BACKEND}/map-points?${params.toString()}`, { cache: "no-cache" });
+    if (!res.ok) return [];
+    return res.json();
+}
 export async function fetchSkills(filters: any) { return fetchJSON<any[]>("/skills", filters); }
 export async function fetchSalaryCurve(filters: any) { return fetchJSON<any[]>("/salary_by_experience", filters); }
 export async function fetchCompanies(filters: any) { return fetchJSON<any[]>("/companies", filters); } // NEW
 
-export async function fetchRawJobs(filters: any) {
-    const queryString = buildQuery(filters);
-    const url = `${BACKEND}/raw-jobs${queryString}&limit=20`;
-    const res = await fetch(url, { cache: "no-store" });
-    if (!res.ok) return [];
+// Map viewport: with a zoom the backend returns grid clusters sized for it instead of one point per city
+export type MapView = { zoom: number; bbox?: string };
+
+function appendView(params: URLSearchParams, view?: MapView) {
+  if (!view) return;
+  params.append("zoom", String(view.zoom));
+  if (view.bbox) params.append("bbox", view.bbox);
+}
+
+// Single round-trip for every widget; `sections` limits what the backend computes
+export async function fetchDashboard(filters: any, sections?: string[], view?: MapView) {
+    const params = new URLSearchParams(buildQuery(filters));
+    (sections ?? []).forEach((s) => params.append("sections", s));
+    appendView(params, view);
+    const queryString = params.toString();
+    const res = await fetch(`${BACKEND}/dashboard${queryString ? `?${queryString}` : ""}`, { cache: "no-cache" });
+    if (!res.ok) return null;
+    return res.json();
+}
+
+export type RawJobsPage = { jobs: any[]; next_cursor: string | null };
+
+// Keyset-paginated rows: pass the previous page's next_cursor to continue
+export async function fetchRawJobs(
+    filters: any,
+    opts: { cursor?: string | null; sort?: "post_date" | "parsed_salary" | "min_experience"; order?: "asc" | "desc"; limit?: number; fields?: string[] } = {}
+): Promise<RawJobsPage> {
+    const params = new URLSearchParams(buildQuery(filters));
+    params.append("limit", String(opts.limit ?? 20));
+    if (opts.cursor) params.append("cursor", opts.cursor);
+    if (opts.sort) params.append("sort", opts.sort);
+    if (opts.order) params.append("order", opts.order);
+    (opts.fields ?? []).forEach((f) => params.append("fields", f));
+    const res = await fetch(`${BACKEND}/raw-jobs?${params.toString()}`, { cache: "no-cache" });
+    if (!res.ok) return { jobs: [], next_cursor: null };
     return res.json();
 }
\ No newline at end of file
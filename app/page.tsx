@@ -1,16 +1,14 @@
 "use client";
 
-import { useState, useEffect, useMemo } from "react";
+import { useState, useEffect, useMemo, useRef } from "react";
 import dynamic from "next/dynamic"; 
 import KPIBar from "@/components/KPIBar"; 
 import InDemandSkills from "@/components/InDemandSkills"; 
 import SalaryExperience from "@/components/SalaryExperience"; 
 import TopCompanies from "@/components/TopCompanies"; 
+import JobsTable from "@/components/JobsTable";
 
-import { 
-  fetchKpis, fetchMapPoints, fetchSkills, fetchSalaryCurve, 
-  fetchFilterOptions, fetchCompanies 
-} from "@/app/lib/api";
+import { fetchDashboard, fetchFilterOptions, fetchMapPoints, fetchRawJobs, type MapView } from "@/app/lib/api";
 
 const InteractiveMap = dynamic(() => import("@/components/InteractiveMap"), { 
   ssr: false, loading: () => <div className="h-full flex items-center justify-center text-slate-400">Loading Map...</div>
@@ -34,6 +32,26 @@ export default function DashboardPage() {
   const [loading, setLoading] = useState(true);
   const [selectedComparisonCities, setSelectedComparisonCities] = useState<string[]>([]);
 
+  // Latest jobs, newest first; more pages follow the backend's next_cursor
+  const [jobs, setJobs] = useState<any[]>([]);
+  const [jobsCursor, setJobsCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Map viewport (zoom 2 = the map's initial world view); the dashboard load reads it through the ref
+  const [mapView, setMapView] = useState<MapView>({ zoom: 2 });
+  const mapViewRef = useRef(mapView);
+  mapViewRef.current = mapView;
+
+  const filters = useMemo(() => ({
+      countries: selectedCountry === "Global" ? [] : [selectedCountry],
+      role: selectedRole === "All Roles" ? "" : selectedRole,
+      minExp: minExperience,
+      keywords: searchKeyword,
+      daysAgo: dateFilter,
+  }), [selectedCountry, selectedRole, minExperience, searchKeyword, dateFilter]);
+  const filtersRef = useRef(filters);
+  filtersRef.current = filters;
+
   useEffect(() => {
     async function loadOptions() {
         const data = await fetchFilterOptions();
@@ -48,27 +66,23 @@ export default function DashboardPage() {
       async function loadDashboardData() {
           setLoading(true);
           try {
-            const filters = {
-                countries: selectedCountry === "Global" ? [] : [selectedCountry],
-                role: selectedRole === "All Roles" ? "" : selectedRole,
-                minExp: minExperience,
-                keywords: searchKeyword,
-                daysAgo: dateFilter,
-            };
-
-            const [kpiRes, mapRes, skillRes, salRes, compRes] = await Promise.all([
-                fetchKpis(filters),
-                fetchMapPoints(filters),
-                fetchSkills(filters),
-                fetchSalaryCurve(filters),
-                fetchCompanies(filters)
+            const [dash, jobsPage] = await Promise.all([
+              fetchDashboard(filters, ["kpis", "map_points", "skills", "salary_by_experience", "companies"], mapViewRef.current),
+              fetchRawJobs(filters, { sort: "post_date" }),
             ]);
+            const kpiRes = dash?.kpis ?? null;
+            const mapRes = dash?.map_points ?? [];
+            const skillRes = dash?.skills ?? [];
+            const salRes = dash?.salary_by_experience ?? [];
+            const compRes = dash?.companies ?? [];
 
             setKpis(kpiRes);
             setMapPoints(mapRes);
             setSkills(skillRes);
             setSalaryData(salRes);
             setCompanies(compRes);
+            setJobs(jobsPage.jobs);
+            setJobsCursor(jobsPage.next_cursor);
             
             if (salRes.length > 0) {
                 const uniqueCities = Array.from(new Set(salRes.map((x: any) => x.city)));
@@ -82,7 +96,31 @@ export default function DashboardPage() {
       loadDashboardData();
     }, 500);
     return () => clearTimeout(timer);
-  }, [selectedCountry, selectedRole, minExperience, searchKeyword, dateFilter]);
+  }, [filters]);
+
+  // Pans and zooms only refetch the map clusters for the new viewport
+  useEffect(() => {
+    if (!mapView.bbox) return;
+    const timer = setTimeout(async () => {
+      try { setMapPoints(await fetchMapPoints(filters, mapView)); }
+      catch (error) { console.error(error); }
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [mapView]);
+
+  const loadMoreJobs = async () => {
+    if (!jobsCursor || loadingMore) return;
+    const requested = filters;
+    setLoadingMore(true);
+    try {
+      const page = await fetchRawJobs(requested, { cursor: jobsCursor, sort: "post_date" });
+      // A page for filters that have since changed belongs to the old list
+      if (filtersRef.current !== requested) return;
+      setJobs(prev => [...prev, ...page.jobs]);
+      setJobsCursor(page.next_cursor);
+    } catch (error) { console.error(error); }
+    finally { setLoadingMore(false); }
+  };
 
   const filteredSalaryData = useMemo(() => {
       return salaryData.filter((d: any) => selectedComparisonCities.includes(d.city));
@@ -199,7 +237,7 @@ export default function DashboardPage() {
           <div className="lg:col-span-8 bg-white border border-slate-200 rounded-2xl p-4 flex flex-col shadow-sm">
              <h3 className="font-bold text-slate-800 mb-2 flex items-center gap-2"><span className="text-xl">🌍</span> Hiring Density</h3>
              <div className="flex-1 rounded-xl overflow-hidden border border-slate-100 z-0">
-                <InteractiveMap points={mapPoints} />
+                <InteractiveMap points={mapPoints} onViewChange={setMapView} />
              </div>
           </div>
 
@@ -249,6 +287,12 @@ export default function DashboardPage() {
            </div>
         </div>
 
+        {/* LATEST JOBS */}
+        <div className="bg-white border border-slate-200 rounded-2xl p-4 shadow-sm">
+           <h3 className="font-bold text-slate-800 mb-2 flex items-center gap-2"><span className="text-xl">📋</span> Latest Jobs</h3>
+           {loading ? <div className="text-center py-4 text-slate-400">Loading...</div> : <JobsTable jobs={jobs} onLoadMore={jobsCursor ? loadMoreJobs : undefined} loadingMore={loadingMore} />}
+        </div>
+
       </div>
     </div>
   );
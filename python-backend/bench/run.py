@@ -0,0 +1,196 @@
+"""Load-pipeline and endpoint benchmarks on synthetic postings.
+
+    python bench/run.py                                  # 10k, 100k, 1M rows -> bench.json
+    python bench/run.py --sizes 10000 --repeat 3 --out pr.json --baseline main.json
+
+Each size runs in a fresh temp directory. The generated rows are written as
+live_cache.csv and loaded through load_data_internal (--source memory skips
+the CSV and hands the frame straight to the pipeline). The runner records the
+per-stage load timings, a second startup from the processed snapshot, and
+every endpoint under a mix of filters, cold (filter and response caches
+cleared before each call) and warm. With --baseline, metrics more than --tolerance slower than
+the baseline are listed and the exit code is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+
+ENDPOINTS = ["/filter-options", "/kpis", "/companies", "/map-points", "/skills", "/salary_by_experience", "/raw-jobs", "/dashboard"]
+FILTER_MIXES = {
+    "all": {},
+    "country": {"countries": "India"},
+    "country_role_exp": {"countries": "India", "role": "Data Science", "exp_min": 5},
+    "recent": {"days_ago": 30, "exp_min": 10},
+    "keyword": {"keywords": "python"},
+    "keyword_country": {"keywords": "data", "countries": "USA"},
+}
+# Extra /raw-jobs cases: sorted first page and a deep page reached through cursors
+RAW_JOBS_SORTED = {"sort": "post_date", "order": "desc", "limit": 20}
+DEEP_PAGES = 50
+# Baseline values below this are too noisy to flag
+MIN_FLAG_SECONDS = 0.002
+
+
+def summarize(samples):
+    a = np.array(samples) * 1000
+    return {"mean_ms": float(a.mean()), "p50_ms": float(np.percentile(a, 50)), "p95_ms": float(np.percentile(a, 95)), "min_ms": float(a.min()), "n": len(a)}
+
+
+def timed(fn, repeat, before=None):
+    samples = []
+    for _ in range(repeat):
+        if before: before()
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    return summarize(samples)
+
+
+def bench_endpoints(process, client, repeat):
+    out = {}
+    for path in ENDPOINTS:
+        out[path] = {}
+        for name, params in FILTER_MIXES.items():
+            call = lambda: client.get(path, params=params).raise_for_status()
+            out[path][name] = {
+                "cold": timed(call, repeat, before=process.clear_caches),
+                "warm": timed(call, repeat),
+            }
+
+    sorted_call = lambda: client.get("/raw-jobs", params=RAW_JOBS_SORTED).raise_for_status()
+    out["/raw-jobs"]["sorted_post_date"] = {"cold": timed(sorted_call, repeat, before=process.clear_caches)}
+    cursor = None
+    for _ in range(DEEP_PAGES):
+        cursor = client.get("/raw-jobs", params={**RAW_JOBS_SORTED, **({"cursor": cursor} if cursor else {})}).json()["next_cursor"]
+        if not cursor: break
+    if cursor:
+        deep = lambda: client.get("/raw-jobs", params={**RAW_JOBS_SORTED, "cursor": cursor}).raise_for_status()
+        out["/raw-jobs"][f"sorted_page_{DEEP_PAGES + 1}"] = {"cold": timed(deep, repeat, before=process.clear_caches)}
+    return out
+
+
+def bench_size(process, fetch, rows, args):
+    os.chdir(tempfile.mkdtemp(prefix=f"bench-{rows}-"))
+    t = time.perf_counter()
+    df = synthetic.frame(rows, args.seed, args.now, args.desc_words)
+    generate_s = time.perf_counter() - t
+
+    if args.source == "csv":
+        df.to_csv("live_cache.csv", index=False)
+        process.fetch_from_typesense = fetch
+        del df
+    else:
+        process.fetch_from_typesense = lambda use_cache=True, df=df: iter([df.copy()])
+
+    # Cold classifier: the title memo would otherwise carry over between sizes
+    process.role_classifier.memo = {}
+    t = time.perf_counter()
+    process.load_data_internal(use_cache=True)
+    load_s = time.perf_counter() - t
+    load = {"total_s": load_s, "stages": dict(process.load_stages)}
+
+    t = time.perf_counter()
+    process.load_data_internal(use_cache=True)
+    snapshot_s = time.perf_counter() - t
+
+    from fastapi.testclient import TestClient
+    client = TestClient(process.app)  # no `with`: skips the startup load and refresh thread
+    report = process.dataset.memory_report()
+    return {
+        "rows": len(process.dataset.df),
+        "generate_s": generate_s,
+        "load": load,
+        "snapshot_startup": {"total_s": snapshot_s, "stages": dict(process.load_stages)},
+        "memory": {"frame_bytes": report["frame_bytes"], "index_bytes": report["index_bytes"]},
+        "endpoints": bench_endpoints(process, client, args.repeat),
+    }
+
+
+def flatten(result):
+    """{metric path: seconds} for the numbers worth comparing between runs."""
+    out = {}
+    for size, r in result.get("results", {}).items():
+        out[f"{size}/load/total"] = r["load"]["total_s"]
+        out.update({f"{size}/load/{k}": v for k, v in r["load"]["stages"].items()})
+        out[f"{size}/snapshot_startup/total"] = r["snapshot_startup"]["total_s"]
+        for path, mixes in r["endpoints"].items():
+            for mix, modes in mixes.items():
+                out.update({f"{size}{path}/{mix}/{mode}": s["p50_ms"] / 1000 for mode, s in modes.items()})
+    return out
+
+
+def compare(baseline, current, tolerance):
+    """Metrics slower than baseline by more than tolerance, as (name, baseline s, current s)."""
+    base, cur = flatten(baseline), flatten(current)
+    return [(k, base[k], cur[k]) for k in sorted(cur)
+            if k in base and base[k] >= MIN_FLAG_SECONDS and cur[k] > base[k] * (1 + tolerance)]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--now", type=int, default=None, help="unix time posted_at is generated back from (default: now)")
+    parser.add_argument("--desc-words", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--source", choices=["csv", "memory"], default="csv")
+    parser.add_argument("--out", default="bench.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    out_path, baseline_path = os.path.abspath(args.out), args.baseline and os.path.abspath(args.baseline)
+
+    os.environ.setdefault("REFRESH_INTERVAL_SECONDS", "0")
+    os.chdir(tempfile.mkdtemp(prefix="bench-"))
+    import process
+    fetch = process.fetch_from_typesense
+
+    result = {
+        "meta": {
+            "created_at": time.time(), "commit": git_commit(), "seed": args.seed, "now": args.now,
+            "source": args.source, "repeat": args.repeat, "desc_words": args.desc_words,
+            "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+            "machine": platform.machine(), "cpus": os.cpu_count(),
+        },
+        "results": {},
+    }
+    for rows in args.sizes:
+        print(f"⏱️  {rows} rows...")
+        result["results"][str(rows)] = bench_size(process, fetch, rows, args)
+        print(f"   load {result['results'][str(rows)]['load']['total_s']:.2f}s")
+
+    with open(out_path, "w") as f: json.dump(result, f, indent=2)
+    print(f"📝 Results written to {out_path}")
+
+    if baseline_path:
+        with open(baseline_path) as f: baseline = json.load(f)
+        regressions = compare(baseline, result, args.tolerance)
+        for name, before, after in regressions:
+            print(f"🐢 {name}: {before * 1000:.1f}ms -> {after * 1000:.1f}ms ({after / before:.2f}x)")
+        if regressions: sys.exit(1)
+        print("✅ No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# --- SYNTHETIC JOB POSTINGS ---
+# Reproducible Typesense-shaped documents for benchmarking. The same
+# (rows, seed, now) always yields the same frame. Value pools mimic the live
+# data's messiness: many distinct titles, "City, State, Country" locations,
+# free-text ctc and experience strings, skills lists with junk entries and
+# geopoints that are sometimes missing.
+
+SENIORITY = ["", "Senior ", "Junior ", "Lead ", "Principal ", "Associate ", "Sr. ", "Staff "]
+TITLES = [
+    "Software Engineer", "Backend Developer", "Frontend Developer", "Full Stack Developer", "Data Scientist",
+    "Data Engineer", "Data Analyst", "Business Analyst", "DevOps Engineer", "Cloud Engineer", "QA Engineer",
+    "Android Developer", "iOS Developer", "Product Manager", "Project Manager", "Scrum Master", "UI/UX Designer",
+    "Sales Executive", "Business Development Manager", "Account Manager", "Marketing Manager", "SEO Specialist",
+    "HR Recruiter", "Talent Acquisition Specialist", "Customer Success Manager", "Customer Service Representative",
+    "Accountant", "Financial Analyst", "Operations Manager", "Legal Counsel", "Content Writer", "Graphic Designer",
+    "Teacher", "Staff Nurse", "Civil Engineer", "Mechanical Engineer", "Store Manager", "Chef", "Security Analyst",
+    "Network Engineer", "Technical Support Engineer", "Solutions Architect", "Machine Learning Engineer",
+    "Delivery Driver", "Warehouse Associate", "Receptionist", "Office Assistant",
+]
+TEAMS = ["", "", "", " - Payments", " - Platform", " (Remote)", " II", " III", " - Growth", " - Analytics", " (Contract)", " - APAC"]
+LOCATIONS = [
+    ("Bengaluru, Karnataka, India", 12.9716, 77.5946), ("Bangalore, India", 12.9716, 77.5946),
+    ("Hyderabad, Telangana, India", 17.3850, 78.4867), ("Mumbai, Maharashtra, India", 19.0760, 72.8777),
+    ("Pune, Maharashtra, India", 18.5204, 73.8567), ("New Delhi, Delhi, India", 28.6139, 77.2090),
+    ("Gurgaon, Haryana, India", 28.4595, 77.0266), ("Chennai, Tamil Nadu, India", 13.0827, 80.2707),
+    ("Noida, Uttar Pradesh, India", 28.5355, 77.3910), ("Kolkata, West Bengal, India", 22.5726, 88.3639),
+    ("Ahmedabad, Gujarat, India", 23.0225, 72.5714), ("Kochi, Kerala, India", 9.9312, 76.2673),
+    ("Austin, TX, United States", 30.2672, -97.7431), ("New York, NY, United States", 40.7128, -74.0060),
+    ("San Francisco, CA, United States", 37.7749, -122.4194), ("Seattle, WA, USA", 47.6062, -122.3321),
+    ("London, United Kingdom", 51.5074, -0.1278), ("Berlin, Germany", 52.5200, 13.4050),
+    ("Singapore", 1.3521, 103.8198), ("Dubai, United Arab Emirates", 25.2048, 55.2708),
+    ("Toronto, ON, Canada", 43.6510, -79.3470), ("Sydney, NSW, Australia", -33.8688, 151.2093),
+    ("Remote", np.nan, np.nan), ("India", np.nan, np.nan), ("Indianapolis, Indiana, United States", 39.7684, -86.1581),
+]
+CTC = ["", "Not Disclosed", "3-5 LPA", "5-8 LPA", "8-12 LPA", "12-18 LPA", "18-25 LPA", "25-40 LPA", "₹ 4,50,000 - 6,00,000",
+       "₹ 10,00,000", "$120,000 - $150,000", "$90,000", "60000", "15 LPA", "Competitive"]
+EXPERIENCE = ["0", "1", "2", "3", "5", "8", "10", "0-1 Yrs", "1-3 Yrs", "2-5 Yrs", "3-6 years", "5-10 years", "10+ years", "Fresher", ""]
+SKILLS = [
+    "python", "java", "javascript", "typescript", "react", "angular", "node.js", "django", "flask", "spring boot",
+    "sql", "postgresql", "mongodb", "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "git", "linux",
+    "machine learning", "deep learning", "pandas", "numpy", "tableau", "power bi", "excel", "spark", "kafka",
+    "selenium", "figma", "photoshop", "seo", "salesforce", "sap", "tally", "accounting", "recruitment", "c++", "c#",
+    "go", "rust", "kotlin", "swift", "flutter", "rest api", "graphql", "redis", "elasticsearch", "airflow", "hadoop",
+    # junk entries the pipeline strips
+    "communication", "team player", "ms office", "leadership", "bengaluru", "remote", "full time", "Communication Skills",
+]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Tyrell",
+             "Cyberdyne", "Soylent", "Confidential", "Client of Acme", "nan", "Wonka", "Pied Piper", "Vandelay"]
+JOB_TYPES = ["Full Time", "Part Time", "Contract", "Internship", None]
+LOCATION_TYPES = ["Onsite", "Remote", "Hybrid", "Work From Home", None]
+WORDS = ("we are looking for a motivated engineer to join our team and build scalable systems with modern tools "
+         "experience in cloud data pipelines customer facing products agile delivery and strong ownership").split()
+
+
+def frame(rows, seed=0, now=None, desc_words=40, company_pool=2000):
+    """Typesense-shaped postings as a DataFrame (list/geopoint columns hold Python lists)."""
+    rng = np.random.default_rng(seed)
+    now = int(time.time()) if now is None else int(now)
+    pick = lambda pool, p=None: np.asarray(pool, dtype=object)[rng.choice(len(pool), rows, p=p)]
+
+    # Titles: seniority x base title x team suffix, plus a numeric tail on a few to grow the distinct count
+    title = pd.Series(pick(SENIORITY)) + pick(TITLES) + pick(TEAMS)
+    tail = rng.random(rows) < 0.05
+    title[tail] = title[tail] + " #" + pd.Series(rng.integers(0, rows // 10 + 1, rows)).astype(str)[tail]
+
+    loc = rng.integers(0, len(LOCATIONS), rows)
+    location = np.array([l[0] for l in LOCATIONS], dtype=object)[loc]
+    location[rng.random(rows) < 0.02] = None
+    base = np.array([[l[1], l[2]] for l in LOCATIONS])[loc] + rng.normal(0, 0.05, (rows, 2))
+    has_geo = (rng.random(rows) < 0.6) & ~np.isnan(base[:, 0])
+    latlon = np.empty(rows, dtype=object)
+    pairs = np.round(base[has_geo], 6).tolist()
+    latlon[np.flatnonzero(has_geo)] = pd.Series(pairs, dtype=object).to_numpy()
+
+    # 3-10 skills per posting, drawn with a skewed popularity
+    weights = 1 / np.arange(1, len(SKILLS) + 1)
+    counts = rng.integers(3, 11, rows)
+    flat = np.asarray(SKILLS, dtype=object)[rng.choice(len(SKILLS), counts.sum(), p=weights / weights.sum())]
+    skills = np.split(flat, np.cumsum(counts)[:-1])
+
+    companies = np.array(COMPANIES + [f"Company {i}" for i in range(company_pool)], dtype=object)
+    cweights = 1 / np.arange(1, len(companies) + 1) ** 0.8
+
+    words = np.asarray(WORDS, dtype=object)[rng.integers(0, len(WORDS), (rows, desc_words))] if desc_words else None
+    description = pd.Series([" ".join(w) for w in words]) if desc_words else pd.Series([""] * rows)
+    description = pd.Series(pick(TITLES)) + ": " + description
+
+    ids = pd.Series(np.arange(rows)).astype(str)
+    return pd.DataFrame({
+        "id": ids,
+        "job_id": "J" + ids,
+        "title": title,
+        "location": location,
+        "latlon": latlon,
+        "ctc": pick(CTC),
+        "min_experience": pick(EXPERIENCE),
+        "skills": [list(s) for s in skills],
+        "posted_at": now - rng.integers(0, 180 * 86400, rows),
+        "company_name": companies[rng.choice(len(companies), rows, p=cweights / cweights.sum())],
+        "job_type": pick(JOB_TYPES),
+        "location_type": pick(LOCATION_TYPES),
+        "apply_link": "https://jobs.example.com/" + ids,
+        "description": description,
+    })
+
+
+def documents(rows, seed=0, now=None, desc_words=40):
+    """Same postings as frame(), as Typesense document dicts (missing geopoints omitted)."""
+    for doc in frame(rows, seed, now, desc_words).to_dict(orient="records"):
+        if doc["latlon"] is None: del doc["latlon"]
+        yield doc
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# --- FILTER RESULT CACHE ---
+# The dashboard fires all of its widget requests with the same filters at
+# once, so the filtered row ids are computed once and shared between them.
+# Entries are bounded by count and, with maxbytes set, by the bytes their
+# arrays hold: one unfiltered row-id array of a large dataset outweighs
+# hundreds of narrow ones.
+
+
+def sizeof(value):
+    """Bytes held by a cached value: numpy arrays and byte strings, summed through containers."""
+    if isinstance(value, np.ndarray): return value.nbytes
+    if isinstance(value, (bytes, bytearray, str)): return len(value)
+    if isinstance(value, dict): return sum(sizeof(v) for v in value.values())
+    if isinstance(value, (list, tuple)): return sum(sizeof(v) for v in value)
+    return int(getattr(value, "nbytes", 0))
+
+
+class _Pending:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class FilterCache:
+    def __init__(self, maxsize=256, ttl=300, maxbytes=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes      # None: no byte budget
+        self.bytes = 0
+        self.entries = OrderedDict()  # key -> (stored_at, value, bytes)
+        self.pending = {}             # key -> _Pending for in-flight computations
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.coalesced = self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if time.monotonic() - entry[0] < self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._drop(key)
+            pending = self.pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self.pending[key] = _Pending()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        # Identical request already running: wait for its result
+        if not owner:
+            pending.event.wait()
+            if pending.error is not None: raise pending.error
+            return pending.value
+
+        try:
+            pending.value = compute()
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.pending[key]
+                if pending.error is None: self._store(key, pending.value)
+            pending.event.set()
+        return pending.value
+
+    def _store(self, key, value):
+        size = sizeof(value)
+        # A value over the whole budget is returned but not kept
+        if self.maxbytes is not None and size > self.maxbytes: return
+        if key in self.entries: self._drop(key)
+        self.entries[key] = (time.monotonic(), value, size)
+        self.bytes += size
+        while len(self.entries) > self.maxsize or (self.maxbytes is not None and self.bytes > self.maxbytes):
+            self._drop(next(iter(self.entries)))
+            self.evictions += 1
+
+    def _drop(self, key):
+        self.bytes -= self.entries.pop(key)[2]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "size": len(self.entries), "maxsize": self.maxsize, "bytes": self.bytes, "maxbytes": self.maxbytes, "ttl_seconds": self.ttl,
+                "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0,
+            }
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+
+import ahocorasick
+import numpy as np
+from rapidfuzz import process, fuzz
+
+# --- ROLE CLASSIFIER ---
+# 1. Exact substring pass: one Aho-Corasick automaton over every keyword, so a
+#    title is scanned once and the lowest-priority (first listed) group wins.
+# 2. Fuzzy pass: all unmatched titles are scored against all keywords in one
+#    rapidfuzz cdist call per batch; a group's score is its best keyword.
+# 3. A title -> role memo persisted to disk skips titles seen in earlier loads.
+
+FUZZY_THRESHOLD = 85
+FUZZY_BATCH = 10000
+
+
+class RoleClassifier:
+    def __init__(self, role_mappings, memo_path=None):
+        self.groups = list(role_mappings)
+        self.keywords = [k for kws in role_mappings.values() for k in kws]
+        # Column ranges of each group inside the flattened keyword list
+        self.group_starts = np.cumsum([0] + [len(kws) for kws in role_mappings.values()])[:-1]
+
+        self.automaton = ahocorasick.Automaton()
+        for priority, kws in enumerate(role_mappings.values()):
+            for k in kws:
+                # Keep the highest-priority group when a keyword is listed twice
+                if k not in self.automaton: self.automaton.add_word(k, priority)
+        self.automaton.make_automaton()
+
+        self.version = hashlib.sha1(json.dumps(role_mappings).encode()).hexdigest()
+        self.memo_path = memo_path
+        # cdist threads (-1 = all cores); load-pool workers use 1, the pool already spreads the chunks
+        self.workers = -1
+        self.memo = self._load_memo()
+
+    def _load_memo(self):
+        if not self.memo_path or not os.path.exists(self.memo_path): return {}
+        try:
+            with open(self.memo_path) as f: data = json.load(f)
+        except (OSError, ValueError): return {}
+        # A memo built from different ROLE_MAPPINGS is useless
+        return data.get("titles", {}) if data.get("version") == self.version else {}
+
+    def _save_memo(self):
+        if not self.memo_path: return
+        tmp = self.memo_path + ".tmp"
+        with open(tmp, "w") as f: json.dump({"version": self.version, "titles": self.memo}, f)
+        os.replace(tmp, self.memo_path)
+
+    def match_exact(self, t_lower):
+        best = None
+        for _, priority in self.automaton.iter(t_lower):
+            if best is None or priority < best:
+                best = priority
+                if best == 0: break
+        return best
+
+    def match_fuzzy(self, titles_lower):
+        """Best group index per title, or -1 when no keyword clears the threshold."""
+        out = np.full(len(titles_lower), -1, dtype=np.int64)
+        for start in range(0, len(titles_lower), FUZZY_BATCH):
+            batch = titles_lower[start:start + FUZZY_BATCH]
+            scores = process.cdist(batch, self.keywords, scorer=fuzz.partial_ratio, score_cutoff=FUZZY_THRESHOLD, dtype=np.float64, workers=self.workers)
+            group_best = np.maximum.reduceat(scores, self.group_starts, axis=1)
+            # argmax keeps the first group on ties, like the old strict '>' loop
+            best = group_best.argmax(axis=1)
+            ok = group_best[np.arange(len(batch)), best] > FUZZY_THRESHOLD
+            out[start:start + len(batch)] = np.where(ok, best, -1)
+        return out
+
+    def classify(self, titles):
+        """Maps each unique title to its role group ("Other" when nothing matches)."""
+        title_map, pending = {}, []
+        for title in titles:
+            if not isinstance(title, str):
+                title_map[title] = "Other"
+            elif title in self.memo:
+                title_map[title] = self.memo[title]
+            else:
+                pending.append(title)
+        if not pending: return title_map
+
+        fuzzy_titles, fuzzy_lower = [], []
+        for title in pending:
+            t_lower = title.lower()
+            priority = self.match_exact(t_lower)
+            if priority is None:
+                fuzzy_titles.append(title)
+                fuzzy_lower.append(t_lower)
+            else:
+                self.memo[title] = self.groups[priority]
+
+        if fuzzy_titles:
+            for title, g in zip(fuzzy_titles, self.match_fuzzy(fuzzy_lower)):
+                self.memo[title] = self.groups[g] if g >= 0 else "Other"
+
+        for title in pending: title_map[title] = self.memo[title]
+        self._save_memo()
+        return title_map
+
+    def remember(self, title_map):
+        """Adds titles classified elsewhere (load worker processes) to the memo."""
+        if not title_map: return
+        self.memo.update(title_map)
+        self._save_memo()
@@ -0,0 +1,388 @@
+import numpy as np
+import pandas as pd
+
+# --- DASHBOARD CUBE ---
+# Pre-aggregated sums for the widgets that only depend on the structured
+# filters. Rows are grouped into sparse cells, one per distinct
+# (country, job_role, experience step, posting week, city) combination, and a
+# filter selection masks cells instead of rows. The experience step is 2y for
+# exactly y years and 2y+1 for anything in (y, y+1), so an integer exp_max
+# selects whole cells; a fractional one leaves the rows in (floor, exp_max]
+# partially selected. The week the days_ago cutoff falls on is partially
+# selected too. Those rows are folded in one by one.
+# Company counts live in a second cube with company in place of city.
+#
+# Salary percentiles come from a third cube keyed by city and a log-scale
+# salary bucket (a DDSketch-style histogram split into mergeable cells), with
+# 4-week periods instead of weeks, as salary buckets multiply the cells:
+# bucket i holds salaries in (GAMMA^(i-1), GAMMA^i] and reports 2*GAMMA^i /
+# (GAMMA+1), which is within SKETCH_ALPHA (1%) of every salary in it. A
+# percentile therefore costs one pass over the matching cells and is within
+# 1% of the exact nearest-rank percentile of the selected rows.
+#
+# Keyword queries can't use the cells; they hand the matching rows to the same
+# widget math as one-row entries. Both paths reduce to integer sums (salaries
+# are whole numbers, experience and lat/lon are fixed-point), so they return
+# bit-identical results.
+
+SCALE = 10**7  # fixed-point units for experience and lat/lon sums
+DAY = 86400 * 10**9
+WEEK = 7 * DAY
+SKETCH_PERIOD = 4 * WEEK
+NO_ROW = np.iinfo(np.int64).max
+NO_DAY = np.iinfo(np.int64).min
+NO_EXP = np.iinfo(np.int64).max
+CATEGORY_KEYS = {"country": "country", "job_role": "job_role", "city": "city", "company": "company"}
+SKETCH_ALPHA = 0.01
+GAMMA = (1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA)
+PERCENTILES = (25, 50, 75, 90)
+
+
+def _group(keys, sums, mins):
+    """Collapses entries with equal keys (sums add up, mins take the minimum); also returns entry -> cell."""
+    n = len(next(iter(keys.values())))
+    if n == 0: return keys, sums, mins, np.empty(0, dtype=np.int64)
+    order = np.lexsort([keys[k] for k in reversed(list(keys))])
+    change = np.zeros(n, dtype=bool)
+    change[0] = True
+    for v in keys.values():
+        v = v[order]
+        change[1:] |= v[1:] != v[:-1]
+    starts = np.flatnonzero(change)
+    inverse = np.empty(n, dtype=np.int64)
+    inverse[order] = np.cumsum(change) - 1
+    return (
+        {k: v[order][starts] for k, v in keys.items()},
+        {k: np.add.reduceat(v[order], starts) for k, v in sums.items()},
+        {k: np.minimum.reduceat(v[order], starts) for k, v in mins.items()},
+        inverse,
+    )
+
+
+def _concat(a, b):
+    return {k: np.concatenate([a[k], b[k]]) for k in a}
+
+
+def _sum_by(codes, values, n_groups):
+    out = np.zeros(n_groups, dtype=np.int64)
+    np.add.at(out, codes, values)
+    return out
+
+
+def exp_step(exp):
+    """2y for exactly y years of experience, 2y+1 for (y, y+1); NO_EXP when missing."""
+    years = np.floor(np.nan_to_num(exp))
+    return np.where(np.isnan(exp), NO_EXP, 2 * years.astype(np.int64) + (exp > years))
+
+
+def salary_bucket(salary):
+    return np.ceil(np.log(salary) / np.log(GAMMA)).astype(np.int64)
+
+
+def bucket_value(bucket):
+    return 2 * GAMMA ** bucket.astype(np.float64) / (GAMMA + 1)
+
+
+def _percentiles(group, bucket, counts, qs=PERCENTILES):
+    """Nearest-rank percentiles per group from (group, bucket, count) entries: (groups, {q: values})."""
+    keys, sums, _, _ = _group({"group": group, "bucket": bucket}, {"n": counts}, {})
+    group, bucket, cum = keys["group"], keys["bucket"], np.cumsum(sums["n"])
+    groups, starts = np.unique(group, return_index=True)
+    ends = np.append(starts[1:], len(group))
+    before = np.where(starts > 0, cum[starts - 1], 0)
+    total = cum[ends - 1] - before
+    out = {}
+    for q in qs:
+        rank = np.maximum(np.ceil(total * q / 100).astype(np.int64), 1)
+        out[q] = bucket_value(bucket[np.searchsorted(cum, before + rank, side="left")])
+    return groups, out
+
+
+def _top(codes, values, firsts, n_groups, top):
+    """Top groups ranked like value_counts (total descending, ties by first row) and all totals."""
+    counts = _sum_by(codes, values, n_groups)
+    first = np.full(n_groups, NO_ROW, dtype=np.int64)
+    np.minimum.at(first, codes, firsts)
+    present = np.flatnonzero(counts)
+    return present[np.lexsort((first[present], -counts[present]))[:top]], counts
+
+
+class Cube:
+    """Sparse cells (keys + int64 sums + first-row mins) and the cell of every row (-1 = none)."""
+
+    def __init__(self, keys, sums, mins, row_cell):
+        self.keys, self.sums, self.mins, self.row_cell = keys, sums, mins, row_cell
+
+    def __len__(self):
+        return len(self.keys["period"])
+
+    @classmethod
+    def build(cls, ids, keys, sums, mins, n):
+        keys, sums, mins, inverse = _group(keys, sums, mins)
+        row_cell = np.full(n, -1, dtype=np.int64)
+        row_cell[ids] = inverse
+        return cls(keys, sums, mins, row_cell)
+
+    @classmethod
+    def merge(cls, old, keep, remap, facts, n):
+        """Cube after dropping old rows where ~keep and appending rows [keep.sum(), n).
+
+        Cells that lost a row are re-folded from their remaining rows (a first-row
+        min can't be un-merged); untouched cells only get their codes remapped.
+        facts(ids) returns the entries of rows of the new frame.
+        """
+        new_pos = np.cumsum(keep) - 1
+        hit = np.zeros(len(old) + 1, dtype=bool)
+        hit[old.row_cell[~keep]] = True
+        hit = hit[:-1]
+        stay = ~hit
+        row_hit = hit[old.row_cell] & (old.row_cell >= 0)
+
+        keys = {k: (remap[k][v] if k in remap else v)[stay] for k, v in old.keys.items()}
+        mins = {k: np.where(v[stay] == NO_ROW, NO_ROW, new_pos[np.where(v[stay] == NO_ROW, 0, v[stay])]) for k, v in old.mins.items()}
+        sums = {k: v[stay] for k, v in old.sums.items()}
+
+        refold = np.concatenate([new_pos[np.flatnonzero(keep & row_hit)], np.arange(int(keep.sum()), n)])
+        ids, f_keys, f_sums, f_mins = facts(refold)
+        keys, sums, mins, inverse = _group(_concat(keys, f_keys), _concat(sums, f_sums), _concat(mins, f_mins))
+
+        row_cell = np.full(n, -1, dtype=np.int64)
+        kept = np.flatnonzero(keep & ~row_hit & (old.row_cell >= 0))
+        row_cell[new_pos[kept]] = inverse[(np.cumsum(stay) - 1)[old.row_cell[kept]]]
+        row_cell[ids] = inverse[int(stay.sum()):]
+        return cls(keys, sums, mins, row_cell)
+
+    def state(self):
+        out = {"row_cell": self.row_cell}
+        for part, arrays in (("keys", self.keys), ("sums", self.sums), ("mins", self.mins)):
+            out.update({f"{part}.{k}": v for k, v in arrays.items()})
+        return out
+
+    @classmethod
+    def from_state(cls, state):
+        parts = {"keys": {}, "sums": {}, "mins": {}}
+        for name, v in state.items():
+            if name != "row_cell": parts[name.split(".")[0]][name.split(".", 1)[1]] = v
+        return cls(parts["keys"], parts["sums"], parts["mins"], state["row_cell"])
+
+
+class Selection:
+    """Entries (cells or rows) matching one filter selection, plus the widget math over them."""
+
+    def __init__(self, main, companies, cities, company_names, salaries):
+        self.main, self.companies, self.salaries = main, companies, salaries
+        self.cities, self.company_names = cities, company_names
+
+    @property
+    def nbytes(self):
+        """Bytes of the entry arrays (cities and company names belong to the cube)."""
+        return sum(a.nbytes for part in (self.main, self.companies, self.salaries) if part for a in part.values())
+
+    def kpis(self):
+        m = {k: int(self.main[k].sum()) for k in ("n", "paid_n", "paid_sum", "exp_n", "exp_fx", "remote")}
+        return {
+            "total_jobs": m["n"],
+            "avg_ctc": m["paid_sum"] / m["paid_n"] if m["paid_n"] else 0,
+            "avg_experience": m["exp_fx"] / (m["exp_n"] * SCALE) if m["exp_n"] else float("nan"),
+            "remote_count": m["remote"],
+        }
+
+    def map_points(self):
+        m = self.main
+        geo = m["geo_n"] > 0
+        city = m["city"][geo]
+        n = len(self.cities)
+        count = _sum_by(city, m["geo_n"][geo], n)
+        lat, lon = _sum_by(city, m["lat_fx"][geo], n), _sum_by(city, m["lon_fx"][geo], n)
+        return [{"city": self.cities[c], "count": int(count[c]), "lat": int(lat[c]) / (int(count[c]) * SCALE),
+                 "lon": int(lon[c]) / (int(count[c]) * SCALE)} for c in np.flatnonzero(count)]
+
+    def salary_by_experience(self, max_years=30, top=100):
+        m = self.main
+        ok = (m["paid_n"] > 0) & (m["exp"] // 2 < max_years)
+        city, years, paid_n, paid_sum, first = m["city"][ok], m["exp"][ok] // 2, m["paid_n"][ok], m["paid_sum"][ok], m["paid_first"][ok]
+        if len(city) == 0: return []
+
+        # Top cities by salaried postings; ties go to the city that appears first
+        top_cities, _ = _top(city, paid_n, first, len(self.cities), top)
+
+        sel = np.isin(city, top_cities)
+        keys, sums, _, _ = _group({"city": city[sel], "years": years[sel]}, {"n": paid_n[sel], "sum": paid_sum[sel]}, {})
+        rows = [{"city": self.cities[c], "years": int(y), "avg_salary": int(s) / int(k), "job_count": int(k)}
+                for c, y, s, k in zip(keys["city"], keys["years"], sums["sum"], sums["n"])]
+
+        # Percentiles from the salary sketch cells of the same (city, years) groups
+        s = self.salaries
+        ok = (s["exp"] // 2 < max_years) & np.isin(s["city"], top_cities)
+        width = max_years + 1
+        groups, values = _percentiles(s["city"][ok].astype(np.int64) * width + s["exp"][ok] // 2, s["bucket"][ok], s["n"][ok])
+        at = np.searchsorted(keys["city"].astype(np.int64) * width + keys["years"], groups)
+        for q, v in values.items():
+            for i, value in zip(at, v): rows[i][f"p{q}"] = round(float(value))
+        return rows
+
+    def top_companies(self, top=10):
+        c = self.companies
+        if c is None or len(c["company"]) == 0: return []
+        order, counts = _top(c["company"], c["n"], c["first"], len(self.company_names), top)
+        return [{"company": self.company_names[i], "count": int(counts[i])} for i in order]
+
+
+class DashboardCube:
+    def __init__(self, df, filters, main=None, companies=None, salaries=None):
+        self._bind(df, filters)
+        n = len(df)
+        self.main = main if main is not None else Cube.build(*self.main_facts(np.arange(n)), n)
+        if companies is None and "company" in self.codes: companies = Cube.build(*self.company_facts(np.arange(n)), n)
+        self.companies = companies
+        self.salaries = salaries if salaries is not None else Cube.build(*self.salary_facts(np.arange(n)), n)
+
+    def _bind(self, df, filters):
+        """Per-row key and measure columns of df that entries are built from."""
+        self.df, self.filters = df, filters
+        self.cats = {k: df[c].cat.categories for k, c in CATEGORY_KEYS.items() if c in df.columns}
+        self.codes = {k: df[c].cat.codes.to_numpy() for k, c in CATEGORY_KEYS.items() if c in df.columns}
+        self.exp = df["min_experience"].to_numpy(dtype=np.float64)
+        self.exp_step = exp_step(self.exp)
+        if "location_type" in df.columns:
+            remote = df["location_type"].cat.categories.astype(str).str.lower().str.contains("remote", regex=False)
+            self.remote = np.append(np.asarray(remote, dtype=bool), False)[df["location_type"].cat.codes.to_numpy()]
+        else:
+            self.remote = np.zeros(len(df), dtype=bool)
+
+    def _dims(self, ids, period=WEEK):
+        post = self.filters.post[ids]
+        return {"country": self.codes["country"][ids], "job_role": self.codes["job_role"][ids], "exp": self.exp_step[ids],
+                "period": np.where(post == NO_DAY, NO_DAY, post // period)}
+
+    def main_facts(self, ids):
+        """One entry per row: (ids, keys, sums, mins)."""
+        sal = self.df["parsed_salary"].to_numpy()[ids].astype(np.int64)
+        lat, lon = self.df["lat"].to_numpy(dtype=np.float64)[ids], self.df["lon"].to_numpy(dtype=np.float64)[ids]
+        paid, geo, exp = sal > 0, ~np.isnan(lat) & ~np.isnan(lon), self.exp[ids]
+        keys = {**self._dims(ids), "city": self.codes["city"][ids]}
+        sums = {
+            "n": np.ones(len(ids), dtype=np.int64),
+            "paid_n": paid.astype(np.int64), "paid_sum": np.where(paid, sal, 0),
+            "exp_n": (~np.isnan(exp)).astype(np.int64), "exp_fx": np.rint(np.nan_to_num(exp) * SCALE).astype(np.int64),
+            "remote": self.remote[ids].astype(np.int64),
+            "geo_n": geo.astype(np.int64),
+            "lat_fx": np.where(geo, np.rint(np.nan_to_num(lat) * SCALE), 0).astype(np.int64),
+            "lon_fx": np.where(geo, np.rint(np.nan_to_num(lon) * SCALE), 0).astype(np.int64),
+        }
+        return ids, keys, sums, {"paid_first": np.where(paid, ids, NO_ROW).astype(np.int64)}
+
+    def company_facts(self, ids):
+        ids = ids[self.codes["company"][ids] >= 0]  # junk names are stored as missing
+        keys = {**self._dims(ids), "company": self.codes["company"][ids]}
+        return ids, keys, {"n": np.ones(len(ids), dtype=np.int64)}, {"first": ids.astype(np.int64)}
+
+    def salary_facts(self, ids):
+        sal = self.df["parsed_salary"].to_numpy()[ids].astype(np.int64)
+        ids, sal = ids[sal > 0], sal[sal > 0]
+        keys = {**self._dims(ids, SKETCH_PERIOD), "city": self.codes["city"][ids], "bucket": salary_bucket(sal)}
+        return ids, keys, {"n": np.ones(len(ids), dtype=np.int64)}, {}
+
+    @classmethod
+    def merge(cls, old, keep, df, filters):
+        """Incrementally updated cube for df = old.df[keep] followed by the new rows."""
+        cube = cls.__new__(cls)
+        cube._bind(df, filters)
+        # Old codes -> codes in df's (unioned) categories; the extra slot maps -1 to -1
+        remap = {k: np.append(cube.cats[k].get_indexer(old.cats[k]), -1) for k in old.cats if k in cube.cats}
+        cube.main = Cube.merge(old.main, keep, remap, cube.main_facts, len(df))
+        cube.companies = None
+        if old.companies is not None and "company" in cube.codes:
+            cube.companies = Cube.merge(old.companies, keep, remap, cube.company_facts, len(df))
+        elif "company" in cube.codes:
+            cube.companies = Cube.build(*cube.company_facts(np.arange(len(df))), len(df))
+        cube.salaries = Cube.merge(old.salaries, keep, remap, cube.salary_facts, len(df))
+        return cube
+
+    @staticmethod
+    def _mask(keys, countries, role, exp_max, period_from):
+        """Cells entirely inside the selection."""
+        m = np.ones(len(keys["period"]), dtype=bool)
+        if countries is not None: m &= np.isin(keys["country"], countries)
+        if role is not None: m &= keys["job_role"] == role
+        if exp_max is not None: m &= keys["exp"] <= 2 * np.floor(exp_max)
+        if period_from is not None: m &= keys["period"] > period_from
+        return m
+
+    def _row_mask(self, ids, countries, role, exp_max, cutoff):
+        """Rows of ids inside the selection."""
+        m = np.ones(len(ids), dtype=bool)
+        if countries is not None: m &= np.isin(self.codes["country"][ids], countries)
+        if role is not None: m &= self.codes["job_role"][ids] == role
+        if exp_max is not None: m &= self.exp[ids] <= exp_max
+        if cutoff is not None: m &= self.filters.post[ids] >= cutoff
+        return m
+
+    def _entries(self, cube, facts, period, filters, cutoff, exp_rows):
+        """Matching cells of cube plus the matching rows of its partially selected cells, one entry each."""
+        if cube is None: return None
+        f, (countries, role, exp_max), period_from, boundary = self.filters, filters, None, exp_rows
+        if cutoff is not None:
+            period_from = cutoff // period
+            # Whole periods after the cutoff come from the cells, the cutoff's own period row by row
+            lo, hi = np.searchsorted(f.post_sorted, [cutoff, (period_from + 1) * period], side="left")
+            boundary = np.union1d(boundary, f.post_order[lo:hi])
+        m = self._mask(cube.keys, countries, role, exp_max, period_from)
+        cells = {**{k: v[m] for k, v in cube.keys.items()}, **{k: v[m] for k, v in cube.sums.items()}, **{k: v[m] for k, v in cube.mins.items()}}
+        boundary = boundary[self._row_mask(boundary, countries, role, exp_max, cutoff)]
+        if len(boundary) == 0: return cells
+        _, keys, sums, mins = facts(boundary)
+        return _concat(cells, {**keys, **sums, **mins})
+
+    def select(self, countries=(), role=None, exp_max=None, days_ago=None):
+        """Selection for normalized structured filters (see process.filter_key)."""
+        codes = None
+        if countries:
+            codes = self.cats["country"].get_indexer(list(countries))
+            codes = codes[codes >= 0]
+            if len(codes) == 0: return self.rows(np.empty(0, dtype=np.int64))
+        role_code = None
+        if role is not None:
+            role_code = self.cats["job_role"].get_indexer([role])[0]
+            if role_code < 0: return self.rows(np.empty(0, dtype=np.int64))
+
+        cutoff = None
+        if days_ago is not None and days_ago > 0: cutoff = (pd.Timestamp.now() - pd.Timedelta(days=days_ago)).value
+        # Rows in (floor, exp_max] share their step cell with rows above exp_max
+        exp_rows = np.empty(0, dtype=np.int64)
+        if exp_max is not None and exp_max != np.floor(exp_max):
+            f = self.filters
+            lo, hi = np.searchsorted(f.exp_sorted, [np.floor(exp_max), exp_max], side="right")
+            exp_rows = np.sort(f.exp_order[lo:hi])
+
+        args = ((codes, role_code, exp_max), cutoff, exp_rows)
+        return Selection(self._entries(self.main, self.main_facts, WEEK, *args),
+                         self._entries(self.companies, self.company_facts, WEEK, *args),
+                         self.cats["city"], self.cats.get("company"),
+                         self._entries(self.salaries, self.salary_facts, SKETCH_PERIOD, *args))
+
+    def rows(self, ids):
+        """Selection over explicit row ids (keyword queries)."""
+        ids = np.asarray(ids, dtype=np.int64)
+        _, keys, sums, mins = self.main_facts(ids)
+        main = {**keys, **sums, **mins}
+        companies = None
+        if "company" in self.codes:
+            _, keys, sums, mins = self.company_facts(ids)
+            companies = {**keys, **sums, **mins}
+        _, keys, sums, _ = self.salary_facts(ids)
+        return Selection(main, companies, self.cats["city"], self.cats.get("company"), {**keys, **sums})
+
+    def state(self):
+        out = {f"main.{k}": v for k, v in self.main.state().items()}
+        if self.companies is not None: out.update({f"companies.{k}": v for k, v in self.companies.state().items()})
+        out.update({f"salaries.{k}": v for k, v in self.salaries.state().items()})
+        return out
+
+    @classmethod
+    def from_state(cls, df, filters, state):
+        parts = {"main": {}, "companies": {}, "salaries": {}}
+        for name, v in state.items(): parts[name.split(".")[0]][name.split(".", 1)[1]] = v
+        companies = Cube.from_state(parts["companies"]) if parts["companies"] else None
+        salaries = Cube.from_state(parts["salaries"]) if parts["salaries"] else None
+        return cls(df, filters, Cube.from_state(parts["main"]), companies, salaries)
@@ -21,13 +21,14 @@ CITY_COORDS = {
     'nagpur': [21.1458, 79.0882], 'nashik': [19.9975, 73.7898],
     'visakhapatnam': [17.6868, 83.2185], 'vizag': [17.6868, 83.2185],
     'bhubaneswar': [20.2961, 85.8245], 'guwahati': [26.1445, 91.7362],
+    'patna': [25.5941, 85.1376], 'thane': [19.2183, 72.9781],
 
     # --- GLOBAL HUBS ---
     'london': [51.5074, -0.1278], 'manchester': [53.4808, -2.2426],
     'new york': [40.7128, -74.0060], 'san francisco': [37.7749, -122.4194], 'los angeles': [34.0522, -118.2437],
     'austin': [30.2672, -97.7431], 'seattle': [47.6062, -122.3321], 'chicago': [41.8781, -87.6298],
     'berlin': [52.5200, 13.4050], 'munich': [48.1351, 11.5820], 'amsterdam': [52.3676, 4.9041],
-    'dublin': [53.3498, -6.2603], 'paris': [48.8566, 2.3522],
+    'dublin': [53.3498, -6.2603], 'paris': [48.8566, 2.3522], 'madrid': [40.4168, -3.7038],
     'singapore': [1.3521, 103.8198], 'dubai': [25.2048, 55.2708],
     'toronto': [43.6510, -79.3470], 'vancouver': [49.2827, -123.1207],
     'sydney': [-33.8688, 151.2093], 'melbourne': [-37.8136, 144.9631],
@@ -0,0 +1,153 @@
+import hashlib
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from cube import DashboardCube
+from geo import GeoGrid
+from indexes import FilterIndex, KeywordIndex, SkillsIndex
+from textstore import TextStore, segment_path
+
+# --- DATASET ---
+# One processed frame together with every index derived from it. A Dataset
+# is never mutated after construction: reloads and delta refreshes build a
+# new one and swap the module-level reference, so a request that grabbed the
+# old one keeps a consistent frame + indexes until it finishes.
+
+DEDUP_KEYS = ["job_id", "id"]
+TEXT_FIELDS = ["description"]  # kept in a TextStore, not the frame
+
+
+def dedup_key(df):
+    return next((k for k in DEDUP_KEYS if k in df.columns), None)
+
+
+def skills_index(df, junk_skills):
+    """SkillsIndex over df's raw skills column (every row empty when there is none)."""
+    return SkillsIndex(df["skills"] if "skills" in df.columns else pd.Series([[]] * len(df), dtype=object), junk_skills)
+
+
+def content_tag(df, post, seq):
+    """Digest of which postings a frame holds and in what order (job id, posting time, arrival seq).
+
+    Unlike the version counter it is the same in every worker process serving
+    the same rows, so ETags and cursors stay valid across them.
+    """
+    key = dedup_key(df)
+    h = hashlib.blake2b(digest_size=12)
+    h.update(np.int64(len(df)).tobytes())
+    if key is not None: h.update(pd.util.hash_array(df[key].astype(str).to_numpy(dtype=object)).tobytes())
+    h.update(np.ascontiguousarray(post).tobytes())
+    h.update(np.ascontiguousarray(seq, dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+
+class Dataset:
+    def __init__(self, df, skills, keywords, version, texts=None, make_cube=DashboardCube, seq=None, tag=None):
+        self.df = df
+        self.skills = skills
+        self.keywords = keywords
+        self.texts = texts or {}  # field -> TextStore
+        self.filters = FilterIndex(df)
+        self.cube = make_cube(df, self.filters)
+        self.geo = GeoGrid(df["lat"], df["lon"], df["city"])
+        self.version = version
+        # Arrival sequence number per row, increasing in row order and kept through merges:
+        # raw-jobs cursors resume from it, as row ids shift when a refresh replaces rows
+        self.seq = np.arange(len(df), dtype=np.int64) if seq is None else seq
+
+        # Newest posting (unix seconds); delta refreshes fetch from here on
+        post = self.filters.post[self.filters.post != np.iinfo(np.int64).min]
+        self.high_water = int(post.max() // 10**9) if len(post) else None
+        # Content identity (see content_tag); snapshots store it so a load doesn't rehash the rows
+        self.tag = tag if tag is not None else content_tag(df, self.filters.post, self.seq)
+
+    @classmethod
+    def build(cls, df, version, junk_skills, max_desc_chars=0, text_dir=None, stage=None, skills=None):
+        """Indexes a frame fresh out of the load pipeline (still holding raw skills).
+
+        With text_dir set, TEXT_FIELDS move out of the frame into segment files there.
+        stage(name, rows), if given, is a context manager timing each step.
+        skills is a SkillsIndex already built for df's rows (by the load workers).
+        """
+        stage = stage or (lambda name, rows=None: nullcontext({}))
+        df = df.reset_index(drop=True)
+        if skills is None:
+            with stage("skills", len(df)): skills = skills_index(df, junk_skills)
+        df = df.drop(columns=["skills"], errors="ignore")
+        with stage("keyword_index", len(df)): keywords = KeywordIndex(df, max_desc_chars)
+        texts = {}
+        if text_dir:
+            with stage("description_store", len(df)):
+                for f in [f for f in TEXT_FIELDS if f in df.columns]:
+                    texts[f] = TextStore.write(segment_path(text_dir), [df[f]])
+                df = df.drop(columns=list(texts))
+        with stage("filter_index_cube", len(df)): return cls(df, skills, keywords, version, texts)
+
+    def unseen(self, raw):
+        """Raw fetched rows minus the ones already merged: a known job id posted at or before high_water."""
+        key = dedup_key(raw)
+        if key is None or key not in self.df.columns or "posted_at" not in raw.columns or self.high_water is None: return raw
+        posted = pd.to_numeric(raw["posted_at"], errors="coerce")
+        seen = raw[key].astype(str).isin(self.df[key].astype(str)) & (posted <= self.high_water)
+        return raw[~seen.to_numpy()]
+
+    def merge(self, delta, version):
+        """New Dataset with delta's rows appended, replacing rows with the same job id."""
+        keep = np.ones(len(self.df), dtype=bool)
+        key = dedup_key(self.df)
+        if key is not None and key in delta.df.columns:
+            keep = ~self.df[key].isin(delta.df[key]).to_numpy()
+
+        old, new = self.df[keep], delta.df.copy()
+        align_categories(old, new)
+        df = pd.concat([old, new], ignore_index=True)
+        texts = {f: TextStore.concat(t, keep, delta.texts.get(f) or TextStore.missing(len(new))) for f, t in self.texts.items()}
+        first = int(self.seq[-1]) + 1 if len(self.seq) else 0
+        return Dataset(
+            df,
+            SkillsIndex.concat(self.skills, keep, delta.skills),
+            KeywordIndex.concat(self.keywords, keep, delta.keywords),
+            version,
+            texts,
+            lambda df, filters: DashboardCube.merge(self.cube, keep, df, filters),
+            np.concatenate([self.seq[keep], np.arange(first, first + len(new), dtype=np.int64)]),
+        )
+
+    def select_rows(self, ids, columns):
+        """Materializes only the requested columns for the selected rows."""
+        return self.df.iloc[ids, [self.df.columns.get_loc(c) for c in columns]]
+
+    def text(self, field, ids):
+        """Values of a frame or TextStore field for the selected rows."""
+        if field in self.texts: return self.texts[field].take(ids)
+        return self.df[field].take(ids)
+
+    def memory_report(self):
+        """Bytes held per frame column and per index, plus the on-disk text stores."""
+        columns = self.df.memory_usage(index=False, deep=True)
+        indexes = {
+            "filters": sum(a.nbytes for a in vars(self.filters).values() if isinstance(a, np.ndarray)),
+            "keywords": sum(a.nbytes for a in (self.keywords.postings, self.keywords.offsets, self.keywords.partial_rows)),
+            "skills": self.skills.codes.nbytes + self.skills.offsets.nbytes,
+            "texts": sum(t.seg.nbytes + t.start.nbytes + t.end.nbytes for t in self.texts.values()),
+            "cube": sum(a.nbytes for a in self.cube.state().values()),
+            "geo": self.geo.nbytes(),
+        }
+        return {
+            "rows": len(self.df),
+            "frame_bytes": int(columns.sum()),
+            "columns": {c: {"dtype": str(self.df[c].dtype), "bytes": int(b)} for c, b in columns.items()},
+            "index_bytes": {k: int(v) for k, v in indexes.items()},
+            "text_store_disk_bytes": {f: t.disk_bytes() for f, t in self.texts.items()},
+        }
+
+
+def align_categories(a, b):
+    """Gives shared categorical columns the same (sorted, unioned) categories so concat keeps them categorical."""
+    for col in a.columns:
+        if col not in b.columns or not isinstance(a[col].dtype, pd.CategoricalDtype): continue
+        other = b[col] if isinstance(b[col].dtype, pd.CategoricalDtype) else b[col].astype("category")
+        dtype = pd.CategoricalDtype(a[col].cat.categories.union(other.cat.categories))
+        a[col], b[col] = a[col].astype(dtype), other.astype(dtype)
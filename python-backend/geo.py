@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+from data.CITY_COORDS import CITY_COORDS
+
+# --- GEOCODER ---
+# Rows without a geopoint are placed from CITY_COORDS. Lookups run once per
+# distinct city, then once per distinct raw location for whatever is still
+# missing ("Whitefield, Bengaluru, Karnataka" resolves through "bengaluru").
+# The raw-location pass only accepts city entries: "Indianapolis, Indiana,
+# United States" stays unplaced instead of landing on the USA centroid. It is
+# skipped for cities that aren't places (Remote, Work From Home, ...).
+
+COORDS = pd.DataFrame(list(CITY_COORDS.values()), index=list(CITY_COORDS), columns=["lat", "lon"], dtype=float)
+# Country/region centroids in CITY_COORDS (its generic-fallback section)
+REGIONS = frozenset({"canada", "usa", "united states", "uk", "united kingdom", "india",
+                     "germany", "france", "australia", "europe", "pakistan"})
+CITIES = COORDS.drop(index=list(REGIONS & set(COORDS.index)))
+# Parsed cities that aren't places: their rows stay unplaced rather than borrow another part's
+# coordinates ("Remote, Singapore"), which would drag the per-city "Remote" marker around
+NON_PLACES = frozenset({"remote", "work from home", "wfh", "anywhere", "unknown", "global", "nan", ""})
+
+
+def _lookup(names, table=COORDS):
+    """(lat, lon) arrays for lowercase place names (NaN when unknown)."""
+    found = table.reindex(pd.Index(names, dtype=object))
+    return found["lat"].to_numpy(), found["lon"].to_numpy()
+
+
+def geocode(city, raw_location=None):
+    """(lat, lon) arrays from the city name, falling back to any comma-separated part of raw_location naming a city."""
+    codes, uniques = pd.factorize(pd.Series(city, dtype=object).astype(str).str.strip().str.lower())
+    ulat, ulon = _lookup(uniques)
+    lat, lon = ulat[codes], ulon[codes]
+
+    if raw_location is not None:
+        raw = pd.Series(raw_location, dtype=object).reset_index(drop=True)
+        place = ~pd.Index(uniques, dtype=object).isin(list(NON_PLACES))
+        todo = np.flatnonzero(np.isnan(lat) & place[codes] & raw.map(type).eq(str).to_numpy())
+        if len(todo):
+            rcodes, runiques = pd.factorize(raw.iloc[todo].str.lower())
+            parts = pd.Series(runiques, dtype=object).str.split(",").explode().str.strip()
+            plat, plon = _lookup(parts.to_numpy(), CITIES)
+            # First part that resolves, per distinct raw location
+            first = pd.DataFrame({"lat": plat, "lon": plon}, index=parts.index).groupby(level=0).first()
+            first = first.reindex(range(len(runiques)))
+            lat[todo], lon[todo] = first["lat"].to_numpy()[rcodes], first["lon"].to_numpy()[rcodes]
+    return lat, lon
+
+
+# --- GEO GRID ---
+# Each row gets one cell code on a 2^LEVELS x 2^LEVELS lon/lat grid with the
+# lon and lat bits interleaved (geohash bit order), so the cell at any
+# coarser level is a right shift of the same code. Map clusters for a
+# viewport group the visible rows by cell at a level picked from the zoom,
+# coarsening until they fit in max_clusters.
+
+LEVELS = 20              # finest cell ~38m x 19m
+MAX_CLUSTERS = 300
+NO_CELL = np.iinfo(np.uint64).max
+
+
+def _spread(v):
+    """Moves the low 32 bits of v to the even bit positions."""
+    v = v.astype(np.uint64)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF), (4, 0x0F0F0F0F0F0F0F0F),
+                        (2, 0x3333333333333333), (1, 0x5555555555555555)):
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def parse_bbox(bbox, zoom):
+    """(west, south, east, north) from "west,south,east,north", snapped outward to the zoom's grid.
+
+    Snapping makes nearby viewports share a cache entry and keeps clusters
+    on the map edges stable while panning. None means the whole world;
+    west > east means the box crosses the antimeridian (GeoGrid keeps
+    lon >= west or lon <= east for it).
+    """
+    if not bbox: return None
+    west, south, east, north = (float(v) for v in bbox.split(","))
+    if not south <= north: raise ValueError("bbox must be west,south,east,north")
+    if west > east: east += 360
+    step_lon, step_lat = 360 / 2 ** zoom, 180 / 2 ** zoom
+    west, east = np.floor(west / step_lon) * step_lon, np.ceil(east / step_lon) * step_lon
+    south, north = max(np.floor(south / step_lat) * step_lat, -90.0), min(np.ceil(north / step_lat) * step_lat, 90.0)
+    if east - west >= 360: return (-180.0, float(south), 180.0, float(north))
+    # Leaflet reports longitudes past +-180 once the world wraps
+    west, east = (west + 180) % 360 - 180, (east - 180) % 360 - 180
+    if east == -180: east = 180.0
+    return (float(west), float(south), float(east), float(north))
+
+
+class GeoGrid:
+    def __init__(self, lat, lon, city):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.has = ~(np.isnan(self.lat) | np.isnan(self.lon))
+        self.city_codes, self.cities = pd.factorize(city)
+
+        size = 2 ** LEVELS
+        x = np.clip(np.floor((np.nan_to_num(self.lon) + 180) / 360 * size), 0, size - 1)
+        y = np.clip(np.floor((np.nan_to_num(self.lat) + 90) / 180 * size), 0, size - 1)
+        self.code = (_spread(x) << np.uint64(1)) | _spread(y)
+        self.code[~self.has] = NO_CELL
+        # Rows with a position in cell order: big selections are a mask over this instead of a sort
+        self.order = np.argsort(self.code, kind="stable")[:np.count_nonzero(self.has)]
+
+    def nbytes(self):
+        return self.code.nbytes + self.has.nbytes + self.city_codes.nbytes + self.order.nbytes
+
+    def _visible(self, ids, bbox):
+        """Rows of ids with a position inside bbox, in cell order."""
+        if len(ids) * 16 < len(self.code):
+            ids = ids[self.has[ids]]
+            ids = ids[np.argsort(self.code[ids], kind="stable")]
+        else:
+            keep = np.zeros(len(self.code), dtype=bool)
+            keep[ids] = True
+            ids = self.order[keep[self.order]]
+        if bbox is None: return ids
+        west, south, east, north = bbox
+        lat, lon = self.lat[ids], self.lon[ids]
+        keep = (lat >= south) & (lat <= north)
+        keep &= ((lon >= west) & (lon <= east)) if west <= east else ((lon >= west) | (lon <= east))
+        return ids[keep]
+
+    def clusters(self, ids, zoom, bbox=None, max_clusters=MAX_CLUSTERS):
+        """Clusters of the rows in ids inside bbox: dominant city, count and mean position, largest first."""
+        ids = self._visible(ids, bbox)
+        if len(ids) == 0: return []
+        codes = self.code[ids]
+
+        # ~4 cells per map tile, coarser while there are too many
+        level = min(max(zoom + 2, 1), LEVELS)
+        while True:
+            cells = codes >> np.uint64(2 * (LEVELS - level))
+            starts = np.concatenate([[0], np.flatnonzero(cells[1:] != cells[:-1]) + 1])
+            if len(starts) <= max_clusters or level == 1: break
+            level -= 1
+
+        count = np.diff(np.append(starts, len(ids)))
+        lat = np.add.reduceat(self.lat[ids], starts) / count
+        lon = np.add.reduceat(self.lon[ids], starts) / count
+
+        # Most common city per cluster, for the label
+        cluster = np.repeat(np.arange(len(starts)), count)
+        pair = cluster.astype(np.int64) * (len(self.cities) + 1) + (self.city_codes[ids] + 1)
+        pairs, pair_count = np.unique(pair, return_counts=True)
+        owner = pairs // (len(self.cities) + 1)
+        best = np.lexsort((-pair_count, owner))
+        best = best[np.concatenate([[True], owner[best][1:] != owner[best][:-1]])]
+        names = np.append(np.asarray(self.cities, dtype=object), "Unknown")  # code -1 (no city) -> last
+        label = names[pairs[best] % (len(self.cities) + 1) - 1]
+
+        top = np.argsort(-count, kind="stable")[:max_clusters]
+        return [{"city": label[c], "count": int(count[c]), "lat": float(lat[c]), "lon": float(lon[c]),
+                 "cell": f"{level}/{int(cells[starts[c]])}"} for c in top]
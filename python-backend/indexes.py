@@ -0,0 +1,389 @@
+import pandas as pd
+import numpy as np
+import re
+from itertools import chain
+
+# --- FILTER INDEX ---
+# Built once per load so the dashboard filters become lookups and binary
+# searches over precomputed arrays instead of full column scans.
+
+
+def _group_rows(codes, n_values):
+    """Splits row ids by categorical code -> one sorted row-id array per value."""
+    valid = codes >= 0
+    order = np.argsort(codes, kind="stable")[np.count_nonzero(~valid):]
+    counts = np.bincount(codes[valid], minlength=n_values)
+    return np.split(order, np.cumsum(counts)[:-1]) if n_values else []
+
+
+class FilterIndex:
+    def __init__(self, df):
+        self.n = len(df)
+
+        # Categorical codes + per-value row ids for the equality filters
+        self.country_codes, self.country_lookup, self.country_rows = self._categorical(df["country"])
+        self.role_codes, self.role_lookup, self.role_rows = self._categorical(df["job_role"])
+
+        # Sorted arrays for the range filters (NaN / NaT sort out of range)
+        self.exp = df["min_experience"].to_numpy(dtype=np.float64)
+        self.exp_order = np.argsort(self.exp, kind="stable")
+        self.exp_sorted = self.exp[self.exp_order]
+
+        self.post = df["post_date"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        self.post_order = np.argsort(self.post, kind="stable")
+        self.post_sorted = self.post[self.post_order]
+
+        # Presorted row permutations for paging: sort key -> (ascending row order, sorted values)
+        salary = df["parsed_salary"].to_numpy(dtype=np.float64)
+        salary_order = np.argsort(salary, kind="stable")
+        self.orders = {
+            None: (np.arange(self.n), None),
+            "post_date": (self.post_order, self.post_sorted),
+            "min_experience": (self.exp_order, self.exp_sorted),
+            "parsed_salary": (salary_order, salary[salary_order]),
+        }
+
+    @staticmethod
+    def _categorical(col):
+        codes, uniques = pd.factorize(col)
+        lookup = {v: i for i, v in enumerate(uniques)}
+        return codes, lookup, _group_rows(codes, len(uniques))
+
+    def _filters(self, countries=None, role=None, exp_max=None, days_ago=None):
+        """(name, candidate count, candidate rows, per-row check) for each active filter; None if nothing can match."""
+        filters = []
+
+        if countries and "Global" not in countries:
+            codes = [self.country_lookup[c] for c in set(countries) if c in self.country_lookup]
+            if not codes: return None
+            wanted = np.array(codes)
+            filters.append((
+                "country",
+                sum(len(self.country_rows[c]) for c in codes),
+                lambda: np.concatenate([self.country_rows[c] for c in codes]),
+                lambda ids: np.isin(self.country_codes[ids], wanted),
+            ))
+
+        if role and role != "All Roles":
+            code = self.role_lookup.get(role)
+            if code is None: return None
+            filters.append((
+                "role",
+                len(self.role_rows[code]),
+                lambda: self.role_rows[code],
+                lambda ids: self.role_codes[ids] == code,
+            ))
+
+        if exp_max is not None:
+            k_exp = np.searchsorted(self.exp_sorted, exp_max, side="right")
+            filters.append((
+                "exp",
+                k_exp,
+                lambda: self.exp_order[:k_exp],
+                lambda ids: self.exp[ids] <= exp_max,
+            ))
+
+        if days_ago is not None and days_ago > 0:
+            cutoff = (pd.Timestamp.now() - pd.Timedelta(days=days_ago)).value
+            k_post = np.searchsorted(self.post_sorted, cutoff, side="left")
+            filters.append((
+                "days_ago",
+                self.n - k_post,
+                lambda: self.post_order[k_post:],
+                lambda ids: self.post[ids] >= cutoff,
+            ))
+        return filters
+
+    def select(self, countries=None, role=None, exp_max=None, days_ago=None):
+        """Returns the ascending row ids matching every structured filter."""
+        filters = self._filters(countries, role, exp_max, days_ago)
+        if filters is None: return np.empty(0, dtype=np.int64)
+        if not filters: return np.arange(self.n)
+
+        # Start from the most selective filter and check the rest on its rows only
+        filters.sort(key=lambda f: f[1])
+        ids = filters[0][2]()
+        for _, _, _, check in filters[1:]:
+            if len(ids) == 0: break
+            ids = ids[check(ids)]
+        return np.sort(ids)
+
+    def matcher(self, countries=None, role=None, exp_max=None, days_ago=None):
+        """mask(ids) function testing arbitrary row ids against the structured filters."""
+        filters = self._filters(countries, role, exp_max, days_ago)
+        def mask(ids):
+            if filters is None: return np.zeros(len(ids), dtype=bool)
+            keep = np.ones(len(ids), dtype=bool)
+            for _, _, _, check in filters: keep &= check(ids)
+            return keep
+        return mask
+
+    def selectivity(self, countries=None, role=None, exp_max=None, days_ago=None):
+        """Fraction of all rows each active filter keeps on its own."""
+        filters = self._filters(countries, role, exp_max, days_ago)
+        if filters is None: return {"unmatchable": 0.0}
+        return {name: count / self.n if self.n else 0.0 for name, count, _, _ in filters}
+
+
+# --- KEYWORD INDEX ---
+# Inverted index of word tokens over raw_role, job_role and description.
+# A keyword is looked up by its word tokens to get candidate rows, and the
+# exact substring test then only runs on those candidates.
+
+TOKEN_RE = r"\w+"
+TOKEN = re.compile(TOKEN_RE)
+KEYWORD_CHUNK_ROWS = 5000
+KEYWORD_FIELDS = ["raw_role", "job_role", "description"]
+
+
+def parse_keywords(keywords):
+    """Splits a keyword query into the substrings that must all be present.
+
+    Without double quotes the whole query is one substring (the historical
+    behaviour). With quotes, each "quoted phrase" and each bare word becomes
+    its own required term.
+    """
+    k = keywords.lower()
+    if '"' not in k: return [k]
+    terms = [a or b for a, b in re.findall(r'"([^"]+)"|(\S+)', k)]
+    return [t for t in terms if t.strip('"')] or [k]
+
+
+class KeywordIndex:
+    def __init__(self, df, max_desc_chars=0):
+        self.n = len(df)
+        fields = [f for f in KEYWORD_FIELDS if f in df.columns]
+        partial = np.zeros(self.n, dtype=bool)
+        vocab, codes, rows = {}, [], []
+        # Tokenized KEYWORD_CHUNK_ROWS rows at a time, each row's tokens deduplicated
+        # across fields first: only one chunk's token strings exist at once
+        for start in range(0, self.n, KEYWORD_CHUNK_ROWS):
+            tokens = None
+            for f in fields:
+                t = df[f].iloc[start:start + KEYWORD_CHUNK_ROWS].astype(str).str.lower()
+                if f == "description" and max_desc_chars:
+                    partial[start:start + len(t)] = (t.str.len() > max_desc_chars).to_numpy()
+                    t = t.str.slice(0, max_desc_chars)
+                sets = [set(TOKEN.findall(v)) if isinstance(v, str) else set() for v in t]
+                tokens = sets if tokens is None else [a | b for a, b in zip(tokens, sets)]
+            if not tokens: continue
+            chunk_codes, uniques = pd.factorize(np.fromiter(chain.from_iterable(tokens), dtype=object, count=sum(map(len, tokens))))
+            to_vocab = np.fromiter((vocab.setdefault(u, len(vocab)) for u in uniques), dtype=np.int64, count=len(uniques))
+            codes.append(to_vocab[chunk_codes].astype(np.int32))
+            rows.append(np.repeat(np.arange(start, start + len(tokens), dtype=np.int32), [len(r) for r in tokens]))
+
+        self.fields = fields
+        self.max_desc_chars = max_desc_chars
+        # Rows whose description was truncated can't be ruled out by the index
+        self.partial_rows = np.flatnonzero(partial)
+        self._set_postings(
+            np.concatenate(codes) if codes else np.empty(0, dtype=np.int32),
+            np.concatenate(rows) if rows else np.empty(0, dtype=np.int32),
+            list(vocab),
+        )
+
+    def _set_postings(self, codes, rows, vocab):
+        order = np.lexsort((rows, codes))
+        codes, rows = codes[order], rows[order]
+        keep = np.ones(len(rows), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+        codes, rows = codes[keep], rows[keep]
+
+        self.vocab = pd.Series(np.asarray(vocab, dtype=object))
+        self.postings = rows.astype(np.int32)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(vocab)))])
+
+    def _pairs(self):
+        return np.repeat(np.arange(len(self.vocab)), np.diff(self.offsets)), self.postings.astype(np.int64)
+
+    @classmethod
+    def concat(cls, old, keep, new):
+        """Index over old's rows where `keep` is True followed by all of new's rows."""
+        idx = cls.__new__(cls)
+        idx.n = int(keep.sum()) + new.n
+        idx.fields, idx.max_desc_chars = old.fields, old.max_desc_chars
+        new_pos = np.cumsum(keep) - 1
+
+        old_codes, old_rows = old._pairs()
+        kept = keep[old_rows]
+        vocab = pd.Index(old.vocab).append(pd.Index(new.vocab[~new.vocab.isin(old.vocab)]))
+        new_codes, new_rows = new._pairs()
+        new_codes = vocab.get_indexer(new.vocab)[new_codes]
+
+        idx.partial_rows = np.concatenate([new_pos[old.partial_rows[keep[old.partial_rows]]], new.partial_rows + (idx.n - new.n)])
+        codes = np.concatenate([old_codes[kept], new_codes])
+        # Tokens only dropped rows had are left out, as in a fresh build: the vocab is scanned on every query
+        used = np.unique(codes)
+        idx._set_postings(
+            np.searchsorted(used, codes),
+            np.concatenate([new_pos[old_rows[kept]], new_rows + (idx.n - new.n)]),
+            vocab[used],
+        )
+        return idx
+
+    def state(self):
+        """Arrays that fully describe the index (see from_state)."""
+        return {"vocab": self.vocab.to_numpy(dtype=object), "postings": self.postings, "offsets": self.offsets,
+                "partial_rows": self.partial_rows, "n": self.n, "fields": self.fields, "max_desc_chars": self.max_desc_chars}
+
+    @classmethod
+    def from_state(cls, state):
+        idx = cls.__new__(cls)
+        idx.vocab = pd.Series(state["vocab"], dtype=object)
+        idx.postings, idx.offsets, idx.partial_rows = state["postings"], state["offsets"], state["partial_rows"]
+        idx.n, idx.fields, idx.max_desc_chars = state["n"], state["fields"], state["max_desc_chars"]
+        return idx
+
+    def _token_rows(self, token):
+        """Rows containing any indexed token that has `token` as a substring."""
+        hits = np.flatnonzero(self.vocab.str.contains(token, regex=False).to_numpy())
+        if len(hits) == 0: return np.empty(0, dtype=np.int64)
+        if len(hits) == 1: return self.postings[self.offsets[hits[0]]:self.offsets[hits[0] + 1]]
+        return np.unique(np.concatenate([self.postings[self.offsets[h]:self.offsets[h + 1]] for h in hits]))
+
+    def candidates(self, term):
+        """Superset of the rows that can contain `term`, or None if unindexable."""
+        tokens = re.findall(TOKEN_RE, term)
+        if not tokens: return None
+        ids = None
+        for tok in sorted(set(tokens), key=len, reverse=True):
+            r = self._token_rows(tok)
+            ids = r if ids is None else np.intersect1d(ids, r, assume_unique=True)
+            if len(ids) == 0: break
+        if len(self.partial_rows): ids = np.union1d(ids, self.partial_rows)
+        return ids
+
+    def matcher(self, text, keywords):
+        """mask(ids) function for the keyword query; each term's candidates are looked up once.
+
+        text(field, ids) returns the field's values for those rows, so fields
+        kept outside the frame (descriptions) are only read for candidates.
+        """
+        terms, cands = parse_keywords(keywords), {}
+
+        def mask(ids):
+            keep = np.arange(len(ids))
+            for term in terms:
+                if term not in cands: cands[term] = self.candidates(term)
+                if cands[term] is not None: keep = keep[np.isin(ids[keep], cands[term], assume_unique=True)]
+                if len(keep) == 0: break
+                # Verification pass: exact substring test on candidate rows only
+                hit = np.zeros(len(keep), dtype=bool)
+                for f in self.fields:
+                    hit |= text(f, ids[keep]).astype(str).str.lower().str.contains(term, regex=False).to_numpy()
+                keep = keep[hit]
+            out = np.zeros(len(ids), dtype=bool)
+            out[keep] = True
+            return out
+        return mask
+
+    def search(self, text, keywords, ids):
+        """Narrows the row ids `ids` (order kept) to rows matching the keyword query."""
+        return ids[self.matcher(text, keywords)(ids)]
+
+
+def top_counts(codes, n, n_codes=None):
+    """Top-n most frequent non-negative codes as (codes, counts).
+
+    Ordered like value_counts: count descending, ties by first appearance.
+    """
+    codes = codes[codes >= 0]
+    counts = np.bincount(codes, minlength=n_codes or 0)
+    nonzero = np.count_nonzero(counts)
+    if nonzero == 0: return codes[:0], counts[:0]
+    k = min(n, nonzero)
+    # Only codes tied at or above the n-th count can make the cut
+    cand = np.flatnonzero(counts >= np.partition(counts, -k)[-k])
+    uniq, first = np.unique(codes[np.isin(codes, cand)], return_index=True)
+    order = np.lexsort((first, -counts[uniq]))[:k]
+    return uniq[order], counts[uniq[order]]
+
+
+# --- SKILLS INDEX ---
+# Skills are kept as CSR: one int32 vocabulary code per (row, skill) plus
+# per-row offsets, so top-N counts are a gather + bincount instead of
+# exploding Python lists on every request.
+
+
+def clean_skills_column(col, junk):
+    """Flattens a skills column into (row, skill) pairs, dropping junk and 1-char skills."""
+    col = col.reset_index(drop=True)
+    is_list = (col.map(type) == list).to_numpy()
+    parts = []
+    if is_list.any():
+        lists = col[is_list]
+        # Flatten by hand: explode() would turn None elements into NaN
+        flat = pd.Series(list(chain.from_iterable(lists)), index=np.repeat(lists.index, lists.str.len()), dtype=object)
+        parts.append(flat.map(str).str.lower())
+    if not is_list.all():
+        s = col[~is_list].map(str).str.replace("'", "", regex=False).str.replace("[", "", regex=False).str.replace("]", "", regex=False)
+        s = s.str.split(",").explode().str.strip().str.lower()
+        parts.append(s[s != ""])
+    flat = pd.concat(parts).sort_index(kind="stable").astype(object)
+    return flat[~flat.isin(junk) & (flat.str.len() >= 2)]
+
+
+class SkillsIndex:
+    def __init__(self, col, junk):
+        flat = clean_skills_column(col, junk)
+        codes, vocab = pd.factorize(flat)
+        self._set(codes, vocab, np.bincount(flat.index.to_numpy(dtype=np.int64), minlength=len(col)))
+
+    def _set(self, codes, vocab, lens):
+        self.n = len(lens)
+        self.codes = codes.astype(np.int32)
+        self.vocab = np.asarray(vocab, dtype=object)
+        self.offsets = np.concatenate([[0], np.cumsum(lens)])
+
+    @classmethod
+    def concat(cls, old, keep, new):
+        """Index over old's rows where `keep` is True followed by all of new's rows."""
+        idx = cls.__new__(cls)
+        kept = np.flatnonzero(keep)
+        vocab = pd.Index(old.vocab).append(pd.Index(new.vocab)).unique()
+        idx._set(
+            np.concatenate([old.gather(kept), vocab.get_indexer(new.vocab)[new.codes]]),
+            vocab,
+            np.concatenate([np.diff(old.offsets)[kept], np.diff(new.offsets)]),
+        )
+        return idx
+
+    @classmethod
+    def stack(cls, parts):
+        """Index over the rows of every part, in order (same vocab order as one index over all rows)."""
+        idx = cls.__new__(cls)
+        vocab = pd.Index(np.concatenate([p.vocab for p in parts])).unique()
+        idx._set(
+            np.concatenate([vocab.get_indexer(p.vocab)[p.codes] for p in parts]),
+            vocab,
+            np.concatenate([np.diff(p.offsets) for p in parts]),
+        )
+        return idx
+
+    def state(self):
+        """Arrays that fully describe the index (see from_state)."""
+        return {"vocab": self.vocab, "codes": self.codes, "offsets": self.offsets}
+
+    @classmethod
+    def from_state(cls, state):
+        idx = cls.__new__(cls)
+        idx.vocab, idx.codes, idx.offsets = state["vocab"], state["codes"], state["offsets"]
+        idx.n = len(idx.offsets) - 1
+        return idx
+
+    def gather(self, ids):
+        """Skill codes of the selected rows, in row order."""
+        if len(ids) == self.n: return self.codes
+        starts, lens = self.offsets[ids], self.offsets[np.asarray(ids) + 1] - self.offsets[ids]
+        total = int(lens.sum())
+        if total == 0: return self.codes[:0]
+        shift = np.repeat(starts - (np.cumsum(lens) - lens), lens)
+        return self.codes[np.arange(total) + shift]
+
+    def row(self, i):
+        return list(self.vocab[self.codes[self.offsets[i]:self.offsets[i + 1]]])
+
+    def top(self, ids, n=15):
+        """Top-n skills over the selected rows as a Series of counts (value_counts order)."""
+        codes, counts = top_counts(self.gather(ids), n, len(self.vocab))
+        return pd.Series(counts, index=self.vocab[codes], dtype="int64")
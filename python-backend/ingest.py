@@ -0,0 +1,155 @@
+import itertools
+import json
+import math
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# --- TYPESENSE INGESTION ---
+# Two ways to pull a whole collection:
+#   export: one streamed JSONL request (documents/export)
+#   search: concurrent q='*' page fetches with bounded parallelism
+# Both parse records into DataFrame batches as they arrive instead of
+# holding every hit dict in one list, and retry with exponential backoff.
+# stream_collection hands the batches on as they arrive, so a caller can
+# start processing before the pull finishes.
+
+BATCH_ROWS = 50000
+PER_PAGE = 250  # Typesense max
+
+
+class CollectionNotFound(Exception):
+    pass
+
+
+def base_url(config):
+    node = config['nodes'][0]
+    return f"{node['protocol']}://{node['host']}:{node['port']}"
+
+
+def _get(config, path, params=None):
+    url = base_url(config) + path
+    if params: url += "?" + urllib.parse.urlencode(params)
+    req = urllib.request.Request(url, headers={"X-TYPESENSE-API-KEY": config['api_key'] or ""})
+    try:
+        return urllib.request.urlopen(req, timeout=config.get('connection_timeout_seconds', 300))
+    except urllib.error.HTTPError as e:
+        if e.code == 404: raise CollectionNotFound(path) from e
+        raise
+
+
+def with_retry(fn, retries=3, backoff=0.5, on_retry=None):
+    """Calls fn(), retrying transient failures with exponential backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except CollectionNotFound:
+            raise
+        except Exception as e:
+            if attempt == retries: raise
+            if on_retry: on_retry(attempt + 1, e)
+            time.sleep(backoff * 2 ** attempt)
+
+
+def _batches(records, batch_rows=BATCH_ROWS):
+    """Groups an iterable of dicts into DataFrames of at most batch_rows rows."""
+    batch = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= batch_rows:
+            yield pd.DataFrame(batch)
+            batch = []
+    if batch: yield pd.DataFrame(batch)
+
+
+def export_collection(config, collection, batch_rows=BATCH_ROWS, filter_by=None, on_page=None, skip=0):
+    """Streams documents/export and yields DataFrame batches (on_page is called per batch).
+
+    The first `skip` documents are dropped unparsed, to resume an interrupted export.
+    """
+    with _get(config, f"/collections/{collection}/documents/export", {"filter_by": filter_by} if filter_by else None) as resp:
+        lines = (json.loads(line) for line in itertools.islice((line for line in resp if line.strip()), skip, None))
+        for i, batch in enumerate(_batches(lines, batch_rows), 1):
+            if on_page: on_page(i)
+            yield batch
+
+
+def search_page(config, collection, page, per_page=PER_PAGE, filter_by=None):
+    params = {"q": "*", "query_by": "title", "per_page": per_page, "page": page}
+    if filter_by: params["filter_by"] = filter_by
+    with _get(config, f"/collections/{collection}/documents/search", params) as resp:
+        return json.load(resp)
+
+
+def search_collection(config, collection, workers=8, per_page=PER_PAGE, retries=3, filter_by=None, on_page=None, on_retry=None):
+    """Fetches every search page concurrently and yields one DataFrame per page, in order."""
+    first = with_retry(lambda: search_page(config, collection, 1, per_page, filter_by), retries, on_retry=on_retry)
+    if on_page: on_page(1)
+    yield pd.DataFrame([h['document'] for h in first.get('hits', [])])
+    pages = math.ceil(first.get('found', 0) / per_page)
+
+    def fetch(page):
+        result = with_retry(lambda: search_page(config, collection, page, per_page, filter_by), retries, on_retry=on_retry)
+        if on_page: on_page(page)
+        return pd.DataFrame([h['document'] for h in result.get('hits', [])])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(fetch, range(2, pages + 1))
+
+
+def resume_export(config, collection, retries=3, backoff=0.5, filter_by=None, on_page=None, on_retry=None, batch_rows=BATCH_ROWS):
+    """export_collection that re-requests after a failure, skipping the documents already yielded."""
+    done = 0
+    for attempt in range(retries + 1):
+        try:
+            for batch in export_collection(config, collection, batch_rows, filter_by, on_page, skip=done):
+                done += len(batch)
+                yield batch
+            return
+        except CollectionNotFound:
+            raise
+        except Exception as e:
+            if attempt == retries: raise
+            if on_retry: on_retry(attempt + 1, e)
+            time.sleep(backoff * 2 ** attempt)
+
+
+def stream_collection(config, collections, mode="export", workers=8, retries=3, filter_by=None, on_page=None, on_retry=None):
+    """Yields the DataFrame batches of the first existing collection as they arrive.
+
+    filter_by is passed through to Typesense, e.g. "posted_at:>=1700000000"
+    for delta refreshes.
+    """
+    for collection in collections:
+        try:
+            if mode == "export": yield from resume_export(config, collection, retries, filter_by=filter_by, on_page=on_page, on_retry=on_retry)
+            else: yield from search_collection(config, collection, workers, retries=retries, filter_by=filter_by, on_page=on_page, on_retry=on_retry)
+            return
+        except CollectionNotFound:
+            # Raised by the first request, before anything was yielded
+            print(f"⚠️ Collection '{collection}' not found, trying next...")
+
+
+def fetch_collection(config, collections, mode="export", workers=8, retries=3, filter_by=None, on_page=None, on_retry=None):
+    """Pulls the first existing collection into a single DataFrame (None if empty)."""
+    frames = [f for f in stream_collection(config, collections, mode, workers, retries, filter_by, on_page, on_retry) if not f.empty]
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+
+def rechunk(frames, rows):
+    """Re-cuts a stream of DataFrames into chunks of `rows` rows (the last one may be shorter)."""
+    pending, n = [], 0
+    for frame in frames:
+        if frame is None or frame.empty: continue
+        pending.append(frame)
+        n += len(frame)
+        while n >= rows:
+            df = pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+            yield df.iloc[:rows].reset_index(drop=True)
+            rest = df.iloc[rows:]
+            pending, n = ([rest] if len(rest) else []), len(rest)
+    if pending: yield pd.concat(pending, ignore_index=True)
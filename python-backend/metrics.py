@@ -0,0 +1,227 @@
+import json
+import sys
+import threading
+import time
+from collections import Counter as _Tally, defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# --- METRICS ---
+# Counters, gauges and histograms rendered in the Prometheus text format, the
+# per-request phase split (filter / aggregate / serialize) and an opt-in
+# sampling profiler for slow requests. No client library: the registry is a
+# few dicts behind one lock.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+RATIO_BUCKETS = (0.0001, 0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 1)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values):
+    if not names: return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, help, labels=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self.lock = registry.lock
+        registry.metrics.append(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock: lines += self._samples()
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values = defaultdict(float)
+
+    def inc(self, amount=1, **labels):
+        with self.lock: self.values[self._key(labels)] += amount
+
+    def _samples(self):
+        return [f"{self.name}{_labels(self.labelnames, k)} {v}" for k, v in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self.lock: self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets=LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label values -> [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            s = self.series.get(key)
+            if s is None: s = self.series[key] = [0] * (len(self.buckets) + 2)
+            i = next((i for i, b in enumerate(self.buckets) if value <= b), len(self.buckets))
+            s[i] += 1
+            s[-1] += value
+
+    def _samples(self):
+        lines = []
+        for key, s in self.series.items():
+            cum = 0
+            for bound, count in zip(self.buckets + ("+Inf",), s[:-1]):
+                cum += count
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames + ('le',), key + (bound,))} {cum}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {s[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cum}")
+        return lines
+
+
+class Registry:
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.metrics = []
+
+    def counter(self, name, help, labels=()):
+        return Counter(self, self.prefix + name, help, labels)
+
+    def gauge(self, name, help, labels=()):
+        return Gauge(self, self.prefix + name, help, labels)
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return Histogram(self, self.prefix + name, help, labels, buckets=buckets)
+
+    def render(self):
+        return "\n".join(line for m in self.metrics for line in m.render()) + "\n"
+
+
+# --- REQUEST PHASES ---
+# The middleware opens a RequestTimer per request; code on the request path
+# adds its time to a phase with `with phase("filter"):` (or as a decorator).
+# Only the outermost phase counts, so nested helpers are not double counted.
+
+_current = ContextVar("request_timer", default=None)
+
+
+class RequestTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = defaultdict(float)
+        self.depth = 0
+        self.samples = None  # collapsed stack -> count, while the profiler samples this request
+
+
+@contextmanager
+def request_timer():
+    timer = RequestTimer()
+    token = _current.set(timer)
+    try: yield timer
+    finally: _current.reset(token)
+
+
+@contextmanager
+def phase(name):
+    timer = _current.get()
+    if timer is None or timer.depth:
+        yield
+        return
+    timer.depth += 1
+    profiler.attach(timer)
+    start = time.perf_counter()
+    try: yield
+    finally:
+        timer.phases[name] += time.perf_counter() - start
+        timer.depth -= 1
+
+
+# --- SAMPLING PROFILER ---
+# While enabled, a background thread snapshots the stacks of threads running
+# request phases every `interval` seconds. Requests slower than `slow_seconds`
+# keep their collapsed stacks (flamegraph.pl format) in a small ring buffer.
+
+class SamplingProfiler:
+    def __init__(self, enabled=False, interval=0.005, slow_seconds=0.5, keep=20, top=30):
+        self.interval, self.slow_seconds, self.top = interval, slow_seconds, top
+        self.active = {}  # thread id -> RequestTimer being sampled
+        self.slow = deque(maxlen=keep)
+        self.lock = threading.Lock()
+        self.thread = None
+        self.enabled = False
+        self.configure(enabled)
+
+    def configure(self, enabled=None, interval=None, slow_seconds=None):
+        with self.lock:
+            if interval is not None: self.interval = max(interval, 0.001)
+            if slow_seconds is not None: self.slow_seconds = slow_seconds
+            if enabled is not None: self.enabled = enabled
+            if self.enabled and (self.thread is None or not self.thread.is_alive()):
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        return self.settings()
+
+    def settings(self):
+        return {"enabled": self.enabled, "interval_ms": self.interval * 1000, "slow_ms": self.slow_seconds * 1000}
+
+    def attach(self, timer):
+        if not self.enabled: return
+        with self.lock:
+            if timer.samples is None: timer.samples = _Tally()
+            self.active[threading.get_ident()] = timer
+
+    def finish(self, timer, path, query, seconds):
+        """Detaches the request; keeps its stacks if it was slow."""
+        if timer.samples is None: return
+        with self.lock:
+            for tid in [t for t, r in self.active.items() if r is timer]: del self.active[tid]
+            if seconds < self.slow_seconds or not timer.samples: return
+            self.slow.append({
+                "path": path, "query": query, "seconds": seconds, "at": time.time(),
+                "samples": sum(timer.samples.values()),
+                "stacks": [{"stack": s, "samples": n} for s, n in timer.samples.most_common(self.top)],
+            })
+
+    def recent(self):
+        with self.lock: return list(self.slow)
+
+    def _run(self):
+        while self.enabled:
+            time.sleep(self.interval)
+            with self.lock:
+                if not self.active: continue
+                frames = sys._current_frames()
+                for tid, timer in self.active.items():
+                    frame = frames.get(tid)
+                    if frame is None: continue
+                    timer.samples[_collapse(frame)] += 1
+
+
+def _collapse(frame):
+    names = []
+    while frame is not None:
+        names.append(f"{frame.f_code.co_filename.rsplit('/', 1)[-1]}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+profiler = SamplingProfiler()
+
+
+def log(event, **fields):
+    """One JSON line per event, for log shippers."""
+    print(json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, default=str), flush=True)
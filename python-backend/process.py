@@ -5,14 +5,31 @@ import json
 import os
 from dotenv import load_dotenv
 
-import typesense
 import time
+import threading
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 import io
-from fastapi import FastAPI, Query
+import base64
+import zlib
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
 from datetime import datetime, timedelta
-from rapidfuzz import process, fuzz # Ensure you ran: pip install rapidfuzz
+from dataset import Dataset, dedup_key, skills_index
+import snapshot
+from cache import FilterCache
+from classifier import RoleClassifier
+from indexes import SkillsIndex
+from ingest import fetch_collection, rechunk, stream_collection
+import textstore
+import geo
+from data.CITY_COORDS import CITY_COORDS
+import metrics
+import responses
 
 app = FastAPI()
 
@@ -23,7 +40,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-cached_df = None
+dataset = None  # current Dataset; replaced wholesale on every (re)load
+dataset_version = 0
+refresh_lock = threading.RLock()
 load_dotenv()
 
 # --- CONFIGURATION ---
@@ -36,6 +55,84 @@ TYPESENSE_CONFIG = {
     'api_key': os.getenv('TYPESENSE_API_KEY'),
     'connection_timeout_seconds': 300
 }
+TYPESENSE_COLLECTIONS = ['jobs', 'job_postings']
+# "export" streams documents/export; "search" pages through q='*' concurrently
+TYPESENSE_FETCH_MODE = os.getenv('TYPESENSE_FETCH_MODE', 'export')
+TYPESENSE_FETCH_WORKERS = int(os.getenv('TYPESENSE_FETCH_WORKERS', '8'))
+# Processed snapshot location; bump PIPELINE_VERSION whenever prepare_frame's output changes
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', 'snapshot')
+PIPELINE_VERSION = 3
+# Delta refresh cadence for new postings (0 disables the background refresher)
+REFRESH_INTERVAL_SECONDS = int(os.getenv('REFRESH_INTERVAL_SECONDS', '300'))
+# Full loads parse LOAD_CHUNK_ROWS-row chunks on LOAD_WORKERS processes (0 = in this process);
+# loads under LOAD_POOL_MIN_ROWS rows are parsed in one pass here, as spawning the pool costs more
+LOAD_WORKERS = int(os.getenv('LOAD_WORKERS', str(os.cpu_count() or 1)))
+LOAD_CHUNK_ROWS = int(os.getenv('LOAD_CHUNK_ROWS', '25000'))
+LOAD_POOL_MIN_ROWS = int(os.getenv('LOAD_POOL_MIN_ROWS', '200000'))
+
+# Index only the first N KB of each description (0 = whole text)
+KEYWORD_INDEX_DESC_KB = int(os.getenv('KEYWORD_INDEX_DESC_KB', '0'))
+# Descriptions are kept on disk here and only read by keyword search
+DESCRIPTION_STORE_DIR = os.getenv('DESCRIPTION_STORE_DIR', 'descriptions')
+
+# JSON lines for every load, refresh and request (alongside the emoji prints)
+STRUCTURED_LOGS = os.getenv('STRUCTURED_LOGS', '0') == '1'
+
+# --- METRICS (Prometheus text format at /metrics) ---
+registry = metrics.Registry("jobintel_")
+stage_seconds = registry.gauge("load_stage_seconds", "Duration of each stage in the last load or delta refresh", ["stage"])
+stage_rows = registry.gauge("load_stage_rows", "Rows handled by each stage in the last load or delta refresh", ["stage"])
+loads_total = registry.counter("loads_total", "Completed loads by kind (snapshot, full, delta)", ["kind"])
+typesense_pages = registry.counter("typesense_pages_total", "Typesense search pages or export batches fetched")
+typesense_retries = registry.counter("typesense_retries_total", "Typesense requests retried")
+request_seconds = registry.histogram("request_duration_seconds", "Request latency: total and its filter, aggregate and serialize (rest of the request) phases", ["path", "phase"])
+requests_total = registry.counter("requests_total", "Requests by path and status", ["path", "status"])
+filter_seconds = registry.histogram("filter_compute_seconds", "Uncached filter computations by filter combination, for row ids or cube sums", ["filters", "target"])
+filter_selectivity = registry.histogram("filter_selectivity", "Fraction of rows each filter keeps (keywords: of the structured matches)", ["filter"], metrics.RATIO_BUCKETS)
+dataset_rows = registry.gauge("dataset_rows", "Rows in the current dataset")
+dataset_version_gauge = registry.gauge("dataset_version", "Version of the current dataset")
+dataset_bytes = registry.gauge("dataset_bytes", "Bytes held by the current dataset (frame and indexes in memory, text on disk)", ["part"])
+cache_stats_gauge = registry.gauge("cache", "Filter and response cache size and counters", ["cache", "stat"])
+
+# Sampling profiler for slow requests; also switchable at runtime through POST /profiler
+metrics.profiler.configure(
+    enabled=os.getenv('PROFILER_ENABLED', '0') == '1',
+    interval=float(os.getenv('PROFILER_INTERVAL_MS', '5')) / 1000,
+    slow_seconds=float(os.getenv('PROFILER_SLOW_MS', '500')) / 1000,
+)
+
+# --- STAGE TIMINGS ---
+load_stages = {}  # stage -> seconds, from the most recent load or delta refresh
+
+@contextmanager
+def stage(name, rows=None):
+    """Times a load step; the caller can fill in info["rows"] once it knows the count."""
+    info = {"rows": rows}
+    start = time.perf_counter()
+    try: yield info
+    finally: record_stage(name, time.perf_counter() - start, info["rows"])
+
+def record_stage(name, seconds, rows=None):
+    load_stages[name] = seconds
+    stage_seconds.set(seconds, stage=name)
+    if rows is not None: stage_rows.set(rows, stage=name)
+
+def loaded(kind):
+    loads_total.inc(kind=kind)
+    if STRUCTURED_LOGS: metrics.log("load", kind=kind, version=dataset.version, rows=len(dataset.df), stages=load_stages)
+
+# Filtered row ids (and cube selections) shared across endpoints for identical filters
+filter_cache = FilterCache(
+    maxsize=int(os.getenv('FILTER_CACHE_SIZE', '256')),
+    ttl=float(os.getenv('FILTER_CACHE_TTL', '300')),
+    maxbytes=int(float(os.getenv('FILTER_CACHE_MB', '256')) * 2**20),
+)
+# Encoded response bodies by ETag: a repeated request skips aggregation, JSON encoding and compression
+response_cache = FilterCache(
+    maxsize=int(os.getenv('RESPONSE_CACHE_SIZE', '256')),
+    ttl=filter_cache.ttl,
+    maxbytes=int(float(os.getenv('RESPONSE_CACHE_MB', '64')) * 2**20),
+)
 
 # --- 1. CONFIGURATION ---
 
@@ -55,29 +152,6 @@ JUNK_SKILLS = [
     "full time", "part time", "contract", "permanent", "temporary", "internship", "fresher"
 ]
 
-CITY_COORDS = {
-    'bengaluru': [12.9716, 77.5946], 'bangalore': [12.9716, 77.5946],
-    'hyderabad': [17.3850, 78.4867], 'secunderabad': [17.4399, 78.4983],
-    'chennai': [13.0827, 80.2707], 'mumbai': [19.0760, 72.8777],
-    'pune': [18.5204, 73.8567], 'delhi': [28.7041, 77.1025], 'new delhi': [28.6139, 77.2090],
-    'noida': [28.5355, 77.3910], 'gurgaon': [28.4595, 77.0266], 'gurugram': [28.4595, 77.0266],
-    'kolkata': [22.5726, 88.3639], 'ahmedabad': [23.0225, 72.5714],
-    'jaipur': [26.9124, 75.7873], 'chandigarh': [30.7333, 76.7794],
-    'indore': [22.7196, 75.8577], 'kochi': [9.9312, 76.2673],
-    'trivandrum': [8.5241, 76.9366], 'coimbatore': [11.0168, 76.9558], 'lucknow': [26.8467, 80.9462], 
-    'nagpur': [21.1458, 79.0882], 'surat': [21.1702, 72.8311],
-    'bhopal': [23.2599, 77.4126], 'patna': [25.5941, 85.1376],
-    'kanpur': [26.4499, 80.3319], 'thane': [19.2183, 72.9781], 'navi mumbai': [19.0330, 73.0297],
-    'london': [51.5074, -0.1278], 'new york': [40.7128, -74.0060],
-    'san francisco': [37.7749, -122.4194], 'berlin': [52.5200, 13.4050],
-    'singapore': [1.3521, 103.8198], 'dubai': [25.2048, 55.2708],
-    'sydney': [-33.8688, 151.2093], 'tokyo': [35.6762, 139.6503],
-    'paris': [48.8566, 2.3522], 'toronto': [43.6510, -79.3470],
-    'amsterdam': [52.3676, 4.9041], 'madrid': [40.4168, -3.7038],
-    'los angeles': [34.0522, -118.2437], 'chicago': [41.8781, -87.6298],
-    'austin': [30.2672, -97.7431], 'seattle': [47.6062, -122.3321]
-}
-
 # --- 4. EXPANDED DICTIONARY (Fixed Missing Categories) ---
 ROLE_MAPPINGS = {
     # --- 1. LEADERSHIP & STRATEGY ---
@@ -127,6 +201,9 @@ ROLE_MAPPINGS = {
     "Retail & Hospitality": ["store manager", "retail", "chef", "cook", "restaurant", "hotel", "housekeeping", "front desk", "receptionist", "barista"],
 }
 
+# Title -> role memo survives restarts; it is discarded when ROLE_MAPPINGS changes
+role_classifier = RoleClassifier(ROLE_MAPPINGS, memo_path=os.getenv('ROLE_MEMO_PATH', 'role_memo.json'))
+
 
 # --- HELPERS ---
 def clean_salary_aggressive(x):
@@ -146,69 +223,161 @@ def clean_experience_aggressive(x):
     if not nums: return 0
     return float(nums[0])
 
-# --- TYPESENSE FETCHER (SEARCH LOOP - COMPATIBLE WITH YOUR KEY) ---
-def fetch_from_typesense():
+def map_unique(col, fn):
+    """Runs a scalar parser once per distinct value and broadcasts the results."""
+    codes, uniques = pd.factorize(col)
+    # Missing values get code -1, which picks the trailing fn(nan) entry
+    values = np.array([fn(u) for u in uniques] + [fn(np.nan)])
+    return values[codes]
+
+# --- COMPACT LAYOUT ---
+# Only the columns some endpoint reads survive the load; skills and description
+# are consumed by Dataset.build (skills index, description store).
+KEEP_COLUMNS = ["job_id", "id", "raw_role", "job_role", "city", "country", "lat", "lon", "parsed_salary",
+                "min_experience", "post_date", "location_type", "job_type", "apply_url", "company",
+                "skills", "description"]
+CATEGORY_COLUMNS = ["job_role", "city", "country", "company", "location_type", "job_type"]
+JUNK_COMPANIES = ["Nan", "None", "Null", "Unknown", "Confidential", "Company Name", "Private", "Hidden", "Client Of"]
+
+def normalize_companies(col):
+    """Title-cased company names; junk values and "Client Of ..." become missing."""
+    names = col.astype(str).str.title().str.strip()
+    return names.where(~names.isin(JUNK_COMPANIES) & ~names.str.startswith("Client Of", na=False))
+
+def narrow_numeric(col):
+    """Smallest integer dtype when every value is a whole number, else unchanged.
+
+    Floats are never narrowed to float32: pandas sums float32 in float32, which
+    would shift averages. lat/lon stay float64 for the same reason.
+    """
+    v = col.to_numpy()
+    if v.dtype.kind == "f" and not (np.isfinite(v).all() and (v == np.round(v)).all()): return col
+    return pd.to_numeric(col.astype(np.int64), downcast="integer")
+
+def compact_frame(df):
+    df = df[[c for c in KEEP_COLUMNS if c in df.columns]].copy()
+    for c in CATEGORY_COLUMNS:
+        if c in df.columns: df[c] = df[c].astype("category")
+    for c in ["parsed_salary", "min_experience"]: df[c] = narrow_numeric(df[c])
+    return df
+
+CITY_FIX = {"Bangalore": "Bengaluru", "Gurgaon": "Gurugram", "Bombay": "Mumbai", "Us": "Remote", "India": "Remote"}
+
+def parse_locations(raw_location):
+    """Splits raw locations into (city, country), working on distinct values only."""
+    codes, uniques = pd.factorize(raw_location)
+    u = pd.Series(uniques, dtype=object)
+    is_str = (u.map(type) == str).to_numpy()
+    s = u.where(is_str, "")
+    low = s.str.lower()
+
+    city = s.str.split(",", n=1).str[0].str.strip().str.title().replace(CITY_FIX)
+    country = s.str.rsplit(",", n=1).str[-1].str.strip().str.title().where(s.str.contains(",", regex=False), "Global")
+    india = (low.str.contains("india", regex=False) & ~low.str.contains("indiana", regex=False)) | low.str.contains("bengaluru|mumbai|delhi|pune")
+    usa = low.str.contains("united states", regex=False) | low.str.contains(" usa", regex=False)
+    country = np.select([india.to_numpy(), usa.to_numpy()], ["India", "USA"], default=country.to_numpy()).astype(object)
+    city = np.where(city.to_numpy() == country, "Remote", city.to_numpy()).astype(object)
+
+    city[~is_str], country[~is_str] = "Unknown", "Global"
+    city, country = np.append(city, "Unknown"), np.append(country, "Global")
+    return city[codes], country[codes]
+
+def parse_latlon_value(val):
+    if not isinstance(val, str): return np.nan, np.nan
+    try:
+        clean = val.replace('[', '').replace(']', '').strip()
+        if clean:
+            parts = clean.split(',')
+            if len(parts) == 2:
+                return float(parts[0]), float(parts[1])
+    except ValueError: pass
+    return np.nan, np.nan
+
+def parse_latlon(latlon, city, raw_location=None):
+    """Returns (lat, lon) arrays from the latlon column, falling back to CITY_COORDS."""
+    lat, lon = np.full(len(city), np.nan), np.full(len(city), np.nan)
+    if latlon is not None:
+        kinds = latlon.map(type)
+
+        # CSV cache: "[lat, lon]" strings, parsed once per distinct string
+        is_str = (kinds == str).to_numpy()
+        if is_str.any():
+            pairs = map_unique(latlon[is_str], parse_latlon_value)
+            lat[is_str], lon[is_str] = pairs[:, 0], pairs[:, 1]
+
+        # Live Typesense: [lat, lon] geopoint lists
+        is_list = (kinds == list).to_numpy()
+        if is_list.any():
+            lists = latlon[is_list]
+            ok = (lists.str.len() == 2).to_numpy()
+            if ok.any():
+                pairs = pd.DataFrame(lists[ok].tolist()).apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, copy=True)
+                pairs[np.isnan(pairs).any(axis=1)] = np.nan
+                rows = np.flatnonzero(is_list)[ok]
+                lat[rows], lon[rows] = pairs[:, 0], pairs[:, 1]
+
+    fb_lat, fb_lon = geo.geocode(city, raw_location)
+    use = np.isnan(lat) & ~np.isnan(fb_lat)
+    lat[use], lon[use] = fb_lat[use], fb_lon[use]
+    return lat, lon
+
+# --- TYPESENSE FETCHER (STREAMED EXPORT OR CONCURRENT SEARCH PAGES) ---
+def log_page(page):
+    typesense_pages.inc()
+    if page % 10 == 0: print(f"   ...fetched page {page}...")
+
+def log_retry(attempt, e):
+    typesense_retries.inc()
+    print(f"🔁 Typesense retry {attempt}: {e}")
+
+class FetchError(Exception):
+    pass
+
+def fetch_from_typesense(use_cache=True):
+    """Yields raw frames: the local cache in one piece, or Typesense batches as they stream in.
+
+    A complete pull is written to live_cache.csv; a failed one raises FetchError.
+    """
     # 1. Cache Check
-    if os.path.exists("live_cache.csv"):
+    if use_cache and os.path.exists("live_cache.csv"):
         if (time.time() - os.path.getmtime("live_cache.csv")) < 86400:
             print("⚡ Loading from Local Cache...")
-            return pd.read_csv("live_cache.csv", low_memory=False)
-
-    print("📡 Connecting to Typesense Cloud...")
+            with stage("fetch") as info:
+                df = pd.read_csv("live_cache.csv", low_memory=False)
+                info["rows"] = len(df)
+            yield df
+            return
+
+    print(f"📡 Connecting to Typesense Cloud ({TYPESENSE_FETCH_MODE} mode)...")
+    frames = []
     try:
-        client = typesense.Client(TYPESENSE_CONFIG)
-        all_jobs = []
-        search_params = {
-            'q': '*',
-            'query_by': 'title, location',
-            'per_page': 250, # Max allowed per page
-        }
-        
-        print("⏳ Fetching Live Jobs via Search API...")
-        
-        page = 1
-        # Loop to get all data
-        while True:
-            search_params['page'] = page
-            try:
-                results = client.collections['jobs'].documents.search(search_params)
-            except:
-                results = client.collections['job_postings'].documents.search(search_params)
-            
-            if 'hits' in results and len(results['hits']) > 0:
-                for hit in results['hits']:
-                    all_jobs.append(hit['document'])
-                
-                # Progress Log
-                if len(all_jobs) % 2500 == 0:
-                    print(f"   ...fetched {len(all_jobs)} jobs...")
-                
-                page += 1
-            else:
-                print("✅ Finished fetching.")
-                break
-        
-        df = pd.DataFrame(all_jobs)
-        if not df.empty:
-            df.to_csv("live_cache.csv", index=False)
-            print(f"✅ Total Jobs Loaded: {len(df)}")
-            return df
-        else:
-            print("❌ No jobs found.")
-            return None
-
+        # Timed until the last batch arrives; the load workers parse earlier batches meanwhile
+        with stage("fetch") as info:
+            for batch in stream_collection(TYPESENSE_CONFIG, TYPESENSE_COLLECTIONS, mode=TYPESENSE_FETCH_MODE,
+                                           workers=TYPESENSE_FETCH_WORKERS, on_page=log_page, on_retry=log_retry):
+                if batch.empty: continue
+                frames.append(batch)
+                info["rows"] = sum(len(f) for f in frames)
+                yield batch
     except Exception as e:
         print(f"❌ Typesense Error: {e}")
-        return None
+        raise FetchError(e) from e
 
-def load_data_internal():
-    global cached_df
+    if not frames:
+        print("❌ No jobs found.")
+        return
+    pd.concat(frames, ignore_index=True).to_csv("live_cache.csv", index=False)
+    print(f"✅ Total Jobs Loaded: {info['rows']}")
 
-    df = fetch_from_typesense()
-    if df is None or df.empty:
-        try: df = pd.read_csv("jobs.csv", low_memory=False)
-        except: return
+def prepare_frame(df):
+    """Runs raw Typesense/CSV rows through classification and parsing."""
+    print("🧠 Classifying Roles (Fuzzy Logic)...")
+    df = parse_frame(df)
+    print("✅ Classification Complete.")
+    with stage("compact", len(df)): return compact_frame(df)
 
+def parse_frame(df):
+    """prepare_frame without the final compaction; row-wise, so chunks can be parsed separately."""
     df.columns = df.columns.str.strip().str.lower()
     
     rename_map = {
@@ -222,219 +391,588 @@ def load_data_internal():
     }
     df.rename(columns=rename_map, inplace=True)
 
-    # --- FUZZY CLASSIFIER (OPTIMIZED) ---
-    print("🧠 Classifying Roles (Fuzzy Logic)...")
-    unique_titles = df['raw_role'].unique()
-    title_map = {}
-
-    for title in unique_titles:
-        if not isinstance(title, str): 
-            title_map[title] = "Other"
-            continue
-            
-        t_lower = title.lower()
-        matched_group = "Other"
-        
-        # 1. Exact Substring Match (Fast)
-        for group, keywords in ROLE_MAPPINGS.items():
-            if any(k in t_lower for k in keywords):
-                matched_group = group
-                break
-        
-        # 2. Fuzzy Match (If Exact Failed)
-        if matched_group == "Other":
-            # Check against all keywords using partial match
-            best_score = 0
-            for group, keywords in ROLE_MAPPINGS.items():
-                match = process.extractOne(t_lower, keywords, scorer=fuzz.partial_ratio)
-                if match and match[1] > 85: # Strict Threshold
-                    if match[1] > best_score:
-                        best_score = match[1]
-                        matched_group = group
-
-        title_map[title] = matched_group
-
-    df["job_role"] = df["raw_role"].map(title_map)
-    print("✅ Classification Complete.")
+    # --- ROLE CLASSIFIER (Aho-Corasick + batched fuzzy, memoized) ---
+    with stage("classify", len(df)):
+        title_map = role_classifier.classify(df['raw_role'].unique())
+        df["job_role"] = df["raw_role"].map(title_map)
 
     # Location Parsing
-    if "raw_location" in df.columns:
-        def parse_location(loc):
-            if not isinstance(loc, str): return "Unknown", "Global"
-            parts = [p.strip() for p in loc.split(',')]
-            
-            raw_city = parts[0].title()
-            CITY_FIX = {"Bangalore": "Bengaluru", "Gurgaon": "Gurugram", "Bombay": "Mumbai", "Us": "Remote", "India": "Remote"}
-            city = CITY_FIX.get(raw_city, raw_city)
-
-            country = parts[-1].title() if len(parts) > 1 else "Global"
-            loc_lower = loc.lower()
-            if "india" in loc_lower and "indiana" not in loc_lower: country = "India"
-            elif any(c in loc_lower for c in ['bengaluru', 'mumbai', 'delhi', 'pune']): country = "India"
-            elif "united states" in loc_lower or " usa" in loc_lower: country = "USA"
-            
-            if city == country: city = "Remote"
-            return city, country
-
-        df[['city', 'country']] = df['raw_location'].apply(lambda x: pd.Series(parse_location(x)))
-    else:
-        df["city"], df["country"] = "Unknown", "Global"
+    with stage("location", len(df)):
+        if "raw_location" in df.columns:
+            df["city"], df["country"] = parse_locations(df["raw_location"])
+        else:
+            df["city"], df["country"] = "Unknown", "Global"
 
     # LatLon
-    def parse_latlon_hybrid(row):
-        val = row.get("latlon")
-        lat, lon = None, None
-        try:
-            if isinstance(val, list) and len(val) == 2:
-                lat, lon = float(val[0]), float(val[1])
-            elif isinstance(val, str):
-                clean = val.replace('[', '').replace(']', '').strip()
-                if clean:
-                    parts = clean.split(',')
-                    if len(parts) == 2:
-                        lat, lon = float(parts[0]), float(parts[1])
-        except: pass
-
-        if (lat is None or pd.isna(lat)) and isinstance(row.get("city"), str):
-            city_key = row["city"].lower()
-            if city_key in CITY_COORDS:
-                lat, lon = CITY_COORDS[city_key]
-        return lat, lon
-
-    df[['lat', 'lon']] = df.apply(lambda x: pd.Series(parse_latlon_hybrid(x)), axis=1)
+    with stage("latlon", len(df)):
+        df["lat"], df["lon"] = parse_latlon(df["latlon"] if "latlon" in df.columns else None, df["city"], df.get("raw_location"))
 
     # Metrics
-    if "ctc" in df.columns: df["parsed_salary"] = df["ctc"].astype(str).apply(clean_salary_aggressive)
-    else: df["parsed_salary"] = 0
-    
-    if "min_experience" in df.columns: df["min_experience"] = df["min_experience"].astype(str).apply(clean_experience_aggressive)
-    else: df["min_experience"] = 0
-
-    if "posted_at" in df.columns:
-        df["post_date"] = pd.to_numeric(df["posted_at"], errors='coerce')
-        df["post_date"] = pd.to_datetime(df["post_date"], unit='s', errors='coerce')
-    else:
-        df["post_date"] = pd.NaT
-
-    # Skills Cleaning
-    if "skills" in df.columns:
-        def clean_skills(x):
-            if isinstance(x, list): raw_list = [str(s).lower() for s in x]
-            else: raw_list = [s.strip().lower() for s in str(x).replace("'", "").replace("[", "").replace("]", "").split(",") if s.strip()]
-            
-            final_list = []
-            for s in raw_list:
-                if any(junk == s for junk in JUNK_SKILLS): continue
-                if len(s) < 2: continue
-                final_list.append(s)
-            return final_list
-        df["skills"] = df["skills"].apply(clean_skills)
-
-    cached_df = df
-    print(f"Data Loaded: {len(df)} rows.")
+    with stage("metrics", len(df)):
+        if "ctc" in df.columns: df["parsed_salary"] = map_unique(df["ctc"], lambda x: clean_salary_aggressive(str(x)))
+        else: df["parsed_salary"] = 0
+
+        if "min_experience" in df.columns: df["min_experience"] = map_unique(df["min_experience"], lambda x: clean_experience_aggressive(str(x)))
+        else: df["min_experience"] = 0
+
+        if "posted_at" in df.columns:
+            df["post_date"] = pd.to_numeric(df["posted_at"], errors='coerce')
+            df["post_date"] = pd.to_datetime(df["post_date"], unit='s', errors='coerce')
+        else:
+            df["post_date"] = pd.NaT
+
+    # Company names are normalized once here instead of on every /companies call
+    with stage("company", len(df)):
+        if "company_name" in df.columns: df["company"] = normalize_companies(df["company_name"])
+    return df
+
+# --- PARALLEL LOAD (chunked pipeline on a process pool) ---
+# A full load re-cuts the raw rows into LOAD_CHUNK_ROWS-row chunks. Once
+# LOAD_POOL_MIN_ROWS rows have arrived, each chunk goes to a worker process as
+# soon as the fetch produces it, so parsing, classification and skills
+# cleaning overlap the rest of the Typesense download. Results come back in
+# chunk order: the concatenated frame and the stacked skills index equal a
+# single pass over all rows. Workers are spawned (not forked), as the server
+# has threads running by then.
+
+def init_load_worker():
+    # Workers report the titles they classified instead of all writing the memo file
+    role_classifier.memo_path = None
+    # One cdist thread per worker: all-core cdist in every worker would run ~cpu_count² threads
+    role_classifier.workers = 1
+
+# Stages timed inside prepare_chunk; a worker's timings only exist in its own process
+CHUNK_STAGES = ("classify", "location", "latlon", "metrics", "company", "skills")
+
+def prepare_chunk(raw):
+    """Parses one raw chunk.
+
+    Returns (frame without skills, its SkillsIndex, titles newly added to the
+    role memo, {stage: seconds} for this chunk).
+    """
+    known = len(role_classifier.memo)
+    df = parse_frame(raw)
+    with stage("skills", len(df)): skills = skills_index(df, set(JUNK_SKILLS))
+    learned = dict(itertools.islice(role_classifier.memo.items(), known, None))
+    timings = {name: load_stages[name] for name in CHUNK_STAGES if name in load_stages}
+    return df.drop(columns=["skills"], errors="ignore"), skills, learned, timings
+
+def prepare_chunks(chunks, workers=LOAD_WORKERS, min_rows=LOAD_POOL_MIN_ROWS):
+    """Parses a stream of raw chunks into (frame, SkillsIndex); None when it has no rows.
+
+    Chunks are held back until min_rows rows have arrived; a smaller load is
+    parsed in one pass in this process.
+    """
+    chunks = iter(chunks)
+    head, rows = [], 0
+    for chunk in chunks:
+        head.append(chunk)
+        rows += len(chunk)
+        if rows >= min_rows and len(head) > 1: break
+    if not head: return None
+    if len(head) == 1 or rows < min_rows or workers <= 0:
+        # Nothing to overlap: one pass in this process
+        print("🧠 Classifying Roles (Fuzzy Logic)...")
+        df, skills, _, _ = prepare_chunk(pd.concat(head + list(chunks), ignore_index=True) if len(head) > 1 else head[0])
+        print("✅ Classification Complete.")
+        return df, skills
+
+    print(f"🧠 Classifying Roles (Fuzzy Logic) in {LOAD_CHUNK_ROWS}-row chunks on {workers} worker processes...")
+    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"), initializer=init_load_worker)
+    try:
+        futures = [pool.submit(prepare_chunk, chunk) for chunk in itertools.chain(head, chunks)]
+        parts = [f.result() for f in futures]
+    finally:
+        pool.shutdown(cancel_futures=True)
+    role_classifier.remember({title: role for _, _, learned, _ in parts for title, role in learned.items()})
+    # Worker time summed over chunks (can exceed the wall-clock "pipeline" stage)
+    rows = sum(len(df) for df, _, _, _ in parts)
+    for name in CHUNK_STAGES:
+        record_stage(name, sum(timings.get(name, 0.0) for _, _, _, timings in parts), rows)
+    print(f"✅ Classification Complete ({len(parts)} chunks).")
+    return pd.concat([df for df, _, _, _ in parts], ignore_index=True), SkillsIndex.stack([skills for _, skills, _, _ in parts])
+
+def next_version():
+    global dataset_version
+    dataset_version += 1
+    return dataset_version
+
+def clear_caches():
+    filter_cache.clear()
+    response_cache.clear()
+
+def swap_dataset(new):
+    # A single reference assignment: in-flight requests keep the Dataset they started with
+    global dataset
+    dataset = new
+    clear_caches()
+    report = new.memory_report()
+    dataset_rows.set(report["rows"])
+    dataset_version_gauge.set(new.version)
+    dataset_bytes.set(report["frame_bytes"], part="frame")
+    dataset_bytes.set(sum(report["index_bytes"].values()), part="indexes")
+    dataset_bytes.set(sum(report["text_store_disk_bytes"].values()), part="text_disk")
+
+def snapshot_fingerprint():
+    return snapshot.fingerprint(PIPELINE_VERSION, ROLE_MAPPINGS, JUNK_SKILLS, CITY_COORDS, KEYWORD_INDEX_DESC_KB, JUNK_COMPANIES)
+
+PIPELINE_FINGERPRINT = snapshot_fingerprint()
+
+def dataset_tag(ds):
+    """Identity of ds for ETags, cache keys and cursors: pipeline settings plus its rows (Dataset.tag).
+
+    dataset_version counts swaps in this process only; with several workers the
+    same number can stand for different data, this tag can't.
+    """
+    return f"{PIPELINE_FINGERPRINT}-{ds.tag}" if ds is not None else None
+
+def save_snapshot():
+    try:
+        with stage("snapshot_save", len(dataset.df)): saved = snapshot.save(dataset, SNAPSHOT_DIR, snapshot_fingerprint())
+        if saved: print(f"💾 Snapshot saved (v{dataset.version}).")
+    except Exception as e:
+        print(f"❌ Snapshot Error: {e}")
+
+def prune_text_segments():
+    # Segments of replaced Datasets stay readable through their existing maps
+    textstore.prune(DESCRIPTION_STORE_DIR, [p for t in dataset.texts.values() for p in t.paths])
+
+def load_data_internal(use_cache=True):
+    with refresh_lock:
+        load_stages.clear()
+        # 1. Processed snapshot (memory-mapped, shared between workers)
+        if use_cache:
+            with stage("snapshot_load") as info:
+                ds = snapshot.load(SNAPSHOT_DIR, snapshot_fingerprint(), dataset_version + 1)
+                if ds is not None: info["rows"] = len(ds.df)
+            if ds is not None:
+                next_version()
+                swap_dataset(ds)
+                print(f"⚡ Loaded processed snapshot: {len(ds.df)} rows.")
+                prune_text_segments()
+                loaded("snapshot")
+                return
+
+        # 2. Raw fetch, parsed chunk by chunk while it streams in
+        with stage("pipeline") as info:
+            try: prepared = prepare_chunks(rechunk(fetch_from_typesense(use_cache), LOAD_CHUNK_ROWS))
+            except FetchError: prepared = None
+            if prepared is None:
+                try: jobs = pd.read_csv("jobs.csv", low_memory=False)
+                except: return
+                prepared = prepare_chunks(rechunk([jobs], LOAD_CHUNK_ROWS))
+            if prepared is None: return
+            df, skills = prepared
+            info["rows"] = len(df)
+        with stage("compact", len(df)): df = compact_frame(df)
+
+        swap_dataset(Dataset.build(df, next_version(), set(JUNK_SKILLS), KEYWORD_INDEX_DESC_KB * 1024, DESCRIPTION_STORE_DIR, stage, skills))
+        print(f"Data Loaded: {len(dataset.df)} rows.")
+        save_snapshot()
+        prune_text_segments()
+        loaded("full")
+
+def refresh_delta():
+    """Merges postings newer than the current high-water mark; returns how many arrived."""
+    with refresh_lock:
+        ds = dataset
+        if ds is None or ds.high_water is None:
+            load_data_internal(use_cache=False)
+            return len(dataset.df) if dataset is not None else 0
+
+        load_stages.clear()
+        with stage("fetch") as info:
+            raw = fetch_collection(TYPESENSE_CONFIG, TYPESENSE_COLLECTIONS, mode=TYPESENSE_FETCH_MODE, workers=TYPESENSE_FETCH_WORKERS,
+                                   filter_by=f"posted_at:>={ds.high_water}", on_page=log_page, on_retry=log_retry)
+            info["rows"] = 0 if raw is None else len(raw)
+        if raw is None or raw.empty: return 0
+        # The >= filter always returns the newest posting again; an idle refresh leaves the Dataset alone
+        raw = ds.unseen(raw)
+        if raw.empty: return 0
+        key = dedup_key(raw)
+        if key is not None: raw = raw.drop_duplicates(key, keep="last")
+
+        delta = Dataset.build(prepare_frame(raw), ds.version, set(JUNK_SKILLS), KEYWORD_INDEX_DESC_KB * 1024, DESCRIPTION_STORE_DIR, stage)
+        with stage("merge", len(delta.df)): merged = ds.merge(delta, next_version())
+        swap_dataset(merged)
+        print(f"🔄 Merged {len(raw)} new postings (v{dataset.version}, {len(dataset.df)} rows).")
+        save_snapshot()
+        prune_text_segments()
+        loaded("delta")
+        return len(raw)
+
+def refresh_loop():
+    while True:
+        time.sleep(REFRESH_INTERVAL_SECONDS)
+        try: refresh_delta()
+        except Exception as e: print(f"❌ Refresh Error: {e}")
+
+def initial_load():
+    try: load_data_internal()
+    except Exception as e: print(f"❌ Load Error: {e}")
+    if REFRESH_INTERVAL_SECONDS > 0: refresh_loop()
 
 @app.on_event("startup")
 def startup_event():
-    load_data_internal()
+    # The server answers right away; /ready turns 200 once the first dataset is in
+    threading.Thread(target=initial_load, daemon=True).start()
+
+@app.get("/ready")
+def ready():
+    """Readiness probe: 503 (with the stages finished so far) until a dataset is loaded."""
+    ds = dataset
+    if ds is None: return JSONResponse({"ready": False, "stages": dict(load_stages)}, status_code=503)
+    return {"ready": True, "version": ds.version, "rows": len(ds.df)}
+
+@app.post("/refresh")
+def refresh(full: bool = False):
+    """Pulls new postings now; full=true re-fetches and rebuilds everything."""
+    if full: load_data_internal(use_cache=False)
+    new_rows = 0 if full else refresh_delta()
+    ds = dataset
+    return {"version": ds.version if ds else 0, "rows": len(ds.df) if ds else 0, "new_rows": new_rows, "high_water": ds.high_water if ds else None}
 
 @app.get("/filter-options")
-def get_filter_options():
-    if cached_df is None: return {"countries": [], "roles": []}
-    countries = sorted([str(x) for x in cached_df["country"].unique() if x and len(str(x)) > 1])
+def get_filter_options(request: Request):
+    ds = dataset
+    return respond(request, (dataset_tag(ds),), lambda: filter_options_for(ds))
+
+def filter_options_for(ds):
+    if ds is None: return {"countries": [], "roles": []}
+    countries = sorted([str(x) for x in ds.df["country"].unique() if x and len(str(x)) > 1])
     roles = []
-    if "job_role" in cached_df.columns:
-        roles = sorted([str(r) for r in cached_df["job_role"].unique() if r and str(r) not in ['nan', 'Unknown']])
+    if "job_role" in ds.df.columns:
+        roles = sorted([str(r) for r in ds.df["job_role"].unique() if r and str(r) not in ['nan', 'Unknown']])
         if "Other" in roles:
             roles.remove("Other")
             roles.append("Other")
     return {"countries": countries, "roles": roles}
 
-# ... (Endpoints apply_filters, kpis, companies, map-points, skills, salary, raw-jobs remain unchanged) ...
-def apply_filters(df, countries, role, exp_max, keywords, days_ago):
-    if df is None: return pd.DataFrame()
-    d = df.copy()
-    if countries and "Global" not in countries: d = d[d["country"].isin(countries)]
-    if role and role != "All Roles": d = d[d["job_role"] == role]
-    if exp_max is not None: d = d[d["min_experience"] <= exp_max]
-    if keywords:
-        k = keywords.lower()
-        mask = d["raw_role"].astype(str).str.lower().str.contains(k, na=False)
-        mask |= d["job_role"].astype(str).str.lower().str.contains(k, na=False)
-        if "description" in d.columns:
-             mask |= d["description"].astype(str).str.lower().str.contains(k, na=False)
-        d = d[mask]
-    if days_ago is not None and days_ago > 0:
-        if "post_date" in d.columns:
-            cutoff = pd.Timestamp.now() - pd.Timedelta(days=days_ago)
-            d = d[d["post_date"] >= cutoff]
-    return d
+def filter_key(tag, countries, role, exp_max, keywords, days_ago):
+    """Normalizes filter params so equivalent requests share a cache entry."""
+    countries = () if not countries or "Global" in countries else tuple(sorted(set(countries)))
+    role = None if not role or role == "All Roles" else role
+    keywords = keywords.lower() if keywords else None
+    days_ago = days_ago if days_ago is not None and days_ago > 0 else None
+    return (tag, countries, role, exp_max, keywords, days_ago)
+
+def filter_label(key):
+    """Metric label naming the active filters of a filter_key, e.g. "country+exp"."""
+    _, countries, role, exp_max, keywords, days_ago = key
+    active = {"country": countries, "role": role, "exp": exp_max is not None, "days_ago": days_ago, "keywords": keywords}
+    return "+".join(name for name, value in active.items() if value) or "all"
+
+@metrics.phase("filter")
+def apply_filters(ds, countries, role, exp_max, keywords, days_ago):
+    """Returns the positional row ids of ds.df that match the filters."""
+    if ds is None: return np.empty(0, dtype=np.int64)
+    key = filter_key(dataset_tag(ds), countries, role, exp_max, keywords, days_ago)
+    _, countries, role, exp_max, keywords, days_ago = key
+
+    def compute():
+        start = time.perf_counter()
+        ids = ds.filters.select(countries, role, exp_max, days_ago)
+        structured = len(ids)
+        if keywords and len(ids): ids = ds.keywords.search(ds.text, keywords, ids)
+        ids.flags.writeable = False
+        filter_seconds.observe(time.perf_counter() - start, filters=filter_label(key), target="rows")
+
+        shares = ds.filters.selectivity(countries, role, exp_max, days_ago)
+        if keywords: shares["keywords"] = len(ids) / structured if structured else 0.0
+        for name, share in shares.items(): filter_selectivity.observe(share, filter=name)
+        return ids
+
+    return filter_cache.get_or_compute(key, compute)
+
+@metrics.phase("filter")
+def selection_for(ds, countries, role, exp_max, keywords, days_ago):
+    """Widget sums for the filters: from the cube cells, or from the matching rows when keywords are set."""
+    if ds is None: return None
+    key = filter_key(dataset_tag(ds), countries, role, exp_max, keywords, days_ago)
+    _, countries, role, exp_max, keywords, days_ago = key
+
+    def compute():
+        start = time.perf_counter()
+        if keywords: sel = ds.cube.rows(apply_filters(ds, countries, role, exp_max, keywords, days_ago))
+        else: sel = ds.cube.select(countries, role, exp_max, days_ago)
+        filter_seconds.observe(time.perf_counter() - start, filters=filter_label(key), target="cube")
+        return sel
+
+    return filter_cache.get_or_compute(("selection",) + key, compute)
+
+# --- RESPONSES (ETag / 304 / compression) ---
+def query_key(ds, countries, role, exp_max, keywords, days_ago, *extra):
+    """ETag key of a request: its filter_key (dataset tag included) plus endpoint-specific params.
+
+    Relative date filters also carry the filter cache TTL window, so their
+    tags change as the cutoff moves.
+    """
+    key = filter_key(dataset_tag(ds), countries, role, exp_max, keywords, days_ago) + extra
+    if key[5] is not None: key += (int(time.time() // filter_cache.ttl),)
+    return key
+
+def respond(request, key, build):
+    """JSON body of build() with a strong ETag for (path, key); 304 when the client already holds it."""
+    coding = responses.negotiate(request.headers.get("accept-encoding"))
+    tag = responses.etag(request.url.path, key, coding)
+    headers = {"ETag": tag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if responses.not_modified(request.headers.get("if-none-match"), tag): return Response(status_code=304, headers=headers)
+    body, applied = response_cache.get_or_compute(tag, lambda: responses.encode(build(), coding))
+    if applied: headers["Content-Encoding"] = applied
+    return Response(body, media_type="application/json", headers=headers)
+
+@app.get("/cache-stats")
+def cache_stats():
+    return {"dataset_version": dataset.version if dataset else 0, "filter_cache": filter_cache.stats(), "response_cache": response_cache.stats()}
+
+@app.get("/memory")
+def memory_report():
+    """Bytes per frame column and index; descriptions are reported as on-disk bytes."""
+    ds = dataset
+    if ds is None: return {"rows": 0}
+    return {"dataset_version": ds.version, **ds.memory_report()}
+
+@app.middleware("http")
+async def record_request(request: Request, call_next):
+    with metrics.request_timer() as timer:
+        response = await call_next(request)
+    total = time.perf_counter() - timer.start
+    # Route templates keep the label set bounded
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    phases = {"filter": timer.phases["filter"], "aggregate": timer.phases["aggregate"]}
+    phases["serialize"] = max(total - phases["filter"] - phases["aggregate"], 0.0)
+    request_seconds.observe(total, path=path, phase="total")
+    for name, seconds in phases.items(): request_seconds.observe(seconds, path=path, phase=name)
+    requests_total.inc(path=path, status=response.status_code)
+    metrics.profiler.finish(timer, path, request.url.query, total)
+    if STRUCTURED_LOGS: metrics.log("request", path=path, query=request.url.query, status=response.status_code, seconds=total, phases=phases)
+    return response
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """Prometheus text exposition of load, request, filter and dataset metrics."""
+    for cache, c in (("filter", filter_cache), ("response", response_cache)):
+        for name, value in c.stats().items(): cache_stats_gauge.set(value, cache=cache, stat=name)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/profiler")
+def profiler_report():
+    """Profiler settings and the collapsed stacks (flamegraph format) of recent slow requests."""
+    return {**metrics.profiler.settings(), "slow_requests": metrics.profiler.recent()}
+
+@app.post("/profiler")
+def configure_profiler(enabled: Optional[bool] = None, slow_ms: Optional[float] = None, interval_ms: Optional[float] = None):
+    """Switches the slow-request sampling profiler on or off at runtime."""
+    return metrics.profiler.configure(enabled, None if interval_ms is None else interval_ms / 1000, None if slow_ms is None else slow_ms / 1000)
+
+# --- WIDGET AGGREGATES (shared by the single endpoints and /dashboard) ---
+@metrics.phase("aggregate")
+def skill_counts_for(ds, ids, top=15):
+    """Top skill frequencies over the selected rows, most common first."""
+    if len(ids) == 0 or ds.skills is None: return pd.Series([], dtype="int64")
+    return ds.skills.top(ids, top)
+
+@metrics.phase("aggregate")
+def kpis_for(sel, skill_counts):
+    k = sel.kpis() if sel is not None else None
+    if not k or k["total_jobs"] == 0: return {"total_jobs": 0, "avg_ctc": 0, "avg_experience": 0, "top_skill": "N/A"}
+    top_skill = skill_counts.index[0] if not skill_counts.empty else "N/A"
+    return {"total_jobs": k["total_jobs"], "avg_ctc": k["avg_ctc"], "avg_experience": k["avg_experience"], "top_skill": top_skill, "remote_count": k["remote_count"], "onsite_count": k["total_jobs"] - k["remote_count"]}
+
+@metrics.phase("aggregate")
+def companies_for(sel):
+    # Names were normalized and junk-filtered at load
+    return sel.top_companies(10) if sel is not None else []
+
+@metrics.phase("aggregate")
+def map_points_for(sel):
+    return sel.map_points() if sel is not None else []
+
+@metrics.phase("aggregate")
+def map_clusters_for(ds, ids, zoom, bbox):
+    if ds is None or ids is None or len(ids) == 0: return []
+    return ds.geo.clusters(ids, zoom, bbox)
+
+def map_view(zoom, bbox):
+    """(zoom, snapped bbox) for the clustered map mode, None for per-city points."""
+    if zoom is None: return None
+    zoom = min(max(zoom, 0), geo.LEVELS)
+    try: return zoom, geo.parse_bbox(bbox, zoom)
+    except ValueError: raise HTTPException(400, "bbox must be 'west,south,east,north' in degrees")
+
+@metrics.phase("aggregate")
+def skills_for(ds, ids, skill_counts=None):
+    if skill_counts is None: skill_counts = skill_counts_for(ds, ids)
+    return [{"skill": k, "count": int(v)} for k, v in skill_counts.head(15).items()]
+
+@metrics.phase("aggregate")
+def salary_by_experience_for(sel):
+    return sel.salary_by_experience() if sel is not None else []
+
+# --- RAW JOBS (keyset pagination over presorted permutations) ---
+RAW_JOB_FIELDS = ["job_role", "city", "country", "min_experience", "parsed_salary", "location_type", "job_type", "apply_url", "job_id"]
+RAW_JOB_EXTRA_FIELDS = ["raw_role", "company", "post_date", "id"]
+RAW_JOB_SORTS = ["post_date", "parsed_salary", "min_experience"]
+RAW_JOB_MAX_LIMIT = 500
+
+def encode_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return state if isinstance(state, dict) and {"v", "q", "p", "k"} <= state.keys() else None
+    except ValueError:
+        return None
+
+def scan_page(perm, start, limit, keep):
+    """Walks perm from start in growing chunks until `limit` rows pass keep(ids).
+
+    Returns (row ids, position after the last returned row, or None at the end).
+    """
+    found, pos, chunk = [], start, max(4 * limit, 256)
+    need = limit
+    while pos < len(perm) and need > 0:
+        ids = perm[pos:pos + chunk]
+        ok = np.flatnonzero(keep(ids))[:need]
+        found.append(ids[ok])
+        need -= len(ok)
+        pos = pos + int(ok[-1]) + 1 if need == 0 else pos + len(ids)
+        chunk *= 2
+    rows = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+    return rows, (pos if need == 0 and pos < len(perm) else None)
+
+def raw_jobs_for(ds, countries, role, exp_max, keywords, days_ago, limit=10, cursor=None, sort=None, order="desc", fields=None):
+    """One page of matching jobs plus the cursor for the next page.
+
+    Rows are read in `sort` order (row order without one) and filtered as they
+    are scanned, so a page costs the same however deep it is. A cursor from an
+    older dataset resumes after its last (sort value, arrival seq)
+    pair, which survives merges: no remaining row is skipped, and a row a
+    refresh replaced shows up again at its new place.
+    """
+    if sort is not None and sort not in RAW_JOB_SORTS: raise HTTPException(400, f"sort must be one of {RAW_JOB_SORTS}")
+    if order not in ("asc", "desc"): raise HTTPException(400, "order must be 'asc' or 'desc'")
+    if ds is None: return {"jobs": [], "next_cursor": None}
+    limit = max(1, min(limit, RAW_JOB_MAX_LIMIT))
+
+    key = filter_key(dataset_tag(ds), countries, role, exp_max, keywords, days_ago)
+    _, countries, role, exp_max, keywords, days_ago = key
+    query = zlib.crc32(repr(key[1:] + (sort, order)).encode())
+    perm, values = ds.filters.orders[sort]
+    desc = sort is not None and order == "desc"
+    if desc: perm = perm[::-1]
+
+    start = 0
+    if cursor:
+        state = decode_cursor(cursor)
+        if state is None or state["q"] != query: raise HTTPException(400, "invalid cursor for this query")
+        if state["v"] == dataset_tag(ds): start = state["p"]
+        elif sort is None: start = int(np.searchsorted(ds.seq, state["k"], side="right"))
+        else:
+            # Ties keep row (= arrival) order inside the stable ascending permutation
+            value, seq = state["k"]
+            lo, hi = np.searchsorted(values, value, side="left"), np.searchsorted(values, value, side="right")
+            tie = ds.seq[ds.filters.orders[sort][0][lo:hi]]
+            if desc: start = len(perm) - int(lo) - int(np.searchsorted(tie, seq, side="left"))
+            else: start = int(lo) + int(np.searchsorted(tie, seq, side="right"))
+
+    structured = ds.filters.matcher(countries, role, exp_max, days_ago)
+    text = ds.keywords.matcher(ds.text, keywords) if keywords else None
+    def keep(ids):
+        mask = structured(ids)
+        if text is not None and mask.any(): mask[mask] = text(ids[mask])
+        return mask
+
+    with metrics.phase("filter"): page, next_pos = scan_page(perm, start, limit, keep)
+    next_cursor = None
+    if next_pos is not None and len(page):
+        last = int(ds.seq[page[-1]])
+        k = last if sort is None else [values[len(perm) - next_pos if desc else next_pos - 1].item(), last]
+        next_cursor = encode_cursor({"v": dataset_tag(ds), "q": query, "p": next_pos, "k": k})
+
+    # Optional projection; columns the source doesn't have are left out instead of raising
+    allowed = RAW_JOB_FIELDS + RAW_JOB_EXTRA_FIELDS
+    cols = [c for c in (fields or RAW_JOB_FIELDS) if c in allowed and c in ds.df.columns]
+    with metrics.phase("aggregate"):
+        jobs = responses.records(ds.select_rows(page, cols), fill="") if len(page) else []
+    return {"jobs": jobs, "next_cursor": next_cursor}
 
 @app.get("/kpis")
-def kpis(countries: Optional[List[str]] = Query(None), role: Optional[str] = None, exp_min: int = 20, keywords: Optional[str] = None, days_ago: Optional[int] = None):
-    d = apply_filters(cached_df, countries, role, exp_min, keywords, days_ago)
-    if d.empty: return {"total_jobs": 0, "avg_ctc": 0, "avg_experience": 0, "top_skill": "N/A"}
-    valid_sal = d[d["parsed_salary"] > 0]
-    avg_ctc = valid_sal["parsed_salary"].mean() if not valid_sal.empty else 0
-    top_skill = "N/A"
-    if "skills" in d.columns:
-        s = d["skills"].explode().dropna()
-        if not s.empty: top_skill = s.value_counts().idxmax()
-    remote = len(d[d["location_type"].astype(str).str.lower().str.contains("remote", na=False)]) if "location_type" in d.columns else 0
-    return {"total_jobs": len(d), "avg_ctc": avg_ctc, "avg_experience": d["min_experience"].mean(), "top_skill": top_skill, "remote_count": remote, "onsite_count": len(d)-remote}
+def kpis(request: Request, countries: Optional[List[str]] = Query(None), role: Optional[str] = None, exp_min: int = 20, keywords: Optional[str] = None, days_ago: Optional[int] = None):
+    ds = dataset
+    def build():
+        ids = apply_filters(ds, countries, role, exp_min, keywords, days_ago)
+        return kpis_for(selection_for(ds, countries, role, exp_min, keywords, days_ago), skill_counts_for(ds, ids))
+    return respond(request, query_key(ds, countries, role, exp_min, keywords, days_ago), build)
 
 @app.get("/companies")
-def companies_endpoint(countries: Optional[List[str]] = Query(None), role: Optional[str] = None, exp_min: int = 20, keywords: Optional[str] = None, days_ago: Optional[int] = None):
-    d = apply_filters(cached_df, countries, role, exp_min, keywords, days_ago)
-    if d.empty or "company_name" not in d.columns: return []
-    
-    # 1. Standardize Case
-    c = d["company_name"].astype(str).str.title().str.strip()
-    
-    # 2. THE FILTER: Remove Junk Values
-    junk_companies = [
-        "Nan", "None", "Null", "Unknown", "Confidential", 
-        "Company Name", "Private", "Hidden", "Client Of"
-    ]
-    
-    # Exclude rows where company name is in the junk list OR starts with "Client Of"
-    c = c[~c.isin(junk_companies) & ~c.str.startswith("Client Of")]
-    
-    return [{"company": k, "count": int(v)} for k, v in c.value_counts().head(10).items()]
+def companies_endpoint(request: Request, countries: Optional[List[str]] = Query(None), role: Optional[str] = None, exp_min: int = 20, keywords: Optional[str] = None, days_ago: Optional[int] = None):
+    ds = dataset
+    return respond(request, query_key(ds, countries, role, exp_min, keywords, days_ago),
+                   lambda: companies_for(selection_for(ds, countries, role, exp_min, keywords, days_ago)))
 
 @app.get("/map-points")
-def map_points(countries: Optional[List[str]] = Query(None), role: Optional[str] = None, exp_min: int = 20, keywords: Optional[str] = None, days_ago: Optional[int] = None):
-    d = apply_filters(cached_df, countries, role, exp_min, keywords, days_ago)
-    if d.empty: return []
-    d_coords = d.dropna(subset=['lat', 'lon'])
-    if d_coords.empty: return []
-    city_counts = d_coords.groupby("city").agg(count=("city", "count"), lat=("lat", "mean"), lon=("lon", "mean")).reset_index()
-    return city_counts.to_dict(orient="records")
+def map_points(request: Request, countries: Optional[List[str]] = Query(None), role: Optional[str] = None, exp_min: int = 20, keywords: Optional[str] = None, days_ago: Optional[int] = None,
+               zoom: Optional[int] = None, bbox: Optional[str] = None):
+    """One point per city; with zoom (and optionally bbox) grid clusters sized for that map viewport."""
+    ds = dataset
+    view = map_view(zoom, bbox)
+    if view is None: build = lambda: map_points_for(selection_for(ds, countries, role, exp_min, keywords, days_ago))
+    else: build = lambda: map_clusters_for(ds, apply_filters(ds, countries, role, exp_min, keywords, days_ago), *view)
+    return respond(request, query_key(ds, countries, role, exp_min, keywords, days_ago, view), build)
 
 @app.get("/skills")
-def skills_endpoint(countries: Optional[List[str]] = Query(None), role: Optional[str] = None, exp_min: int = 20, keywords: Optional[str] = None, days_ago: Optional[int] = None):
-    d = apply_filters(cached_df, countries, role, exp_min, keywords, days_ago)
-    if d.empty: return []
-    if "skills" in d.columns:
-        s = d["skills"].explode()
-        s = s[s.notna() & (s != "")]
-        return [{"skill": k, "count": int(v)} for k, v in s.value_counts().head(15).items()]
-    return []
+def skills_endpoint(request: Request, countries: Optional[List[str]] = Query(None), role: Optional[str] = None, exp_min: int = 20, keywords: Optional[str] = None, days_ago: Optional[int] = None):
+    ds = dataset
+    return respond(request, query_key(ds, countries, role, exp_min, keywords, days_ago),
+                   lambda: skills_for(ds, apply_filters(ds, countries, role, exp_min, keywords, days_ago)))
 
 @app.get("/salary_by_experience")
-def salary_endpoint(countries: Optional[List[str]] = Query(None), role: Optional[str] = None, exp_min: int = 20, keywords: Optional[str] = None, days_ago: Optional[int] = None):
-    d = apply_filters(cached_df, countries, role, exp_min, keywords, days_ago)
-    if "parsed_salary" not in d.columns:
-        return []
-    d = d[(d["parsed_salary"] > 0) & (d["min_experience"] < 30)]
-    if d.empty: return []
-    top_cities = d["city"].value_counts().head(100).index.tolist()
-    d = d[d["city"].isin(top_cities)]
-    d["years"] = d["min_experience"].astype(int)
-    agg = d.groupby(["city", "years"]).agg(avg_salary=("parsed_salary", "mean"), job_count=("parsed_salary", "count")).reset_index()
-    return agg.to_dict(orient="records")
+def salary_endpoint(request: Request, countries: Optional[List[str]] = Query(None), role: Optional[str] = None, exp_min: int = 20, keywords: Optional[str] = None, days_ago: Optional[int] = None):
+    ds = dataset
+    return respond(request, query_key(ds, countries, role, exp_min, keywords, days_ago),
+                   lambda: salary_by_experience_for(selection_for(ds, countries, role, exp_min, keywords, days_ago)))
 
 @app.get("/raw-jobs")
-def raw_jobs(countries: Optional[List[str]] = Query(None), role: Optional[str] = None, exp_min: int = 20, keywords: Optional[str] = None, days_ago: Optional[int] = None, limit: int = 10):
-    d = apply_filters(cached_df, countries, role, exp_min, keywords, days_ago)
-    if d.empty: return []
-    return d[["job_role", "city", "country", "min_experience", "parsed_salary", "location_type", "job_type", "apply_url", "job_id"]].head(limit).fillna("").to_dict(orient="records")
\ No newline at end of file
+def raw_jobs(request: Request, countries: Optional[List[str]] = Query(None), role: Optional[str] = None, exp_min: int = 20, keywords: Optional[str] = None, days_ago: Optional[int] = None, limit: int = 10,
+             cursor: Optional[str] = None, sort: Optional[str] = None, order: str = "desc", fields: Optional[List[str]] = Query(None)):
+    """Paged job rows as {"jobs": [...], "next_cursor": str | None}.
+
+    Pass next_cursor back as cursor to get the following page; it is None on
+    the last page. (This used to return a bare list of at most `limit` rows.)
+    """
+    ds = dataset
+    key = query_key(ds, countries, role, exp_min, keywords, days_ago, limit, cursor, sort, order, tuple(fields or ()))
+    return respond(request, key, lambda: raw_jobs_for(ds, countries, role, exp_min, keywords, days_ago, limit, cursor, sort, order, fields))
+
+DASHBOARD_SECTIONS = ["kpis", "companies", "map_points", "skills", "salary_by_experience", "raw_jobs"]
+
+@app.get("/dashboard")
+def dashboard(request: Request, countries: Optional[List[str]] = Query(None), role: Optional[str] = None, exp_min: int = 20, keywords: Optional[str] = None, days_ago: Optional[int] = None, limit: int = 10, sections: Optional[List[str]] = Query(None),
+              zoom: Optional[int] = None, bbox: Optional[str] = None):
+    """All widget aggregates for one filter selection in a single response (zoom/bbox as for /map-points)."""
+    wanted = [name for name in DASHBOARD_SECTIONS if not sections or name in sections]
+    ds = dataset
+    view = map_view(zoom, bbox)
+    clustered = view is not None and "map_points" in wanted
+
+    def build():
+        ids = apply_filters(ds, countries, role, exp_min, keywords, days_ago) if "kpis" in wanted or "skills" in wanted or clustered else None
+        cube_sections = {"kpis", "companies", "salary_by_experience"} | (set() if clustered else {"map_points"})
+        sel = selection_for(ds, countries, role, exp_min, keywords, days_ago) if set(wanted) & cube_sections else None
+
+        # One skills pass feeds both top_skill and the top-15 list
+        skill_counts = skill_counts_for(ds, ids) if "kpis" in wanted or "skills" in wanted else None
+        builders = {
+            "kpis": lambda: kpis_for(sel, skill_counts),
+            "companies": lambda: companies_for(sel),
+            "map_points": lambda: map_clusters_for(ds, ids, *view) if clustered else map_points_for(sel),
+            "skills": lambda: skills_for(ds, ids, skill_counts),
+            "salary_by_experience": lambda: salary_by_experience_for(sel),
+            "raw_jobs": lambda: raw_jobs_for(ds, countries, role, exp_min, keywords, days_ago, limit),
+        }
+        return {name: builders[name]() for name in wanted}
+
+    return respond(request, query_key(ds, countries, role, exp_min, keywords, days_ago, limit, tuple(wanted), view), build)
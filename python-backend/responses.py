@@ -0,0 +1,73 @@
+import gzip
+import hashlib
+
+import numpy as np
+import orjson
+import pandas as pd
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# --- RESPONSES ---
+# Endpoint results are encoded with orjson (numpy scalars and arrays
+# natively), tagged with a strong ETag derived from the dataset's content tag
+# and the normalized query, and compressed when large. A client that sends the
+# tag back in If-None-Match gets an empty 304 instead of a recomputed body.
+
+COMPRESS_MIN_BYTES = 1024
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    if isinstance(value, pd.Timestamp): return value.isoformat()
+    if isinstance(value, np.generic): return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(value):
+    return orjson.dumps(value, default=_default, option=OPTIONS)
+
+
+def records(frame, fill=None):
+    """Row dicts built column by column as native Python values; missing values become fill."""
+    columns = {}
+    for name in frame.columns:
+        col = frame[name]
+        missing = col.isna().to_numpy()
+        if isinstance(col.dtype, np.dtype) and col.dtype.kind == "M": values = col.to_numpy(dtype="datetime64[us]").astype(object)
+        else: values = col.to_numpy(dtype=object)
+        if missing.any():
+            values = values.copy()
+            values[missing] = fill
+        columns[name] = values.tolist()
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def etag(*key):
+    return '"' + hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest() + '"'
+
+
+def not_modified(if_none_match, tag):
+    if not if_none_match: return False
+    return if_none_match.strip() == "*" or tag in (t.strip().removeprefix("W/") for t in if_none_match.split(","))
+
+
+def negotiate(accept_encoding):
+    """Content coding to use for a client's Accept-Encoding: "br", "gzip" or None."""
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"): accepted.add(coding.strip())
+    if brotli is not None and "br" in accepted: return "br"
+    if "gzip" in accepted: return "gzip"
+    return None
+
+
+def encode(value, coding=None):
+    """(body bytes, content coding actually applied) for a JSON-able value."""
+    body = dumps(value)
+    if coding is None or len(body) < COMPRESS_MIN_BYTES: return body, None
+    if coding == "br": return brotli.compress(body, quality=5), "br"
+    return gzip.compress(body, compresslevel=6), "gzip"
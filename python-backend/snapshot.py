@@ -0,0 +1,136 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from cube import DashboardCube
+from dataset import Dataset
+from indexes import KeywordIndex, SkillsIndex
+from textstore import TextStore
+
+# --- PROCESSED SNAPSHOTS ---
+# The fully processed frame (Arrow IPC, memory-mapped on load) plus the
+# keyword/skills index arrays (.npy, opened with mmap_mode="r"). Workers that
+# load the same snapshot share its pages through the OS page cache instead of
+# each re-fetching and re-processing the raw data.
+#
+# Layout:  <dir>/CURRENT            -> name of the live snapshot directory
+#          <dir>/<fingerprint>-<ts>/ frame.arrow, *.npy, *vocab.arrow, text_*.bin, meta.json
+# The dashboard cube is stored too, so it isn't re-aggregated on startup.
+# A snapshot only loads when its fingerprint matches, i.e. when ROLE_MAPPINGS,
+# JUNK_SKILLS, the pipeline version and the index settings are unchanged.
+
+SNAPSHOT_FORMAT = 7
+KEEP_SNAPSHOTS = 2
+
+
+def fingerprint(*parts):
+    blob = json.dumps([SNAPSHOT_FORMAT, *parts], sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+
+def _arrow_safe(df):
+    """Casts mixed-type object columns (e.g. raw latlon lists/strings) to str so Arrow accepts them."""
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if s.dtype == object:
+            try:
+                pa.array(s, from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                s = s.astype(str).where(s.notna(), None)
+        out[col] = s
+    return pd.DataFrame(out)
+
+
+def _write_vocab(path, values):
+    table = pa.table({"v": pa.array(values, type=pa.string())})
+    with pa.OSFile(path, "wb") as f, pa.ipc.new_file(f, table.schema) as w: w.write_table(table)
+
+
+def _read_vocab(path):
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all().column("v").to_numpy(zero_copy_only=False).astype(object)
+
+
+def save(ds, directory, fp):
+    """Writes ds as the new CURRENT snapshot; returns False if another worker holds the lock."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".lock"), "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+
+        name = f"{fp}-{time.time_ns()}"
+        tmp = os.path.join(directory, name + ".tmp")
+        os.makedirs(tmp)
+
+        table = pa.Table.from_pandas(_arrow_safe(ds.df), preserve_index=False)
+        with pa.OSFile(os.path.join(tmp, "frame.arrow"), "wb") as f, pa.ipc.new_file(f, table.schema) as w:
+            w.write_table(table)
+
+        kw, sk = ds.keywords.state(), ds.skills.state()
+        for key in ("postings", "offsets", "partial_rows"): np.save(os.path.join(tmp, f"keywords_{key}.npy"), kw[key])
+        for key in ("codes", "offsets"): np.save(os.path.join(tmp, f"skills_{key}.npy"), sk[key])
+        _write_vocab(os.path.join(tmp, "keywords_vocab.arrow"), kw["vocab"])
+        _write_vocab(os.path.join(tmp, "skills_vocab.arrow"), sk["vocab"])
+
+        # Text stores are rewritten as one contiguous segment per field
+        for field, store in ds.texts.items():
+            packed = TextStore.write(os.path.join(tmp, f"text_{field}.bin"), store.chunks())
+            for key, a in packed.state().items(): np.save(os.path.join(tmp, f"text_{field}_{key}.npy"), a)
+
+        cube = ds.cube.state()
+        for key, a in cube.items(): np.save(os.path.join(tmp, f"cube_{key}.npy"), a)
+        np.save(os.path.join(tmp, "seq.npy"), ds.seq)
+
+        meta = {"fingerprint": fp, "rows": len(ds.df), "high_water": ds.high_water, "tag": ds.tag, "created_at": time.time(),
+                "keywords": {"n": kw["n"], "fields": kw["fields"], "max_desc_chars": kw["max_desc_chars"]},
+                "texts": list(ds.texts), "cube": list(cube)}
+        with open(os.path.join(tmp, "meta.json"), "w") as f: json.dump(meta, f)
+
+        os.rename(tmp, os.path.join(directory, name))
+        pointer = os.path.join(directory, "CURRENT.tmp")
+        with open(pointer, "w") as f: f.write(name)
+        os.replace(pointer, os.path.join(directory, "CURRENT"))
+
+        # Older snapshots may still be mapped by running workers; unlinking is safe on POSIX
+        old = [os.path.join(directory, d) for d in os.listdir(directory) if "-" in d and d != name and not d.endswith(".tmp")]
+        old.sort(key=os.path.getmtime)
+        for d in old[:max(0, len(old) - (KEEP_SNAPSHOTS - 1))]: shutil.rmtree(d, ignore_errors=True)
+        return True
+
+
+def load(directory, fp, version):
+    """Maps the CURRENT snapshot into a Dataset, or returns None if missing or stale."""
+    try:
+        with open(os.path.join(directory, "CURRENT")) as f: path = os.path.join(directory, f.read().strip())
+        with open(os.path.join(path, "meta.json")) as f: meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("fingerprint") != fp: return None
+
+    table = pa.ipc.open_file(pa.memory_map(os.path.join(path, "frame.arrow"), "r")).read_all()
+    df = table.to_pandas(split_blocks=True)
+
+    def arr(name): return np.load(os.path.join(path, name), mmap_mode="r")
+
+    keywords = KeywordIndex.from_state({
+        "vocab": _read_vocab(os.path.join(path, "keywords_vocab.arrow")),
+        "postings": arr("keywords_postings.npy"), "offsets": arr("keywords_offsets.npy"),
+        "partial_rows": arr("keywords_partial_rows.npy"), **meta["keywords"],
+    })
+    skills = SkillsIndex.from_state({
+        "vocab": _read_vocab(os.path.join(path, "skills_vocab.arrow")),
+        "codes": arr("skills_codes.npy"), "offsets": arr("skills_offsets.npy"),
+    })
+    texts = {f: TextStore([os.path.join(path, f"text_{f}.bin")], *(arr(f"text_{f}_{key}.npy") for key in ("seg", "start", "end")))
+             for f in meta.get("texts", [])}
+    cube = {key: arr(f"cube_{key}.npy") for key in meta["cube"]}
+    return Dataset(df, skills, keywords, version, texts, lambda df, filters: DashboardCube.from_state(df, filters, cube), arr("seq.npy"), meta.get("tag"))
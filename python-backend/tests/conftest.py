@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    """process with no dataset, its runtime files (snapshot, descriptions) under tmp_path and no role memo file."""
+    import process
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(process.role_classifier, "memo_path", None)
+    monkeypatch.setattr(process.role_classifier, "memo", {})
+    monkeypatch.setattr(process, "dataset", None)
+    # load() swaps the fetcher; restored afterwards
+    monkeypatch.setattr(process, "fetch_from_typesense", process.fetch_from_typesense)
+    return process
+
+
+def load(process, raw, use_cache=False):
+    """Runs a full load of process from the raw postings frame."""
+    process.fetch_from_typesense = lambda *a, **k: iter([raw.copy()])
+    process.load_data_internal(use_cache=use_cache)
+    return process.dataset
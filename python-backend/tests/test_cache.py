@@ -0,0 +1,126 @@
+import threading
+
+import numpy as np
+import pytest
+
+import cache
+from bench import synthetic
+from cache import FilterCache
+from conftest import load
+
+
+class Clock:
+    def __init__(self): self.now = 1000.0
+    def __call__(self): return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def ids(n):
+    return np.arange(n, dtype=np.int64)
+
+
+def test_ttl_expiry(clock):
+    c = FilterCache(ttl=10)
+    calls = []
+    compute = lambda: calls.append(1) or ids(4)
+    c.get_or_compute("k", compute)
+    clock.now += 9.9
+    c.get_or_compute("k", compute)
+    assert len(calls) == 1
+    clock.now += 0.2
+    c.get_or_compute("k", compute)
+    assert len(calls) == 2 and c.stats()["size"] == 1 and c.bytes == 32
+
+
+def test_lru_eviction_by_count(clock):
+    c = FilterCache(maxsize=2)
+    c.get_or_compute("a", lambda: ids(1))
+    c.get_or_compute("b", lambda: ids(1))
+    c.get_or_compute("a", lambda: pytest.fail("a is cached"))  # a is now the most recent
+    c.get_or_compute("c", lambda: ids(1))
+    assert list(c.entries) == ["a", "c"] and c.evictions == 1
+
+
+def test_byte_budget(clock):
+    c = FilterCache(maxbytes=1000)
+    for key in "abc": c.get_or_compute(key, lambda: ids(40))  # 320 bytes each
+    assert c.bytes == 960
+    c.get_or_compute("a", lambda: pytest.fail("a is cached"))
+    c.get_or_compute("d", lambda: ids(40))
+    assert list(c.entries) == ["c", "a", "d"] and c.bytes == 960 and c.evictions == 1
+    # Over the whole budget: returned, not kept, and nothing else is evicted for it
+    assert len(c.get_or_compute("big", lambda: ids(200))) == 200
+    assert "big" not in c.entries and c.bytes == 960
+    c.clear()
+    assert c.bytes == 0 and not c.entries
+
+
+def test_sizeof_counts_nested_values():
+    sel = {"main": {"n": ids(10), "sum": np.zeros(10, dtype=np.int32)}, "body": (b"x" * 7, "gzip")}
+    assert cache.sizeof(sel) == 80 + 40 + 7 + 4
+
+
+def test_concurrent_requests_compute_once():
+    c = FilterCache()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return ids(3)
+
+    first = threading.Thread(target=lambda: results.append(c.get_or_compute("k", compute)))
+    first.start()
+    started.wait(5)
+    others = [threading.Thread(target=lambda: results.append(c.get_or_compute("k", compute))) for _ in range(4)]
+    for t in others: t.start()
+    while c.coalesced < 4: release.wait(0.01)
+    release.set()
+    for t in [first, *others]: t.join(5)
+    assert len(calls) == 1 and len(results) == 5 and all(r is results[0] for r in results)
+    assert c.stats()["misses"] == 1 and c.stats()["coalesced"] == 4
+
+
+def test_error_reaches_waiters_and_is_not_cached():
+    c = FilterCache()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    def call():
+        try: c.get_or_compute("k", fail)
+        except ValueError as e: errors.append(e)
+
+    first = threading.Thread(target=call)
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=call)
+    second.start()
+    while c.coalesced < 1: release.wait(0.01)
+    release.set()
+    for t in (first, second): t.join(5)
+    assert len(errors) == 2 and "k" not in c.entries and not c.pending
+    assert len(c.get_or_compute("k", lambda: ids(2))) == 2
+
+
+def test_new_dataset_misses_old_entries(backend):
+    a = load(backend, synthetic.frame(400, seed=1, desc_words=0))
+    old = backend.apply_filters(a, [], None, 20, None, None)
+    b = load(backend, synthetic.frame(300, seed=2, desc_words=0))
+    assert len(backend.apply_filters(b, [], None, 20, None, None)) == 300
+    # Entries are keyed by dataset_tag: a request still holding the old Dataset gets its own rows back
+    assert np.array_equal(backend.apply_filters(a, [], None, 20, None, None), old)
+    keys = {k[0] for k in backend.filter_cache.entries}
+    assert keys == {backend.dataset_tag(a), backend.dataset_tag(b)}
@@ -0,0 +1,131 @@
+import json
+
+import numpy as np
+import pytest
+from rapidfuzz import fuzz, process as fuzz_process
+
+import process
+from bench import synthetic
+from classifier import FUZZY_THRESHOLD, RoleClassifier
+
+
+# --- Per-title loop the classifier replaced (kept verbatim as the reference, mappings passed in) ---
+
+def classify_loop(unique_titles, ROLE_MAPPINGS):
+    title_map = {}
+
+    for title in unique_titles:
+        if not isinstance(title, str):
+            title_map[title] = "Other"
+            continue
+
+        t_lower = title.lower()
+        matched_group = "Other"
+
+        # 1. Exact Substring Match (Fast)
+        for group, keywords in ROLE_MAPPINGS.items():
+            if any(k in t_lower for k in keywords):
+                matched_group = group
+                break
+
+        # 2. Fuzzy Match (If Exact Failed)
+        if matched_group == "Other":
+            # Check against all keywords using partial match
+            best_score = 0
+            for group, keywords in ROLE_MAPPINGS.items():
+                match = fuzz_process.extractOne(t_lower, keywords, scorer=fuzz.partial_ratio)
+                if match and match[1] > 85: # Strict Threshold
+                    if match[1] > best_score:
+                        best_score = match[1]
+                        matched_group = group
+
+        title_map[title] = matched_group
+
+    return title_map
+
+
+def typos(words, count, seed):
+    """Keywords and titles with 1-3 characters dropped, swapped or replaced: scores around the fuzzy threshold."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(count):
+        w = list(words[rng.integers(len(words))])
+        for _ in range(rng.integers(1, 4)):
+            i = int(rng.integers(len(w)))
+            op = rng.integers(3)
+            if op == 0 and len(w) > 3: del w[i]
+            elif op == 1 and i + 1 < len(w): w[i], w[i + 1] = w[i + 1], w[i]
+            else: w[i] = "qxz"[int(rng.integers(3))]
+        out.append("".join(w).title())
+    return out
+
+
+def titles():
+    base = [s + t + team for s in synthetic.SENIORITY for t in synthetic.TITLES for team in synthetic.TEAMS[2:6]]
+    keywords = [k for kws in process.ROLE_MAPPINGS.values() for k in kws]
+    return list(dict.fromkeys(base + typos(keywords, 400, seed=1) + typos(synthetic.TITLES, 300, seed=2)
+                              + ["", "   ", "Warehouse Associate", "Director", "Gardener", None, float("nan"), 42]))
+
+
+def test_matches_per_title_loop():
+    t = titles()
+    got = RoleClassifier(process.ROLE_MAPPINGS).classify(t)
+    want = classify_loop(t, process.ROLE_MAPPINGS)
+    assert {k: v for k, v in got.items() if isinstance(k, str)} == {k: v for k, v in want.items() if isinstance(k, str)}
+    assert all(got[k] == "Other" for k in got if not isinstance(k, str))
+    # The typo titles reach the fuzzy pass on both sides of the threshold
+    fuzzy = [x for x in t if isinstance(x, str) and RoleClassifier(process.ROLE_MAPPINGS).match_exact(x.lower()) is None]
+    assert {want[x] == "Other" for x in fuzzy} == {True, False}
+
+
+def test_overlapping_keywords_first_group_wins():
+    mappings = {"Data Engineering": ["data engineer", "warehouse"], "Engineering": ["engineer", "data"],
+                "Data": ["data", "analyst"], "Operations": ["warehouse", "clerk"]}
+    t = ["Senior Data Engineer", "Data Analyst", "Warehouse Clerk", "Clerk", "Engineer, Data", "Analyst Engineer", "Analyst"]
+    got = RoleClassifier(mappings).classify(t)
+    assert got == classify_loop(t, mappings)
+    assert got == {"Senior Data Engineer": "Data Engineering", "Data Analyst": "Engineering", "Warehouse Clerk": "Data Engineering",
+                   "Clerk": "Operations", "Engineer, Data": "Engineering", "Analyst Engineer": "Engineering", "Analyst": "Data"}
+
+
+def test_fuzzy_threshold_is_strict():
+    mappings = {"Platform": ["platform engineering"], "Other Group": ["zzzzzz"]}
+    at, above = "plqtform enqineqring", "plqtform engineqring"
+    assert fuzz.partial_ratio(at, "platform engineering") == FUZZY_THRESHOLD
+    assert fuzz.partial_ratio(above, "platform engineering") > FUZZY_THRESHOLD
+    got = RoleClassifier(mappings).classify([at, above])
+    assert got == classify_loop([at, above], mappings) == {at: "Other", above: "Platform"}
+
+
+def test_fuzzy_ties_keep_the_first_group():
+    mappings = {"First": ["ux designer"], "Second": ["ux designer", "zzz"]}
+    got = RoleClassifier(mappings).classify(["ux desigenr"])
+    assert got == classify_loop(["ux desigenr"], mappings) == {"ux desigenr": "First"}
+
+
+def test_memo_is_reused_until_mappings_change(tmp_path):
+    path = str(tmp_path / "role_memo.json")
+    mappings = {"Backend": ["backend"], "Data": ["data"]}
+    RoleClassifier(mappings, memo_path=path).classify(["Backend Dev", "Data Person"])
+    with open(path) as f: saved = json.load(f)
+    assert saved["titles"] == {"Backend Dev": "Backend", "Data Person": "Data"}
+
+    # Same mappings: memo entries are used as they are, even over a fresh match
+    saved["titles"]["Data Person"] = "Backend"
+    with open(path, "w") as f: json.dump(saved, f)
+    assert RoleClassifier(mappings, memo_path=path).classify(["Data Person"]) == {"Data Person": "Backend"}
+
+    # Changed mappings: a new version, the old memo is dropped and rewritten
+    changed = {"Data": ["data"], "Backend": ["backend", "person"]}
+    clf = RoleClassifier(changed, memo_path=path)
+    assert clf.version != saved["version"] and clf.memo == {}
+    assert clf.classify(["Data Person"]) == classify_loop(["Data Person"], changed) == {"Data Person": "Data"}
+    with open(path) as f: rewritten = json.load(f)
+    assert rewritten == {"version": clf.version, "titles": {"Data Person": "Data"}}
+
+
+@pytest.mark.parametrize("content", ["", "{not json", '{"titles": {"A": "B"}}', '{"version": "old", "titles": {"A": "B"}}'])
+def test_unusable_memo_is_ignored(tmp_path, content):
+    path = tmp_path / "role_memo.json"
+    path.write_text(content)
+    assert RoleClassifier({"Backend": ["backend"]}, memo_path=str(path)).memo == {}
@@ -0,0 +1,41 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cube import DashboardCube
+from indexes import FilterIndex
+
+
+@pytest.fixture(scope="module")
+def cube():
+    rng = np.random.default_rng(11)
+    n = 4000
+    cat = lambda values, p=None: pd.Categorical(rng.choice(values, n, p=p))
+    df = pd.DataFrame({
+        "country": cat(["India", "USA", "Germany"]),
+        "job_role": cat(["Sales", "Data Science", "Other"]),
+        "city": cat(["Pune", "Austin", "Berlin", "Remote", "Mumbai"]),
+        "company": cat(["Acme", "Globex", "Initech", "Umbrella"]),
+        "location_type": cat(["Remote", "On-site", "Hybrid"]),
+        "min_experience": rng.choice([0, 0.5, 1, 2, 2.5, 3, 3.75, 5, 8, 12, 29.5, 30, np.nan], n),
+        # Continuous posting times: every days_ago cutoff splits a week of rows
+        "post_date": pd.Timestamp.now() - pd.to_timedelta(rng.uniform(0, 400, n), unit="D"),
+        "parsed_salary": rng.choice([0, 300000, 450000, 800000, 1200000, 2500000], n),
+        "lat": rng.choice([np.nan, 18.52, 30.27, 52.52], n),
+        "lon": rng.choice([np.nan, 73.86, -97.74, 13.40], n),
+    })
+    return DashboardCube(df, FilterIndex(df))
+
+
+def widgets(sel):
+    return sel.kpis(), sel.top_companies(), sel.map_points(), sel.salary_by_experience()
+
+
+@pytest.mark.parametrize("exp_max,days_ago", list(itertools.product([None, 0, 2, 2.5, 3, 3.2, 20, 29.9], [None, 1, 7, 30, 365])))
+def test_cells_match_row_path(cube, exp_max, days_ago):
+    for countries, role in itertools.product([(), ("India",), ("Germany", "USA")], [None, "Sales"]):
+        ids = cube.filters.select(list(countries), role, exp_max, days_ago)
+        assert repr(widgets(cube.select(countries, role, exp_max, days_ago))) == repr(widgets(cube.rows(ids))), (countries, role)
+
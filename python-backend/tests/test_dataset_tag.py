@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+
+from bench import synthetic
+from conftest import load
+
+NOW = 1760000000
+
+
+def worker(process, raw, version):
+    """Loads raw as a worker process whose swap counter stands at `version` would."""
+    process.dataset_version = version - 1
+    ds = load(process, raw)
+    assert ds.version == version
+    return ds
+
+
+def test_same_version_different_rows_never_304(backend, monkeypatch):
+    monkeypatch.setattr(backend, "dataset_version", 0)
+    client = TestClient(backend.app)
+    a = worker(backend, synthetic.frame(500, seed=1, now=NOW, desc_words=0), 3)
+    tag = client.get("/kpis").headers["etag"]
+    page = backend.raw_jobs_for(a, [], None, 20, None, None, limit=10)
+
+    b = worker(backend, synthetic.frame(500, seed=2, now=NOW, desc_words=0), 3)
+    assert backend.dataset_tag(a) != backend.dataset_tag(b)
+    res = client.get("/kpis", headers={"If-None-Match": tag})
+    assert res.status_code == 200 and res.headers["etag"] != tag
+    # a's positional offset means nothing in b: the cursor resumes by key instead
+    resumed = backend.raw_jobs_for(b, [], None, 20, None, None, limit=10, cursor=page["next_cursor"])
+    assert resumed["jobs"][0]["job_id"] == b.df["job_id"].iloc[b.seq.searchsorted(a.seq[9], side="right")]
+
+
+def test_same_rows_different_version_share_tags(backend, monkeypatch):
+    monkeypatch.setattr(backend, "dataset_version", 0)
+    client = TestClient(backend.app)
+    raw = synthetic.frame(500, seed=1, now=NOW, desc_words=0)
+    a = worker(backend, raw, 2)
+    tag = client.get("/kpis").headers["etag"]
+    first = backend.raw_jobs_for(a, [], None, 20, None, None, limit=10, sort="parsed_salary")
+
+    b = worker(backend, raw, 7)
+    assert backend.dataset_tag(a) == backend.dataset_tag(b)
+    assert client.get("/kpis", headers={"If-None-Match": tag}).status_code == 304
+    second = backend.raw_jobs_for(b, [], None, 20, None, None, limit=10, sort="parsed_salary", cursor=first["next_cursor"])
+    assert second == backend.raw_jobs_for(a, [], None, 20, None, None, limit=10, sort="parsed_salary", cursor=first["next_cursor"])
+
+
+def test_snapshot_keeps_tag(backend):
+    raw = synthetic.frame(300, seed=4, now=NOW, desc_words=0)
+    built = load(backend, raw)
+    loaded = load(backend, raw, use_cache=True)
+    assert loaded is not built and loaded.tag == built.tag
@@ -0,0 +1,48 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indexes import FilterIndex
+
+
+def row_filter(df, countries, role, exp_max, days_ago):
+    """The original pandas-mask apply_filters, minus keywords."""
+    d = df
+    if countries and "Global" not in countries: d = d[d["country"].isin(countries)]
+    if role and role != "All Roles": d = d[d["job_role"] == role]
+    if exp_max is not None: d = d[d["min_experience"] <= exp_max]
+    if days_ago is not None and days_ago > 0:
+        d = d[d["post_date"] >= pd.Timestamp.now() - pd.Timedelta(days=days_ago)]
+    return d.index.to_numpy()
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(7)
+    n = 3000
+    # Posting times sit half a day off the day boundaries, so the cutoff is never ambiguous
+    age_days = rng.integers(0, 400, n) + 0.5
+    return pd.DataFrame({
+        "country": rng.choice(["India", "USA", "Germany", "Global"], n),
+        "job_role": rng.choice(["Sales", "Data Science", "Other"], n),
+        "min_experience": rng.choice([0, 1, 2.5, 3, 5, 8, 12, 20, np.nan], n),
+        "post_date": pd.Timestamp.now() - pd.to_timedelta(age_days, unit="D"),
+        "parsed_salary": rng.integers(0, 5, n) * 100000,
+    })
+
+
+COUNTRIES = [None, ["India"], ["India", "USA"], ["Global"], ["Nowhere"]]
+ROLES = [None, "Sales", "All Roles", "Nope"]
+EXPS = [None, 0, 3, 20]
+DAYS = [None, 0, 7, 150, 365]
+
+
+@pytest.mark.parametrize("exp_max,days_ago", list(itertools.product(EXPS, DAYS)))
+def test_combined_filters_match_row_path(frame, exp_max, days_ago):
+    index = FilterIndex(frame)
+    for countries, role in itertools.product(COUNTRIES, ROLES):
+        got = index.select(countries, role, exp_max, days_ago)
+        want = row_filter(frame, countries, role, exp_max, days_ago)
+        assert np.array_equal(got, want), (countries, role, exp_max, days_ago)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import geo
+from conftest import load
+
+
+def test_geocode_raw_location_only_accepts_cities():
+    lat, lon = geo.geocode(
+        ["Remote", "Indianapolis", "Whitefield"],
+        ["India", "Indianapolis, Indiana, United States", "Whitefield, Bengaluru, Karnataka"],
+    )
+    assert np.isnan(lat[:2]).all() and np.isnan(lon[:2]).all()
+    assert (lat[2], lon[2]) == tuple(geo.CITY_COORDS["bengaluru"])
+
+
+@pytest.mark.parametrize("city", ["Remote", "Work From Home", "Unknown"])
+def test_geocode_non_place_city_stays_unplaced(city):
+    lat, lon = geo.geocode([city], [f"{city}, Singapore"])
+    assert np.isnan(lat[0]) and np.isnan(lon[0])
+
+
+def test_per_city_map_has_no_remote_marker(backend):
+    from bench import synthetic
+    raw = synthetic.frame(40, seed=3, desc_words=0)
+    raw["latlon"] = None
+    raw["location"] = ["Remote, Singapore", "Work From Home, Mumbai", "Pune", "Whitefield, Bengaluru"] * 10
+    load(backend, raw)
+    points = {p["city"]: (p["count"], p["lat"], p["lon"]) for p in backend.map_points_for(backend.selection_for(backend.dataset, None, None, 20, None, None))}
+    assert "Remote" not in points and "Work From Home" not in points
+    assert points["Pune"] == (10, *geo.CITY_COORDS["pune"])
+    assert points["Whitefield"][0] == 10
+
+
+def test_geocode_city_lookup_is_unchanged():
+    # A parsed city is still looked up against every CITY_COORDS entry, as before
+    lat, lon = geo.geocode(["Usa", "Pune"])
+    assert (lat[0], lon[0]) == tuple(geo.CITY_COORDS["usa"])
+    assert (lat[1], lon[1]) == tuple(geo.CITY_COORDS["pune"])
+
+
+def test_bbox_rejects_inverted_latitudes():
+    with pytest.raises(ValueError): geo.parse_bbox("0,10,10,0", 4)
+
+
+@pytest.mark.parametrize("bbox", ["170,-10,-170,10", "-190,-10,-170,10"])
+def test_bbox_across_antimeridian(bbox):
+    west, south, east, north = geo.parse_bbox(bbox, 8)
+    assert west > east and west <= 170 and east >= -170
+    lat = np.array([0.0, 0.0, 0.0, 0.0, 20.0])
+    lon = np.array([175.0, -175.0, 0.0, 160.0, 175.0])
+    grid = geo.GeoGrid(lat, lon, np.array(["Suva", "Apia", "Accra", "Nowhere", "Far"], dtype=object))
+    clusters = grid.clusters(np.arange(5), 8, (west, south, east, north))
+    assert sorted(c["city"] for c in clusters) == ["Apia", "Suva"]
@@ -0,0 +1,115 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import ingest
+
+DOCS = [{"id": str(i), "title": f"Job {i}", "posted_at": 1700000000 + i} for i in range(1234)]
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Typesense stand-in: 'jobs' is missing, 'job_postings' serves export and search pages.
+
+    fail: the next N requests answer 503; cut_at: the next export drops the
+    connection mid-line after that many documents.
+    """
+    fail = 0
+    cut_at = None
+    requests = []
+
+    def log_message(self, *args): pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        q = parse_qs(url.query)
+        StandIn.requests.append(url.path)
+        if self.headers.get("X-TYPESENSE-API-KEY") != "key": return self.reply(401)
+        if url.path.startswith("/collections/jobs/"): return self.reply(404)
+        if StandIn.fail:
+            StandIn.fail -= 1
+            return self.reply(503)
+        docs = DOCS
+        if "filter_by" in q:
+            since = int(q["filter_by"][0].split(">=")[1])
+            docs = [d for d in DOCS if d["posted_at"] >= since]
+        if url.path.endswith("/documents/export"):
+            self.send_response(200)
+            self.end_headers()
+            for i, d in enumerate(docs):
+                if i == StandIn.cut_at:
+                    StandIn.cut_at = None
+                    self.wfile.write(b'{"id": ')
+                    return
+                self.wfile.write((json.dumps(d) + "\n").encode())
+        elif url.path.endswith("/documents/search"):
+            page, per_page = int(q["page"][0]), int(q["per_page"][0])
+            hits = [{"document": d} for d in docs[(page - 1) * per_page:page * per_page]]
+            self.reply(200, json.dumps({"found": len(docs), "hits": hits}).encode())
+
+    def reply(self, code, body=b""):
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def config(monkeypatch):
+    monkeypatch.setattr(ingest.time, "sleep", lambda s: None)
+    StandIn.fail, StandIn.cut_at, StandIn.requests = 0, None, []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield {"nodes": [{"host": "127.0.0.1", "port": server.server_address[1], "protocol": "http"}],
+           "api_key": "key", "connection_timeout_seconds": 5}
+    server.shutdown()
+    server.server_close()
+
+
+def ids(df):
+    return [int(i) for i in df["id"]]
+
+
+@pytest.mark.parametrize("mode", ["export", "search"])
+def test_fetch_falls_through_to_existing_collection(config, mode):
+    df = ingest.fetch_collection(config, ["jobs", "job_postings"], mode=mode, workers=4)
+    assert ids(df) == list(range(len(DOCS)))
+    assert list(df.columns) == ["id", "title", "posted_at"]
+
+
+@pytest.mark.parametrize("mode", ["export", "search"])
+def test_fetch_retries_after_failure(config, mode):
+    StandIn.fail = 2
+    retries = []
+    df = ingest.fetch_collection(config, ["job_postings"], mode=mode, on_retry=lambda attempt, e: retries.append(attempt))
+    assert retries == [1, 2]
+    assert ids(df) == list(range(len(DOCS)))
+
+
+def test_fetch_gives_up_after_retries(config):
+    StandIn.fail = 10
+    with pytest.raises(Exception):
+        ingest.fetch_collection(config, ["job_postings"], mode="search", retries=2)
+
+
+def test_export_retries_cut_connection(config):
+    StandIn.cut_at = 700
+    df = ingest.fetch_collection(config, ["job_postings"], mode="export")
+    assert [p for p in StandIn.requests if p.endswith("/documents/export")] == ["/collections/job_postings/documents/export"] * 2
+    assert ids(df) == list(range(len(DOCS)))
+
+
+def test_export_resumes_from_last_yielded_document(config):
+    # Batches 1-4 (400 docs) were handed out before the cut; the retry skips exactly those
+    StandIn.cut_at = 450
+    batches = list(ingest.resume_export(config, "job_postings", batch_rows=100))
+    assert [len(b) for b in batches] == [100] * 12 + [34]
+    assert sum((ids(b) for b in batches), []) == list(range(len(DOCS)))
+
+
+@pytest.mark.parametrize("mode", ["export", "search"])
+def test_filter_by_is_passed_through(config, mode):
+    df = ingest.fetch_collection(config, ["job_postings"], mode=mode, filter_by="posted_at:>=1700001000")
+    assert ids(df) == list(range(1000, len(DOCS)))
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indexes import KEYWORD_FIELDS, KeywordIndex, parse_keywords
+
+PARTS = ["C++", "c#", "Node.js", "Data", "Science", "back-end", "A/B", "ML", ".NET", "Café", "R&D", "go", "ai",
+         "Sr.", "(Remote)", "full-stack", "Engineer", "data-science", "naïve", "£50k", "24/7", "--", "Python3"]
+SEPS = [" ", "", "-", ", ", " / ", ".", "  ", "_"]
+
+
+def text(df):
+    return lambda field, ids: df[field].take(ids)
+
+
+def reference(df, keywords):
+    """The pre-index search: every term a plain substring of some field (lower-cased, str() of missing values)."""
+    mask = np.ones(len(df), dtype=bool)
+    for term in parse_keywords(keywords):
+        hit = np.zeros(len(df), dtype=bool)
+        for f in KEYWORD_FIELDS:
+            if f in df.columns: hit |= df[f].astype(str).str.lower().str.contains(term, regex=False).to_numpy()
+        mask &= hit
+    return np.flatnonzero(mask)
+
+
+def frame(rows, seed):
+    rng = np.random.default_rng(seed)
+
+    def value():
+        n = rng.integers(1, 6)
+        return "".join(PARTS[p] + SEPS[s] for p, s in zip(rng.integers(0, len(PARTS), n), rng.integers(0, len(SEPS), n)))
+
+    df = pd.DataFrame({f: [value() for _ in range(rows)] for f in KEYWORD_FIELDS})
+    df.loc[rng.random(rows) < 0.05, "raw_role"] = None
+    df.loc[rng.random(rows) < 0.05, "description"] = np.nan
+    return df
+
+
+def queries(df, seed, count=150):
+    """Substrings cut at random offsets out of the rows (across token boundaries), plus fixed edge cases."""
+    rng = np.random.default_rng(seed)
+    out = ["c++", "c#", "++", ".net", "node.js", "a/b", "r&d", "(remote)", "--", "£50", "24/7", "café", "naï",
+           "ta sc", "a-sc", "sr. ", "3", " ", "none", "nan", "no match at all", "science_", "go"]
+    values = df["description"].dropna().astype(str).str.lower().tolist()
+    for _ in range(count):
+        v = values[rng.integers(len(values))]
+        i = int(rng.integers(len(v)))
+        out.append(v[i:i + int(rng.integers(1, 12))])
+    return out
+
+
+@pytest.fixture(scope="module")
+def df():
+    return frame(3000, seed=5)
+
+
+@pytest.mark.parametrize("max_desc_chars", [0, 24])
+def test_search_matches_substring_scan(df, max_desc_chars):
+    idx = KeywordIndex(df, max_desc_chars)
+    if max_desc_chars: assert len(idx.partial_rows) > 0
+    ids = np.arange(len(df))
+    for q in queries(df, seed=1):
+        assert np.array_equal(idx.search(text(df), q, ids), reference(df, q)), q
+
+
+def test_truncated_descriptions_still_match_their_tail():
+    df = pd.DataFrame({"raw_role": ["Engineer", "Engineer"], "job_role": ["Other", "Other"],
+                       "description": ["x" * 40 + " kubernetes", "short kubernetes"]})
+    idx = KeywordIndex(df, max_desc_chars=20)
+    assert idx.partial_rows.tolist() == [0]
+    assert idx.search(text(df), "kubernetes", np.arange(2)).tolist() == [0, 1]
+
+
+@pytest.mark.parametrize("q", ['"data science" python3', '"c++" "node.js"', '"back-end"', 'sr. "a/b"', '""', '"ta sc" ml'])
+def test_quoted_phrases_are_separate_terms(df, q):
+    idx = KeywordIndex(df)
+    assert np.array_equal(idx.search(text(df), q, np.arange(len(df))), reference(df, q))
+
+
+def test_search_keeps_id_order(df):
+    idx = KeywordIndex(df)
+    ids = np.random.default_rng(2).permutation(len(df))
+    expected = set(reference(df, "data").tolist())
+    assert idx.search(text(df), "data", ids).tolist() == [i for i in ids.tolist() if i in expected]
+
+
+@pytest.mark.parametrize("max_desc_chars", [0, 24])
+def test_concat_matches_fresh_build(df, max_desc_chars):
+    old, new = df.iloc[:2000].reset_index(drop=True), frame(500, seed=6)
+    keep = np.random.default_rng(3).random(len(old)) < 0.7
+    merged = pd.concat([old[keep], new], ignore_index=True)
+    idx = KeywordIndex.concat(KeywordIndex(old, max_desc_chars), keep, KeywordIndex(new, max_desc_chars))
+    fresh = KeywordIndex(merged, max_desc_chars)
+
+    assert idx.n == fresh.n == len(merged)
+    assert np.array_equal(idx.partial_rows, fresh.partial_rows)
+    postings = lambda ix: {t: ix.postings[ix.offsets[i]:ix.offsets[i + 1]].tolist() for i, t in enumerate(ix.vocab)}
+    assert postings(idx) == postings(fresh)
+    ids = np.arange(len(merged))
+    for q in queries(merged, seed=4, count=60):
+        assert np.array_equal(idx.search(text(merged), q, ids), reference(merged, q)), q
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import process
+from bench import synthetic
+
+
+@pytest.fixture
+def raw(monkeypatch):
+    monkeypatch.setattr(process.role_classifier, "memo_path", None)
+    monkeypatch.setattr(process.role_classifier, "memo", {})
+    monkeypatch.setattr(process, "load_stages", {})
+    return synthetic.frame(3000, seed=3, now=1760000000, desc_words=5)
+
+
+def test_pool_matches_single_pass(raw):
+    serial, serial_skills = process.prepare_chunks([raw.copy()], workers=0)
+    serial_stages = dict(process.load_stages)
+    process.role_classifier.memo = {}
+    process.load_stages.clear()
+
+    chunks = [raw.iloc[i:i + 1000].reset_index(drop=True).copy() for i in range(0, len(raw), 1000)]
+    pooled, pooled_skills = process.prepare_chunks(chunks, workers=2, min_rows=0)
+
+    pd.testing.assert_frame_equal(pooled, serial)
+    assert list(pooled_skills.vocab) == list(serial_skills.vocab)
+    assert np.array_equal(pooled_skills.codes, serial_skills.codes)
+    assert np.array_equal(pooled_skills.offsets, serial_skills.offsets)
+    assert process.role_classifier.memo
+    # Worker stage timings reach the parent's registry
+    assert set(process.CHUNK_STAGES) <= set(serial_stages)
+    assert set(process.CHUNK_STAGES) <= set(process.load_stages)
+    assert all(process.load_stages[name] > 0 for name in process.CHUNK_STAGES)
+
+
+def test_small_load_stays_in_process(raw, monkeypatch):
+    monkeypatch.setattr(process, "ProcessPoolExecutor", None)  # would fail if the pool were started
+    chunks = [raw.iloc[i:i + 1000].reset_index(drop=True).copy() for i in range(0, len(raw), 1000)]
+    df, _ = process.prepare_chunks(chunks, workers=2, min_rows=len(raw) + 1)
+    assert len(df) == len(raw)
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+import geo
+import process
+from data.CITY_COORDS import CITY_COORDS as CITY_COORDS_NOW
+
+# --- Row-wise parsers the vectorized pipeline replaced (kept verbatim as the reference) ---
+
+# The baseline's inline table, which parse_latlon_hybrid below looked cities up in
+CITY_COORDS = {
+    'bengaluru': [12.9716, 77.5946], 'bangalore': [12.9716, 77.5946],
+    'hyderabad': [17.3850, 78.4867], 'secunderabad': [17.4399, 78.4983],
+    'chennai': [13.0827, 80.2707], 'mumbai': [19.0760, 72.8777],
+    'pune': [18.5204, 73.8567], 'delhi': [28.7041, 77.1025], 'new delhi': [28.6139, 77.2090],
+    'noida': [28.5355, 77.3910], 'gurgaon': [28.4595, 77.0266], 'gurugram': [28.4595, 77.0266],
+    'kolkata': [22.5726, 88.3639], 'ahmedabad': [23.0225, 72.5714],
+    'jaipur': [26.9124, 75.7873], 'chandigarh': [30.7333, 76.7794],
+    'indore': [22.7196, 75.8577], 'kochi': [9.9312, 76.2673],
+    'trivandrum': [8.5241, 76.9366], 'coimbatore': [11.0168, 76.9558], 'lucknow': [26.8467, 80.9462], 
+    'nagpur': [21.1458, 79.0882], 'surat': [21.1702, 72.8311],
+    'bhopal': [23.2599, 77.4126], 'patna': [25.5941, 85.1376],
+    'kanpur': [26.4499, 80.3319], 'thane': [19.2183, 72.9781], 'navi mumbai': [19.0330, 73.0297],
+    'london': [51.5074, -0.1278], 'new york': [40.7128, -74.0060],
+    'san francisco': [37.7749, -122.4194], 'berlin': [52.5200, 13.4050],
+    'singapore': [1.3521, 103.8198], 'dubai': [25.2048, 55.2708],
+    'sydney': [-33.8688, 151.2093], 'tokyo': [35.6762, 139.6503],
+    'paris': [48.8566, 2.3522], 'toronto': [43.6510, -79.3470],
+    'amsterdam': [52.3676, 4.9041], 'madrid': [40.4168, -3.7038],
+    'los angeles': [34.0522, -118.2437], 'chicago': [41.8781, -87.6298],
+    'austin': [30.2672, -97.7431], 'seattle': [47.6062, -122.3321]
+}
+
+
+def parse_location(loc):
+    if not isinstance(loc, str): return "Unknown", "Global"
+    parts = [p.strip() for p in loc.split(',')]
+
+    raw_city = parts[0].title()
+    CITY_FIX = {"Bangalore": "Bengaluru", "Gurgaon": "Gurugram", "Bombay": "Mumbai", "Us": "Remote", "India": "Remote"}
+    city = CITY_FIX.get(raw_city, raw_city)
+
+    country = parts[-1].title() if len(parts) > 1 else "Global"
+    loc_lower = loc.lower()
+    if "india" in loc_lower and "indiana" not in loc_lower: country = "India"
+    elif any(c in loc_lower for c in ['bengaluru', 'mumbai', 'delhi', 'pune']): country = "India"
+    elif "united states" in loc_lower or " usa" in loc_lower: country = "USA"
+
+    if city == country: city = "Remote"
+    return city, country
+
+
+def parse_latlon_hybrid(row):
+    val = row.get("latlon")
+    lat, lon = None, None
+    try:
+        if isinstance(val, list) and len(val) == 2:
+            lat, lon = float(val[0]), float(val[1])
+        elif isinstance(val, str):
+            clean = val.replace('[', '').replace(']', '').strip()
+            if clean:
+                parts = clean.split(',')
+                if len(parts) == 2:
+                    lat, lon = float(parts[0]), float(parts[1])
+    except: pass
+
+    if (lat is None or pd.isna(lat)) and isinstance(row.get("city"), str):
+        city_key = row["city"].lower()
+        if city_key in CITY_COORDS:
+            lat, lon = CITY_COORDS[city_key]
+    return lat, lon
+
+
+# Intended differences of process.parse_latlon, both only for rows the row parser leaves unplaced:
+#  1. cities added to data/CITY_COORDS.py since the baseline are found too;
+#  2. failing that, the first raw_location part naming a city (not a country/region centroid)
+#     places the row, unless its parsed city isn't a place ("Remote, Singapore" stays unplaced).
+def parse_latlon_now(row):
+    lat, lon = parse_latlon_hybrid(row)
+    if lat is not None and not pd.isna(lat): return lat, lon
+    city = str(row.get("city")).strip().lower()
+    if city in CITY_COORDS_NOW: return tuple(CITY_COORDS_NOW[city])
+    raw = row.get("raw_location")
+    if city not in geo.NON_PLACES and isinstance(raw, str):
+        for part in raw.lower().split(","):
+            if part.strip() in CITY_COORDS_NOW and part.strip() not in geo.REGIONS: return tuple(CITY_COORDS_NOW[part.strip()])
+    return lat, lon
+
+
+RAW_LOCATIONS = [
+    "Bangalore, Karnataka, India", "Bengaluru", "Gurgaon, Haryana", "Bombay, Maharashtra, India",
+    "Pune", "Delhi, NCR", "New Delhi, Delhi, India", "India", "Remote, India", "US", "Remote, US",
+    "San Francisco, CA, United States", "Austin, Texas, USA", "Indianapolis, Indiana, United States",
+    "Indianapolis, Indiana", "London, United Kingdom", "Berlin, Germany", "Germany, Germany", "  hyderabad ,  telangana ",
+    "Chennai, Tamil Nadu, India", "Dublin, Ireland", "Madrid, Spain", "Thane, Maharashtra", "Patna, Bihar, India",
+    "", ",", "Unknown Town", None, np.nan, 42,
+    "Remote, Singapore", "Work From Home, Mumbai", "WFH, Pune", "Whitefield, Bengaluru, Karnataka",
+    "Koramangala, Bangalore", "Electronic City, Karnataka, India", "Remote, USA", "Unknown, Hyderabad",
+]
+LATLONS = [
+    None, np.nan, "[12.97, 77.59]", "[40.7, -74.0]", "[]", "", "[1.0, 2.0, 3.0]", "[abc, 1]",
+    [28.61, 77.2], [51.5, "-0.12"], [1.0], ["x", 2.0], [None, None], "12.5,80.1",
+]
+
+
+def sample():
+    n = len(RAW_LOCATIONS) * len(LATLONS)
+    return pd.DataFrame({
+        "raw_location": pd.Series(RAW_LOCATIONS * len(LATLONS), dtype=object),
+        "latlon": pd.Series([v for v in LATLONS for _ in RAW_LOCATIONS], dtype=object),
+    }, index=range(n))
+
+
+def test_locations_match_row_parser():
+    df = sample()
+    city, country = process.parse_locations(df["raw_location"])
+    want = [parse_location(loc) for loc in df["raw_location"]]
+    assert list(city) == [c for c, _ in want]
+    assert list(country) == [c for _, c in want]
+
+
+def test_latlon_matches_row_parser():
+    df = sample()
+    df["city"], df["country"] = process.parse_locations(df["raw_location"])
+    lat, lon = process.parse_latlon(df["latlon"], df["city"], df["raw_location"])
+    want = pd.DataFrame([parse_latlon_now(row) for _, row in df.iterrows()], columns=["lat", "lon"], dtype=float)
+    np.testing.assert_array_equal(lat, want["lat"].to_numpy())
+    np.testing.assert_array_equal(lon, want["lon"].to_numpy())
+
+    # Wherever the row parser placed a row, the position is unchanged
+    old = pd.DataFrame([parse_latlon_hybrid(row) for _, row in df.iterrows()], columns=["lat", "lon"], dtype=float)
+    placed = old["lat"].notna().to_numpy()
+    np.testing.assert_array_equal(lat[placed], old["lat"].to_numpy()[placed])
+    np.testing.assert_array_equal(lon[placed], old["lon"].to_numpy()[placed])
+
+
+def test_non_place_cities_stay_unplaced():
+    raw = pd.Series(["Remote, Singapore", "Work From Home, Mumbai", "India", "Remote, USA", "Whitefield, Bengaluru, Karnataka"], dtype=object)
+    city, _ = process.parse_locations(raw)
+    lat, lon = process.parse_latlon(pd.Series([None] * len(raw), dtype=object), city, raw)
+    assert list(city[:4]) == ["Remote", "Work From Home", "Remote", "Remote"]
+    assert np.isnan(lat[:4]).all() and np.isnan(lon[:4]).all()
+    assert (lat[4], lon[4]) == tuple(CITY_COORDS_NOW["bengaluru"])
+
+
+def test_metrics_match_row_parser():
+    ctc = pd.Series(["5-8 LPA", "₹12,00,000", "Not Disclosed", "$120,000 - $150,000", "7.5", None, np.nan, 300000, "", "3 to 4.5 lacs"] * 3, dtype=object)
+    exp = pd.Series(["2-5 Yrs", "0", "10+ years", "fresher", None, np.nan, 3, 2.5, "1.5 - 3"] * 3, dtype=object)
+    salary = process.map_unique(ctc, lambda x: process.clean_salary_aggressive(str(x)))
+    years = process.map_unique(exp, lambda x: process.clean_experience_aggressive(str(x)))
+    assert list(salary) == list(ctc.astype(str).apply(process.clean_salary_aggressive))
+    assert list(years) == list(exp.astype(str).apply(process.clean_experience_aggressive))
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench import synthetic
+from conftest import load
+from dataset import Dataset
+
+NOW = 1760000000
+FILTERS = [((), None, 20, None, None), (("India",), None, 5, None, None), ((), None, 20, "python", None)]
+
+
+@pytest.fixture
+def ds(backend):
+    return load(backend, synthetic.frame(3000, seed=9, now=NOW, desc_words=8))
+
+
+def pages(process, ds, filters, limit, sort=None, order="desc", cursor=None, stop=None):
+    """job_ids of every page from cursor on (at most `stop` pages) and the last next_cursor."""
+    out = []
+    while True:
+        page = process.raw_jobs_for(ds, list(filters[0]), *filters[1:], limit=limit, cursor=cursor, sort=sort, order=order, fields=["job_id"])
+        out += [j["job_id"] for j in page["jobs"]]
+        cursor = page["next_cursor"]
+        if cursor is None or (stop is not None and len(out) >= stop * limit): return out, cursor
+
+
+def expected(process, ds, filters, sort=None, order="desc"):
+    ids = process.apply_filters(ds, list(filters[0]), *filters[1:])
+    if sort is not None:
+        # Stable ascending order by value, reversed for desc (ties then come last row first)
+        ids = ids[np.argsort(ds.df[sort].to_numpy()[ids], kind="stable")]
+        if order == "desc": ids = ids[::-1]
+    return ds.df["job_id"].to_numpy()[ids].tolist()
+
+
+@pytest.mark.parametrize("sort,order", [(None, "desc"), ("post_date", "desc"), ("post_date", "asc"),
+                                        ("parsed_salary", "desc"), ("parsed_salary", "asc"), ("min_experience", "asc")])
+@pytest.mark.parametrize("filters", FILTERS)
+def test_pages_cover_every_match_once(backend, ds, filters, sort, order):
+    got, _ = pages(backend, ds, filters, 97, sort, order)
+    assert got == expected(backend, ds, filters, sort, order)
+
+
+def test_bad_cursor_and_params(backend, ds):
+    _, cursor = pages(backend, ds, FILTERS[0], 10, stop=1)
+    with pytest.raises(backend.HTTPException): backend.raw_jobs_for(ds, ["India"], None, 20, None, None, cursor=cursor)
+    with pytest.raises(backend.HTTPException): backend.raw_jobs_for(ds, [], None, 20, None, None, cursor="garbage")
+    with pytest.raises(backend.HTTPException): backend.raw_jobs_for(ds, [], None, 20, None, None, sort="title")
+    with pytest.raises(backend.HTTPException): backend.raw_jobs_for(ds, [], None, 20, None, None, order="up")
+
+
+@pytest.mark.parametrize("sort,order", [(None, "desc"), ("post_date", "desc"), ("parsed_salary", "asc")])
+def test_resume_across_merge(backend, ds, sort, order):
+    filters = FILTERS[0]
+    before = expected(backend, ds, filters, sort, order)
+    seen, cursor = pages(backend, ds, filters, 1000, sort, order, stop=1)
+
+    # 200 re-published postings spread over the whole frame, 50 brand new ones
+    raw = synthetic.frame(3250, seed=9, now=NOW, desc_words=8)
+    updated = raw.iloc[np.arange(0, 3000, 15)].copy()
+    updated["ctc"] = "12-18 LPA"
+    updated["posted_at"] = NOW + 60
+    delta_raw = pd.concat([updated, raw.iloc[3000:]], ignore_index=True)
+    delta = Dataset.build(backend.prepare_frame(delta_raw), ds.version, set(backend.JUNK_SKILLS))
+    merged = ds.merge(delta, ds.version + 1)
+
+    rest, _ = pages(backend, merged, filters, 1000, sort, order, cursor=cursor)
+    unchanged = set(before) - set(updated["job_id"])
+    # Every unchanged row after the cursor still comes, in order; replaced and new rows come at their new place
+    assert [j for j in rest if j in unchanged] == [j for j in before[len(seen):] if j in unchanged]
+    if sort is None:
+        # Row order appends replaced and new rows, so they all lie ahead of the cursor
+        assert set(seen) | set(rest) == set(merged.df["job_id"])
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench import synthetic
+from conftest import load
+from dataset import Dataset
+
+NOW = 1760000000
+
+
+def serve(process, monkeypatch, source):
+    """Stubs the delta fetch: rows of source matching filter_by "posted_at:>=<ts>"."""
+    def fetch(config, collections, filter_by=None, **kw):
+        since = int(filter_by.split(">=")[1])
+        return source[source["posted_at"] >= since].reset_index(drop=True)
+    monkeypatch.setattr(process, "fetch_collection", fetch)
+
+
+@pytest.fixture
+def raw():
+    return synthetic.frame(3000, seed=5, now=NOW, desc_words=8)
+
+
+def test_idle_refresh_keeps_dataset(backend, monkeypatch, raw):
+    ds = load(backend, raw)
+    serve(backend, monkeypatch, raw)
+    saves = []
+    monkeypatch.setattr(backend, "save_snapshot", lambda: saves.append(1))
+    for _ in range(3):
+        assert backend.refresh_delta() == 0
+    assert backend.dataset is ds and backend.dataset.version == ds.version
+    assert saves == []
+
+
+def test_merge_equals_full_rebuild(backend, monkeypatch, raw):
+    old = raw.sort_values("posted_at", kind="stable").iloc[:2500].reset_index(drop=True)
+    ds = load(backend, old)
+    hw = ds.high_water
+
+    new = raw.sort_values("posted_at", kind="stable").iloc[2500:].copy()
+    new["posted_at"] = np.maximum(new["posted_at"], hw + 1)
+    # Re-published updates of existing postings
+    updates = old.iloc[[3, 70, 900]].copy()
+    updates["title"] = "Chef"
+    updates["posted_at"] = hw + 10
+    delta = pd.concat([new, updates], ignore_index=True)
+    serve(backend, monkeypatch, pd.concat([old, delta], ignore_index=True))
+
+    assert backend.refresh_delta() == len(delta)
+    merged = backend.dataset
+    assert merged.version == ds.version + 1
+
+    # Same rows in the same order: kept old rows, then the delta
+    full_raw = pd.concat([old[~old["job_id"].isin(delta["job_id"])], delta], ignore_index=True)
+    ref = Dataset.build(backend.prepare_frame(full_raw), 0, set(backend.JUNK_SKILLS))
+    pd.testing.assert_frame_equal(merged.df.drop(columns="description", errors="ignore").astype(object),
+                                  ref.df.drop(columns="description", errors="ignore").astype(object))
+    queries = [((), None, 20, None, None), (("India",), None, 5, "python", None), ((), None, 3, "chef", 30), ((), "Sales", 20, None, 90)]
+    for countries, role, exp_max, keywords, days_ago in queries:
+        a = backend.apply_filters(merged, list(countries), role, exp_max, keywords, days_ago)
+        b = backend.apply_filters(ref, list(countries), role, exp_max, keywords, days_ago)
+        assert np.array_equal(a, b)
+        assert backend.skills_for(merged, a) == backend.skills_for(ref, b)
+        sa, sb = merged.cube.select(countries, role, exp_max, days_ago), ref.cube.select(countries, role, exp_max, days_ago)
+        assert repr((sa.kpis(), sa.top_companies(), sa.map_points(), sa.salary_by_experience())) == \
+               repr((sb.kpis(), sb.top_companies(), sb.map_points(), sb.salary_by_experience()))
+
+    # Nothing new after the merge: the next refresh is idle again
+    assert backend.refresh_delta() == 0
+    assert backend.dataset is merged
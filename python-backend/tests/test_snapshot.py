@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import snapshot
+from bench import synthetic
+from conftest import load
+
+NOW = 1760000000
+QUERIES = [((), None, 20, None, None), (("India",), None, 5, "python", None), ((), None, 3, "data", 30), ((), "Sales", 20, None, 90)]
+
+
+@pytest.fixture
+def raw():
+    return synthetic.frame(2000, seed=11, now=NOW, desc_words=200)
+
+
+def fetches(process, raw):
+    """Swaps in a fetcher that counts its calls; returns the call list."""
+    calls = []
+    process.fetch_from_typesense = lambda *a, **k: calls.append(1) or iter([raw.copy()])
+    return calls
+
+
+def test_loaded_snapshot_matches_fresh_build(backend, monkeypatch, raw):
+    # Truncated descriptions, so partial_rows and the text store are both exercised
+    monkeypatch.setattr(backend, "KEYWORD_INDEX_DESC_KB", 1)
+    built = load(backend, raw)
+    calls = fetches(backend, raw)
+    backend.load_data_internal(use_cache=True)
+    loaded = backend.dataset
+    assert calls == [] and loaded is not built
+
+    pd.testing.assert_frame_equal(loaded.df, built.df)
+    assert np.array_equal(loaded.seq, built.seq) and loaded.high_water == built.high_water and loaded.tag == built.tag
+    for part in ("keywords", "skills"):
+        a, b = getattr(loaded, part).state(), getattr(built, part).state()
+        assert a.keys() == b.keys()
+        for key in a: assert np.array_equal(np.asarray(a[key]), np.asarray(b[key])), (part, key)
+    assert len(built.keywords.partial_rows) > 0
+    a, b = loaded.cube.state(), built.cube.state()
+    assert a.keys() == b.keys() and all(np.array_equal(a[k], b[k]) for k in a)
+    ids = np.arange(len(built.df))
+    assert loaded.text("description", ids).tolist() == built.text("description", ids).tolist()
+
+    for countries, role, exp_max, keywords, days_ago in QUERIES:
+        la = backend.apply_filters(loaded, list(countries), role, exp_max, keywords, days_ago)
+        lb = backend.apply_filters(built, list(countries), role, exp_max, keywords, days_ago)
+        assert np.array_equal(la, lb)
+        assert backend.skills_for(loaded, la) == backend.skills_for(built, lb)
+        sa = backend.selection_for(loaded, list(countries), role, exp_max, keywords, days_ago)
+        sb = backend.selection_for(built, list(countries), role, exp_max, keywords, days_ago)
+        assert repr((sa.kpis(), sa.top_companies(), sa.map_points(), sa.salary_by_experience())) == \
+               repr((sb.kpis(), sb.top_companies(), sb.map_points(), sb.salary_by_experience()))
+        page = dict(limit=25, sort="parsed_salary", fields=["job_id", "description"])
+        assert backend.raw_jobs_for(loaded, list(countries), role, exp_max, keywords, days_ago, **page) == \
+               backend.raw_jobs_for(built, list(countries), role, exp_max, keywords, days_ago, **page)
+
+
+@pytest.mark.parametrize("setting,change", [
+    ("ROLE_MAPPINGS", lambda m: {**m, "Chef": ["chef", "cook"]}),
+    ("JUNK_SKILLS", lambda s: s + ["python"]),
+    ("PIPELINE_VERSION", lambda v: v + 1),
+])
+def test_changed_settings_force_a_rebuild(backend, monkeypatch, raw, setting, change):
+    load(backend, raw)
+    fp = backend.snapshot_fingerprint()
+    calls = fetches(backend, raw)
+    backend.load_data_internal(use_cache=True)
+    assert calls == []
+
+    monkeypatch.setattr(backend, setting, change(getattr(backend, setting)))
+    assert backend.snapshot_fingerprint() != fp
+    assert snapshot.load(backend.SNAPSHOT_DIR, backend.snapshot_fingerprint(), 0) is None
+    backend.load_data_internal(use_cache=True)
+    assert calls == [1]
+    # The rebuild replaced the snapshot: the next start loads it
+    backend.load_data_internal(use_cache=True)
+    assert calls == [1]
+    assert snapshot.load(backend.SNAPSHOT_DIR, fp, 0) is None
+
+
+def test_rebuild_applies_the_new_settings(backend, monkeypatch, raw):
+    load(backend, raw)
+    assert "python" in backend.dataset.skills.vocab
+    monkeypatch.setattr(backend, "JUNK_SKILLS", backend.JUNK_SKILLS + ["python"])
+    fetches(backend, raw)
+    backend.load_data_internal(use_cache=True)
+    assert "python" not in backend.dataset.skills.vocab
@@ -0,0 +1,112 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# --- DESCRIPTION STORE ---
+# Long free-text columns live in append-only UTF-8 segment files instead of
+# the frame. Each row points at (segment, start, end) in a memory-mapped
+# segment, so text is only decoded for the rows keyword search verifies and
+# untouched pages stay on disk. A row with segment -1 is missing (NaN).
+
+
+def _map(path):
+    return np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else np.zeros(0, dtype=np.uint8)
+
+
+def segment_path(directory):
+    """Fresh segment file name; the pid prefix keeps workers out of each other's files."""
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{os.getpid()}-{time.time_ns()}.bin")
+
+
+class TextStore:
+    def __init__(self, paths, seg, start, end, maps=None):
+        self.paths = list(paths)
+        self.seg, self.start, self.end = seg, start, end
+        # Segments are mapped once and the maps handed on by concat, so a file
+        # unlinked by pruning or snapshot rotation stays readable
+        self.maps = maps if maps is not None else [_map(p) for p in self.paths]
+
+    def __len__(self):
+        return len(self.seg)
+
+    @classmethod
+    def write(cls, path, chunks):
+        """Writes an iterable of Series chunks into one segment file at path."""
+        segs, starts, ends, pos = [], [], [], 0
+        with open(path, "wb") as f:
+            for s in chunks:
+                missing = s.isna().to_numpy()
+                enc = s.where(~missing, "").astype(str).str.encode("utf-8")
+                lens = enc.str.len().to_numpy(dtype=np.int64)
+                f.write(b"".join(enc.tolist()))
+                end = pos + np.cumsum(lens)
+                segs.append(np.where(missing, -1, 0).astype(np.int32))
+                starts.append(end - lens)
+                ends.append(end)
+                pos = int(end[-1]) if len(end) else pos
+        cat = lambda parts, dtype: np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        return cls([path], cat(segs, np.int32), cat(starts, np.int64), cat(ends, np.int64))
+
+    @classmethod
+    def concat(cls, old, keep, new):
+        """Store for old's kept rows followed by new's rows, dropping unreferenced segments."""
+        seg = np.concatenate([old.seg[keep], np.where(new.seg >= 0, new.seg + len(old.paths), -1)]).astype(np.int32)
+        paths = old.paths + new.paths
+        used = np.unique(seg[seg >= 0])
+        remap = np.full(len(paths) + 1, -1, dtype=np.int32)
+        remap[used] = np.arange(len(used))
+        maps = old.maps + new.maps
+        return cls([paths[i] for i in used], remap[seg],
+                   np.concatenate([old.start[keep], new.start]), np.concatenate([old.end[keep], new.end]),
+                   [maps[i] for i in used])
+
+    @classmethod
+    def missing(cls, n):
+        """Store of n missing rows (for deltas that lack the field)."""
+        return cls([], np.full(n, -1, dtype=np.int32), np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64))
+
+    def state(self):
+        return {"seg": self.seg, "start": self.start, "end": self.end}
+
+    def take(self, ids):
+        """Decoded values of the selected rows (NaN where missing)."""
+        out = np.full(len(ids), np.nan, dtype=object)
+        seg, start, end = self.seg[ids], self.start[ids], self.end[ids]
+        for i in np.flatnonzero(seg >= 0):
+            out[i] = self.maps[seg[i]][start[i]:end[i]].tobytes().decode("utf-8")
+        return pd.Series(out, dtype=object)
+
+    def chunks(self, size=50000):
+        for start in range(0, len(self), size):
+            yield self.take(np.arange(start, min(start + size, len(self))))
+
+    def disk_bytes(self):
+        return sum(len(m) for m in self.maps)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def prune(directory, keep):
+    """Deletes segment files that keep (paths in use) doesn't reference.
+
+    Other workers' files are only removed once their process has exited.
+    """
+    if not os.path.isdir(directory): return
+    keep = {os.path.abspath(p) for p in keep}
+    for name in os.listdir(directory):
+        path = os.path.abspath(os.path.join(directory, name))
+        pid = name.split("-", 1)[0]
+        if not name.endswith(".bin") or path in keep or not pid.isdigit(): continue
+        # Unlinking is safe for segments still mapped by an older Dataset
+        if int(pid) == os.getpid() or not _alive(int(pid)): os.remove(path)